@@ -0,0 +1,173 @@
+"""
+Content-addressed downloader for player portraits and club logos
+Fetches each distinct image once, stores it under its content hash and adds local path columns to the dataset
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from scrape_esperance_2012_2025_all_seasons import HEADERS
+
+# Configuration
+ASSETS_DIR = "assets"
+INDEX_FILE = os.path.join(ASSETS_DIR, "index.json")
+DATASET_FILE = "esperance_2012_2025_all_seasons.csv"
+MAX_WORKERS = 8
+
+# Dataset column -> column receiving the local path
+ASSET_COLUMNS = {
+    'Player_Image': 'Player_Image_Local',
+    'Current_Club_Logo': 'Current_Club_Logo_Local',
+}
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/svg+xml': '.svg',
+}
+
+def normalize_url(url):
+    """
+    Canonical form used to deduplicate asset URLs: lower-case host, collapsed slashes,
+    no query string (Transfermarkt only adds '?lm=<timestamp>' cache busters) and no fragment.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    path = re.sub(r'/{2,}', '/', parts.path)
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(), path, '', ''))
+
+def asset_extension(url, content_type):
+    ext = CONTENT_TYPE_EXTENSIONS.get((content_type or '').split(';')[0].strip().lower())
+    if ext:
+        return ext
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if ext in CONTENT_TYPE_EXTENSIONS.values() or ext == '.jpeg' else '.bin'
+
+def load_index(index_file=INDEX_FILE):
+    if os.path.exists(index_file):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_index(index, index_file=INDEX_FILE):
+    os.makedirs(os.path.dirname(index_file) or '.', exist_ok=True)
+    tmp_file = index_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, index_file)
+
+def store_content(content, extension, assets_dir=ASSETS_DIR):
+    """Write bytes under assets/<hash[:2]>/<hash><ext>; identical files are stored once"""
+    digest = hashlib.sha256(content).hexdigest()
+    relative_path = os.path.join(assets_dir, digest[:2], digest + extension)
+    if not os.path.exists(relative_path):
+        os.makedirs(os.path.dirname(relative_path), exist_ok=True)
+        tmp_path = f"{relative_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, relative_path)
+    return relative_path.replace(os.sep, '/')
+
+def create_asset_session():
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': HEADERS['User-Agent'],
+        'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
+        'Referer': HEADERS['Referer'],
+    })
+    return session
+
+def fetch_asset(session, url, assets_dir=ASSETS_DIR):
+    """Download one asset and return its local path ('' on failure)"""
+    try:
+        response = session.get(url, timeout=20)
+        if response.status_code != 200 or not response.content:
+            print(f"   ❌ HTTP {response.status_code} for {url}")
+            return ''
+        extension = asset_extension(url, response.headers.get('Content-Type'))
+        return store_content(response.content, extension, assets_dir)
+    except Exception as e:
+        print(f"   ❌ Error downloading {url}: {e}")
+        return ''
+
+def download_assets(urls, index, assets_dir=ASSETS_DIR, max_workers=MAX_WORKERS):
+    """Fetch every normalised URL that isn't already on disk; updates and returns the index"""
+    pending = sorted({
+        normalize_url(u) for u in urls
+        if normalize_url(u) and not os.path.exists(index.get(normalize_url(u), ''))
+    })
+    print(f"🖼️ {len(pending)} assets to download ({len(index)} already indexed)")
+
+    session = create_asset_session()
+    # requests.Session's connection pool is shared by the worker threads
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_asset, session, url, assets_dir): url for url in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            local_path = future.result()
+            if local_path:
+                index[futures[future]] = local_path
+            if done % 50 == 0:
+                print(f"  Progress: {done}/{len(pending)} assets processed...")
+
+    return index
+
+def add_local_paths(dataset_file=DATASET_FILE, output_file=None, assets_dir=ASSETS_DIR,
+                    index_file=INDEX_FILE, max_workers=MAX_WORKERS):
+    """Download the dataset's images and write the *_Local path columns"""
+    with open(dataset_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames)
+        rows = list(reader)
+
+    urls = [row.get(column, '') for row in rows for column in ASSET_COLUMNS]
+    print(f"📂 {len(rows)} rows, {len(set(filter(None, urls)))} image URLs, "
+          f"{len(set(filter(None, map(normalize_url, urls))))} distinct after normalisation")
+
+    index = download_assets(urls, load_index(index_file), assets_dir, max_workers)
+    save_index(index, index_file)
+
+    for column, local_column in ASSET_COLUMNS.items():
+        if local_column not in fieldnames:
+            fieldnames.insert(fieldnames.index(column) + 1, local_column)
+        for row in rows:
+            row[local_column] = index.get(normalize_url(row.get(column, '')), '')
+
+    output_file = output_file or dataset_file
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    stored_files = len(set(index.values()))
+    print(f"✅ {len(index)} URLs map to {stored_files} stored files; local paths written to {output_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Download portraits and club logos once, content-addressed")
+    parser.add_argument('dataset', nargs='?', default=DATASET_FILE)
+    parser.add_argument('--output', help="Write the dataset with local paths here (default: in place)")
+    parser.add_argument('--assets-dir', default=ASSETS_DIR)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    add_local_paths(args.dataset, args.output, args.assets_dir,
+                    os.path.join(args.assets_dir, "index.json"), args.workers)
+
+if __name__ == "__main__":
+    main()
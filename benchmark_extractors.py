@@ -0,0 +1,148 @@
+"""
+Parser micro-benchmarks on a fixed HTML corpus
+Times each extraction function on the saved pages in benchmark_corpus/ and checks its output
+against the expected results, so both slowdowns and extraction changes are caught
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+import linkteam
+import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+# Configuration
+CORPUS_DIR = "benchmark_corpus"
+EXPECTED_FILE = os.path.join(CORPUS_DIR, "expected.json")
+PROFILE_PAGES = ['profile_current', 'profile_retired', 'profile_without_club', 'profile_national_team']
+SQUAD_PAGES = ['squad_2025', 'squad_2012']
+COUNTRY_PAGE = 'flashscore_tunisia'
+TEAM_QUERIES_FILE = "tunisian_league_teams.csv"
+REPEAT = 5
+MAX_SLOWDOWN = 1.3  # allowed ratio against a saved baseline before a case counts as a regression
+
+def load_page(name):
+    with open(os.path.join(CORPUS_DIR, f"{name}.html"), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def squad_rows(html):
+    return BeautifulSoup(html, 'html.parser').find('table', class_='items').find_all('tr', class_=['odd', 'even'])
+
+def build_cases():
+    """(case name, callable) pairs; inputs are parsed up-front so only the extractor is timed"""
+    cases = []
+
+    for name in PROFILE_PAGES:
+        html = load_page(name)
+        soup = BeautifulSoup(html, 'html.parser')
+        cases.append((f"extract_player_image[{name}]", lambda soup=soup: transfermarkt.extract_player_image(soup)))
+        cases.append((f"extract_current_club_info[{name}]",
+                      lambda soup=soup: transfermarkt.extract_current_club_info(soup)))
+        cases.append((f"extract_contract_expiry[{name}]",
+                      lambda soup=soup: transfermarkt.extract_contract_expiry(soup)))
+        cases.append((f"parse_player_details[{name}]", lambda html=html: transfermarkt.parse_player_details(html)))
+
+    for name in SQUAD_PAGES:
+        rows = squad_rows(load_page(name))
+        cases.append((f"extract_jersey_number[{name}]",
+                      lambda rows=rows: [transfermarkt.extract_jersey_number(r) for r in rows]))
+        cases.append((f"extract_position[{name}]", lambda rows=rows: [transfermarkt.extract_position(r) for r in rows]))
+        cases.append((f"extract_market_value[{name}]",
+                      lambda rows=rows: [transfermarkt.extract_market_value(r) for r in rows]))
+
+    soup = BeautifulSoup(load_page(COUNTRY_PAGE), 'html.parser')
+    with contextlib.redirect_stdout(io.StringIO()):
+        teams_dict = linkteam.extract_teams_from_matches_and_standings(soup, 'Tunisia')
+    with open(TEAM_QUERIES_FILE, 'r', encoding='utf-8') as f:
+        queries = [row['Team Name'] for row in csv.DictReader(f)] + ['Esperance', 'ES Sahel', 'Cebu', 'Al Tersana']
+    cases.append((f"find_team_link[{COUNTRY_PAGE}]",
+                  lambda: [list(linkteam.find_team_link(q, teams_dict)) for q in queries]))
+
+    return cases
+
+def time_case(func, repeat=REPEAT):
+    """Best-of-`repeat` time per call, in microseconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+def normalise(value):
+    """JSON round-trip so tuples and lists compare equal to the stored expectations"""
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check the HTML extractors on the saved corpus")
+    parser.add_argument('--filter', default='', help="Only run cases whose name contains this text")
+    parser.add_argument('--check-only', action='store_true', help="Check outputs without timing")
+    parser.add_argument('--update-expected', action='store_true', help="Store current outputs as the expected ones")
+    parser.add_argument('--save', help="Write timings to this JSON file (a baseline for --compare)")
+    parser.add_argument('--compare', help="Baseline timings JSON to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN)
+    args = parser.parse_args()
+
+    cases = [(name, func) for name, func in build_cases() if args.filter in name]
+    expected = {}
+    if os.path.exists(EXPECTED_FILE) and not args.update_expected:
+        with open(EXPECTED_FILE, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    outputs, timings, failures, regressions = {}, {}, [], []
+
+    print(f"{'Case':<58}{'µs/call':>12}{'vs base':>10}  Output")
+    for name, func in cases:
+        output = normalise(func())
+        outputs[name] = output
+
+        status = "✅"
+        if not args.update_expected:
+            if name not in expected:
+                status = "❔ no expectation"
+            elif expected[name] != output:
+                status = "❌ output changed"
+                failures.append(name)
+
+        timing, ratio_text = '', ''
+        if not args.check_only:
+            timings[name] = time_case(func)
+            timing = f"{timings[name]:.1f}"
+            if name in baseline:
+                ratio = timings[name] / baseline[name]
+                ratio_text = f"{ratio:.2f}x"
+                if ratio > args.max_slowdown:
+                    regressions.append(name)
+                    status += " 🐢 slower"
+
+        print(f"{name:<58}{timing:>12}{ratio_text:>10}  {status}")
+
+    if args.update_expected:
+        with open(EXPECTED_FILE, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Expected outputs written to {EXPECTED_FILE}")
+
+    if args.save and timings:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+        print(f"💾 Timings written to {args.save}")
+
+    for name in failures:
+        print(f"\n❌ {name}\n   expected: {expected[name]}\n   got:      {outputs[name]}")
+
+    if failures or regressions:
+        print(f"\n{len(failures)} output mismatch(es), {len(regressions)} regression(s) over {args.max_slowdown}x")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
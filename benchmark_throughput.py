@@ -0,0 +1,169 @@
+"""
+End-to-end scraper throughput benchmark
+Runs the Transfermarkt scraper, linkteam and the Playwright fixtures crawler against the local
+replay server and reports pages/sec, p50/p95 latency and CPU time per page
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import time
+
+import requests
+
+import linkteam
+import scrape_esperance_2012_2025_all_seasons as transfermarkt
+from page_archive import ARCHIVE_DIR, PageArchive
+from replay_server import ReplayServer, use_replay
+
+class LatencyRecorder:
+    """requests response hook collecting per-request latency and status codes"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+
+    def hook(self, response, *args, **kwargs):
+        self.latencies.append(response.elapsed.total_seconds())
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+
+    def attach(self, session):
+        session.hooks['response'].append(self.hook)
+        return session
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def run_stage(name, func, verbose=False):
+    """Time one scraper run; func returns a LatencyRecorder-like object"""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with output:
+        recorder = func()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    pages = len(recorder.latencies)
+    return {
+        'stage': name,
+        'pages': pages,
+        'wall_s': round(wall, 3),
+        'pages_per_s': round(pages / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(recorder.latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(recorder.latencies, 95) * 1000, 1),
+        'cpu_ms_per_page': round(cpu / pages * 1000, 2) if pages else 0.0,
+        'statuses': recorder.statuses,
+    }
+
+def recorded_targets(archive_dir):
+    """Seasons, countries and Flashscore team pages available in the archive"""
+    seasons, countries, team_pages = set(), set(), set()
+    country_by_code = {}
+    for country in ['Tunisia', 'Algeria', 'Libya', 'Egypt', 'Nigeria', 'Ghana', "Cote d'Ivoire",
+                    'Kuwait', 'Iraq', 'Saudi Arabia', 'Brazil']:
+        country_by_code[linkteam.get_country_code(country)] = country
+
+    squad_pattern = re.compile(rf"/kader/verein/{transfermarkt.CLUB_ID}/saison_id/(\d+)")
+    for url in PageArchive(archive_dir).latest_entries():
+        found = squad_pattern.search(url)
+        if found:
+            seasons.add(int(found.group(1)))
+        found = re.match(r'https://www\.flashscore\.com/football/([a-z-]+)/$', url)
+        if found and found.group(1) in country_by_code:
+            countries.add(country_by_code[found.group(1)])
+        if re.match(r'https://www\.flashscore\.com/team/[^/]+/[^/]+/(fixtures|results)/$', url):
+            team_pages.add(url)
+
+    return sorted(seasons), sorted(countries), sorted(team_pages)
+
+def bench_transfermarkt(base_url, seasons):
+    recorder = LatencyRecorder()
+    session = recorder.attach(use_replay(transfermarkt.create_session(), base_url))
+    transfermarkt.THROTTLE = False
+    transfermarkt.PAGE_ARCHIVE = None
+    for year in seasons:
+        transfermarkt.scrape_season(session, year)
+    return recorder
+
+def bench_linkteam(base_url, countries):
+    recorder = LatencyRecorder()
+    session = recorder.attach(use_replay(requests.Session(), base_url))
+    for country in countries:
+        linkteam.scrape_teams_from_country_page(country, session=session)
+    return recorder
+
+def bench_playwright(base_url, team_pages, max_pages):
+    from browser_pool import BrowserPool
+    from fixtures_crawler import crawl_page
+
+    recorder = LatencyRecorder()
+
+    async def timed_crawl(pool, page_url):
+        start = time.perf_counter()
+        await crawl_page(pool, page_url, page_url, '', 'results' if '/results/' in page_url else 'fixtures')
+        recorder.latencies.append(time.perf_counter() - start)
+
+    async def run():
+        async with BrowserPool(profile='benchmark', max_pages=max_pages, replay_url=base_url) as pool:
+            await asyncio.gather(*(timed_crawl(pool, u) for u in team_pages))
+
+    asyncio.run(run())
+    return recorder
+
+def print_report(results):
+    print(f"\n{'='*96}")
+    print("📊 THROUGHPUT REPORT")
+    print(f"{'='*96}")
+    print(f"{'Stage':<14}{'Pages':>7}{'Wall s':>9}{'Pages/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'CPU ms/page':>13}  Statuses")
+    for r in results:
+        print(f"{r['stage']:<14}{r['pages']:>7}{r['wall_s']:>9}{r['pages_per_s']:>10}{r['p50_ms']:>10}"
+              f"{r['p95_ms']:>10}{r['cpu_ms_per_page']:>13}  {r['statuses']}")
+    print("CPU time is this Python process only; the browser's own CPU is not included for 'playwright'.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the local replay server")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--latency', type=float, default=50, help="Replay base latency in ms")
+    parser.add_argument('--jitter', type=float, default=20, help="Replay latency jitter in ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument('--stages', nargs='*', default=['transfermarkt', 'linkteam', 'playwright'])
+    parser.add_argument('--max-pages', type=int, default=4, help="Concurrent pages for the Playwright stage")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Keep the scrapers' own output")
+    args = parser.parse_args()
+
+    seasons, countries, team_pages = recorded_targets(args.archive_dir)
+    print(f"📼 Recorded: {len(seasons)} seasons, {len(countries)} country pages, {len(team_pages)} team pages")
+
+    server = ReplayServer(args.archive_dir, port=0, latency_ms=args.latency, jitter_ms=args.jitter,
+                          error_rate=args.error_rate, seed=1).start()
+    results = []
+    try:
+        if 'transfermarkt' in args.stages and seasons:
+            results.append(run_stage('transfermarkt', lambda: bench_transfermarkt(server.base_url, seasons), args.verbose))
+        if 'linkteam' in args.stages and countries:
+            results.append(run_stage('linkteam', lambda: bench_linkteam(server.base_url, countries), args.verbose))
+        if 'playwright' in args.stages and team_pages:
+            results.append(run_stage('playwright', lambda: bench_playwright(server.base_url, team_pages, args.max_pages),
+                                     args.verbose))
+    finally:
+        server.stop()
+
+    print_report(results)
+    print(f"Replay server: {server.stats}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
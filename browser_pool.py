@@ -0,0 +1,147 @@
+"""
+Shared Playwright browser pool for the Flashscore scrapers
+One persistent headless context per profile, with heavy and third-party resources blocked
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+# Configuration
+BROWSER_PROFILE_DIR = ".browser_profile"
+MAX_PAGES = 8  # pages open at the same time in one pool
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Resource types the scrapers never read
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Ads, analytics and tracking hosts loaded by Flashscore
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'googletagservices.com',
+    'doubleclick.net', 'googlesyndication.com', 'adservice.google.com',
+    'amazon-adsystem.com', 'adnxs.com', 'criteo.com', 'criteo.net',
+    'scorecardresearch.com', 'quantserve.com', 'chartbeat.com', 'hotjar.com',
+    'facebook.net', 'facebook.com', 'taboola.com', 'outbrain.com',
+    'pubmatic.com', 'rubiconproject.com', 'casalemedia.com', 'openx.net',
+)
+
+def is_blocked_request(resource_type, request_url):
+    """True for images, media, fonts and requests to ad/analytics hosts"""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request_url).hostname or ''
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in BLOCKED_HOSTS)
+
+class BrowserPool:
+    """
+    A persistent Chromium context shared by every page of a run.
+    Use as `async with BrowserPool() as pool:` then `async with pool.page() as page:`.
+    """
+
+    def __init__(self, profile='default', headless=True, max_pages=MAX_PAGES, block_resources=True,
+                 user_agent=USER_AGENT, replay_url=None, archive=None):
+        self.user_data_dir = os.path.join(BROWSER_PROFILE_DIR, profile)
+        self.headless = headless
+        self.block_resources = block_resources
+        self.user_agent = user_agent
+        # replay_url: answer every request from a local replay_server instead of the real sites
+        # archive: PageArchive receiving every response the pages load (to record a replay)
+        self.replay_url = replay_url.rstrip('/') if replay_url else None
+        self.archive = archive
+        self.slots = asyncio.Semaphore(max_pages) if max_pages else None
+        self.blocked_count = 0
+        self.playwright = None
+        self.context = None
+
+    async def start(self):
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        from playwright.async_api import async_playwright  # deferred so importing the pool stays cheap
+
+        self.playwright = await async_playwright().start()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            self.user_data_dir,
+            headless=self.headless,
+            user_agent=self.user_agent,
+            args=["--no-sandbox", "--disable-dev-shm-usage"],
+        )
+        if self.block_resources or self.replay_url:
+            # Installed once on the context so every page opened from the pool inherits it
+            await self.context.route("**/*", self._intercept)
+        if self.archive is not None:
+            self.context.on("response", self._record)
+        return self
+
+    async def close(self):
+        if self.context:
+            await self.context.close()
+            self.context = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        if self.blocked_count:
+            print(f"🧹 Browser pool blocked {self.blocked_count} heavy/tracking requests")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page; waits when max_pages pages are already open"""
+        if self.slots:
+            await self.slots.acquire()
+        page = None
+        try:
+            page = await self.context.new_page()
+            yield page
+        finally:
+            if page:
+                await page.close()
+            if self.slots:
+                self.slots.release()
+
+    async def _intercept(self, route):
+        request = route.request
+        if self.block_resources and is_blocked_request(request.resource_type, request.url):
+            self.blocked_count += 1
+            await route.abort()
+        elif self.replay_url:
+            from replay_server import replay_path
+
+            try:
+                response = await route.fetch(url=self.replay_url + replay_path(request.url))
+                await route.fulfill(response=response)
+            except Exception:
+                await route.abort()
+        else:
+            await route.continue_()
+
+    async def _record(self, response):
+        if response.request.resource_type not in ('document', 'script', 'xhr', 'fetch', 'stylesheet'):
+            return
+        try:
+            body = await response.body()
+            self.archive.store(response.url, response.status, response.headers.get('content-type', ''), body)
+        except Exception:
+            pass  # redirects and aborted requests have no body
+
+async def accept_cookies(page):
+    """Dismiss the OneTrust cookie banner if it is shown (the persistent profile remembers it)"""
+    try:
+        # Checked once, without waiting: pages are already rendered when this is called
+        button = await page.query_selector('button#onetrust-accept-btn-handler')
+        if button and await button.is_visible():
+            await button.click()
+            print("✅ Accepted cookies")
+            return True
+    except Exception:
+        pass
+    print("ℹ️ No cookie banner found")
+    return False
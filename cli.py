@@ -0,0 +1,49 @@
+"""
+Single command line entry point for the scrapers
+Each subcommand imports its module only when it runs, so light commands such as `filter`
+don't pay for requests, BeautifulSoup or Playwright at startup
+"""
+
+import argparse
+import importlib
+import sys
+
+# Subcommand -> (module, function, help); the function parses its own arguments from sys.argv
+COMMANDS = {
+    'squads': ('scrape_esperance_2012_2025_all_seasons', 'main', "Scrape Esperance squads from Transfermarkt"),
+    'graph': ('crawl_frontier', 'main', "Expand the player graph from former players' current clubs"),
+    'league': ('squad_crawler', 'main', "Crawl squad histories of every club in the registry"),
+    'values': ('market_value_enrichment', 'main', "Fetch market value and transfer histories of the dataset's players"),
+    'links': ('linkteam', 'main', "Find Flashscore links for the clubs in a player CSV"),
+    'fixtures': ('fixtures_crawler', 'main', "Crawl Flashscore fixtures and results for the league"),
+    'live': ('livescorescrap', 'main', "Follow live Flashscore matches"),
+    'timeline': ('timeline_store', 'main', "Replay and export recorded live match timelines"),
+    'queue': ('work_queue', 'main', "Durable work queue: enqueue, work, status, export"),
+    'schedule': ('job_scheduler', 'main', "Run live monitors around kickoff and the periodic jobs"),
+    'refresh': ('refresh_scheduler', 'main', "Re-check the current club of players whose refresh is due"),
+    'standings': ('standings_harvester', 'main', "Harvest Flashscore league tables"),
+    'stats': ('dataset_aggregates', 'main', "Show the saved aggregates of a player dataset"),
+    'filter': ('filter_esperance_2012_2025_tunisia_clubs', 'main', "Keep only players at Tunisian clubs"),
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Tunisian football scrapers",
+        epilog="Run 'cli.py COMMAND --help' for the options of a command.",
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='COMMAND',
+                        help='; '.join(f"{name}: {info[2]}" for name, info in COMMANDS.items()))
+
+    # Only the first word is ours; everything after it belongs to the subcommand
+    args = parser.parse_args(argv[:1])
+    module_name, function_name, _ = COMMANDS[args.command]
+
+    module = importlib.import_module(module_name)
+    sys.argv = [f"{parser.prog} {args.command}"] + argv[1:]
+    return getattr(module, function_name)()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Club registry for the multi-club crawlers
+Maps each league club of tunisian_league_teams.csv to its Transfermarkt slug and ID; missing IDs
+are resolved through Transfermarkt's quick search and written back to club_registry.csv
+"""
+
+import argparse
+import csv
+import os
+import re
+from dataclasses import dataclass, asdict, fields
+from urllib.parse import quote_plus
+
+from bs4 import BeautifulSoup
+
+# Configuration
+REGISTRY_FILE = "club_registry.csv"
+TEAMS_FILE = "tunisian_league_teams.csv"
+SEARCH_URL = "https://www.transfermarkt.com/schnellsuche/ergebnis/schnellsuche?query={query}"
+LEAGUE_COUNTRY = "Tunisia"
+
+CLUB_LINK_PATTERN = re.compile(r'^/([^/]+)/startseite/verein/(\d+)')
+
+@dataclass
+class Club:
+    name: str
+    flashscore_link: str = ''
+    tm_slug: str = ''
+    tm_id: str = ''
+    tm_name: str = ''
+
+    @property
+    def resolved(self):
+        return bool(self.tm_slug and self.tm_id)
+
+REGISTRY_FIELDS = [f.name for f in fields(Club)]
+
+def load_registry(filename=REGISTRY_FILE):
+    """Clubs of the registry, in file order"""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r', encoding='utf-8') as f:
+        return [Club(**{name: row.get(name, '') or '' for name in REGISTRY_FIELDS}) for row in csv.DictReader(f)]
+
+def save_registry(clubs, filename=REGISTRY_FILE):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REGISTRY_FIELDS)
+        writer.writeheader()
+        writer.writerows(asdict(c) for c in clubs)
+
+def merge_league_teams(clubs, teams_file=TEAMS_FILE):
+    """Add clubs of the league team list that the registry doesn't know yet"""
+    known = {c.name for c in clubs}
+    with open(teams_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = row.get('Team Name', '').strip()
+            if name and name not in known:
+                clubs.append(Club(name=name, flashscore_link=row.get('Team Link', '').strip()))
+                known.add(name)
+    return clubs
+
+def parse_club_search(html):
+    """(slug, id, name, country) for each club row of a quick-search result page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    seen = set()
+    for link in soup.find_all('a', href=CLUB_LINK_PATTERN):
+        slug, club_id = CLUB_LINK_PATTERN.match(link['href']).groups()
+        name = link.get('title') or link.get_text(strip=True)
+        if club_id in seen or not name:
+            continue
+        seen.add(club_id)
+        # The name sits in a nested table; the country flag is in a cell of the outer result row
+        flag = None
+        for row in link.find_parents('tr'):
+            flag = row.find('img', class_='flaggenrahmen')
+            if flag:
+                break
+        results.append((slug, club_id, name, flag.get('title', '') if flag else ''))
+    return results
+
+def pick_club(results, country=LEAGUE_COUNTRY):
+    """First search hit from the league's country, None when there is none (no guessing)"""
+    for slug, club_id, name, club_country in results:
+        if club_country == country:
+            return slug, club_id, name
+    return None
+
+def resolve_club(session, club, fetch_page):
+    """Fill in the Transfermarkt slug/ID of a club from the quick search; returns True on success"""
+    url = SEARCH_URL.format(query=quote_plus(club.name))
+    try:
+        response = fetch_page(session, url, timeout=20)
+        if response.status_code != 200:
+            print(f"   ❌ {club.name}: search failed (HTTP {response.status_code})")
+            return False
+        match = pick_club(parse_club_search(response.text))
+    except Exception as e:
+        print(f"   ❌ {club.name}: search failed ({e})")
+        return False
+
+    if not match:
+        print(f"   ⚠️ {club.name}: no {LEAGUE_COUNTRY} club in the search results, fill it in by hand")
+        return False
+
+    club.tm_slug, club.tm_id, club.tm_name = match
+    print(f"   ✅ {club.name} -> {club.tm_name} ({club.tm_slug}/{club.tm_id})")
+    return True
+
+def resolve_missing(clubs, session=None):
+    """Resolve every club without a Transfermarkt ID; returns how many were resolved"""
+    from scrape_esperance_2012_2025_all_seasons import create_session, fetch_page, polite_sleep
+
+    session = session or create_session()
+    resolved = 0
+    for club in clubs:
+        if club.resolved:
+            continue
+        polite_sleep(1.0, 2.0)
+        resolved += resolve_club(session, club, fetch_page)
+    return resolved
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the club registry used by the multi-club crawlers")
+    parser.add_argument('--registry', default=REGISTRY_FILE)
+    parser.add_argument('--teams', default=TEAMS_FILE, help="League team list to merge into the registry")
+    parser.add_argument('--resolve', action='store_true', help="Look up missing Transfermarkt IDs")
+    args = parser.parse_args()
+
+    clubs = merge_league_teams(load_registry(args.registry), args.teams)
+    if args.resolve:
+        print(f"🔎 Resolving {sum(not c.resolved for c in clubs)} clubs on Transfermarkt")
+        resolve_missing(clubs)
+    save_registry(clubs, args.registry)
+
+    print(f"💾 {len(clubs)} clubs in {args.registry} ({sum(c.resolved for c in clubs)} with a Transfermarkt ID)")
+    for club in clubs:
+        if not club.resolved:
+            print(f"   ⚠️ {club.name}: no Transfermarkt ID yet")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Crawl frontier for the regional player graph
+Expands from the current clubs of former Esperance players to those clubs' squads, their players'
+current clubs and so on, up to a depth limit. Pages are taken from a priority queue (league
+relevance and staleness), a compact hashed seen-set persists across runs, and every host has a
+request budget. Player-club edges are written to a CSV
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import os
+import re
+import struct
+import time
+from urllib.parse import urlparse
+
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+
+# Configuration
+DATASET_FILE = "esperance_2012_2025_all_seasons.csv"
+SEEN_FILE = "frontier_seen.bin"
+EDGES_FILE = "player_graph_edges.csv"
+MAX_DEPTH = 2  # club hops away from the seed clubs
+HOST_BUDGET = 300  # requests per host per run
+DEFAULT_HOST_BUDGETS = {'www.transfermarkt.com': HOST_BUDGET}
+REVISIT_DAYS = 30  # a page seen more recently than this is not fetched again
+DEPTH_PENALTY = 0.5  # priority lost per hop
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # answers after which a page is queued again instead of marked seen
+MAX_RETRIES = 2  # further attempts at a page within one run
+RETRY_DELAY = 30  # seconds to wait after a throttled or failed fetch, doubled at every retry of the page
+BLOCKED_STATUS = 403  # the host refuses us: stop sending to it for the rest of the run
+
+# How much a club's league matters for the Tunisian dataset (unknown countries get DEFAULT_RELEVANCE)
+LEAGUE_RELEVANCE = {
+    'Tunisia': 1.0,
+    'Algeria': 0.8, 'Libya': 0.8, 'Morocco': 0.7, 'Egypt': 0.7,
+    'Saudi Arabia': 0.6, 'Qatar': 0.6, 'United Arab Emirates': 0.6, 'Kuwait': 0.5, 'Iraq': 0.5,
+    'Oman': 0.5, 'Bahrain': 0.5, 'Jordan': 0.5, 'Sudan': 0.5,
+    'France': 0.4, 'Belgium': 0.4,
+}
+DEFAULT_RELEVANCE = 0.3
+
+CLUB_URL_PATTERN = re.compile(r'transfermarkt\.[a-z.]+/([^/]+)/[a-z]+/verein/(\d+)')
+EDGE_FIELDS = ['player_url', 'player', 'club_id', 'club', 'club_country', 'season', 'relation', 'depth']
+
+_RECORD = struct.Struct('<8sI')  # 8-byte URL digest + day number of the last visit
+
+def url_key(url):
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+
+def today():
+    return int(time.time() // 86400)
+
+class SeenStore:
+    """
+    Visited URLs as 8-byte hashes with the day they were fetched (12 bytes per URL on disk).
+    New visits are appended; the file is rewritten without duplicates on compact().
+    """
+
+    def __init__(self, path=SEEN_FILE):
+        self.path = path
+        self.seen = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % _RECORD.size
+            for key, day in _RECORD.iter_unpack(data[:usable]):
+                self.seen[key] = max(day, self.seen.get(key, 0))
+        self.file = open(path, 'ab')
+
+    def last_seen(self, url):
+        """Day of the last visit, or None"""
+        return self.seen.get(url_key(url))
+
+    def mark(self, url, day=None):
+        day = day or today()
+        key = url_key(url)
+        self.seen[key] = day
+        self.file.write(_RECORD.pack(key, day))
+
+    def compact(self):
+        self.file.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(_RECORD.pack(key, day) for key, day in self.seen.items()))
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, 'ab')
+
+    def close(self):
+        self.file.close()
+
+    def __len__(self):
+        return len(self.seen)
+
+def club_from_url(url):
+    """(slug, id) from any Transfermarkt club URL, None otherwise"""
+    found = CLUB_URL_PATTERN.search(url or '')
+    return found.groups() if found else None
+
+def league_relevance(country):
+    return LEAGUE_RELEVANCE.get(country, DEFAULT_RELEVANCE)
+
+class CrawlFrontier:
+    """Priority queue of pages to fetch, with a seen-set, per-host budgets and a depth limit"""
+
+    def __init__(self, seen, max_depth=MAX_DEPTH, host_budgets=None, default_budget=HOST_BUDGET):
+        self.seen = seen
+        self.max_depth = max_depth
+        self.host_budgets = dict(DEFAULT_HOST_BUDGETS if host_budgets is None else host_budgets)
+        self.default_budget = default_budget
+        self.heap = []
+        self.queued = set()
+        self.counter = 0
+        self.skipped = {'seen': 0, 'depth': 0, 'budget': 0, 'blocked': 0}
+        self.blocked_hosts = set()
+
+    def priority(self, url, country, depth):
+        """Higher first: relevant leagues, pages never or long ago visited, few hops from the seeds"""
+        last = self.seen.last_seen(url)
+        staleness = 1.0 if last is None else min(1.0, (today() - last) / (REVISIT_DAYS * 4))
+        return league_relevance(country) * (1 + staleness) - depth * DEPTH_PENALTY
+
+    def push(self, url, kind, depth, meta):
+        """Queue a page unless it is too deep, already queued or visited within REVISIT_DAYS"""
+        if depth > self.max_depth:
+            self.skipped['depth'] += 1
+            return False
+        if url in self.queued:
+            return False
+        last = self.seen.last_seen(url)
+        if last is not None and today() - last < REVISIT_DAYS:
+            self.skipped['seen'] += 1
+            return False
+
+        self._enqueue(url, kind, depth, meta)
+        return True
+
+    def _enqueue(self, url, kind, depth, meta):
+        self.counter += 1
+        heapq.heappush(self.heap, (-self.priority(url, meta.get('country', ''), depth), self.counter,
+                                   url, kind, depth, meta))
+        self.queued.add(url)
+
+    def requeue(self, url, kind, depth, meta):
+        """Put back a page whose fetch was throttled or failed, giving its host the budget unit back"""
+        host = urlparse(url).hostname or ''
+        self.host_budgets[host] = self.host_budgets.get(host, self.default_budget) + 1
+        self._enqueue(url, kind, depth, dict(meta, attempts=meta.get('attempts', 0) + 1))
+
+    def block_host(self, host):
+        """Stop handing out pages of a host for the rest of the run (they stay unseen for the next one)"""
+        self.blocked_hosts.add(host)
+
+    def pop(self):
+        """Next page whose host still has budget (spending one unit of it), None when done"""
+        while self.heap:
+            _, _, url, kind, depth, meta = heapq.heappop(self.heap)
+            host = urlparse(url).hostname or ''
+            if host in self.blocked_hosts:
+                self.skipped['blocked'] += 1
+                continue
+            budget = self.host_budgets.get(host, self.default_budget)
+            if budget <= 0:
+                self.skipped['budget'] += 1
+                continue
+            self.host_budgets[host] = budget - 1
+            return url, kind, depth, meta
+        return None
+
+    def __len__(self):
+        return len(self.heap)
+
+def seed_clubs(frontier, dataset_file, year):
+    """Queue the current-season squad page of every current club in the dataset (depth 1)"""
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    seeded = 0
+    with open(dataset_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            club = club_from_url(row.get('Current_Club_URL', ''))
+            if not club or club[1] == str(transfermarkt.CLUB_ID):
+                continue
+            url = transfermarkt.squad_page_url(year, *club)
+            meta = {'club': row.get('Current_Club', ''), 'club_id': club[1], 'country': row.get('Current_Club_Country', '')}
+            seeded += frontier.push(url, 'squad', 1, meta)
+    return seeded
+
+def crawl(frontier, edges_writer, year, session=None):
+    """Fetch pages in priority order until the frontier is empty or every budget is spent"""
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    session = session or transfermarkt.create_session()
+    fetched = 0
+    while True:
+        item = frontier.pop()
+        if item is None:
+            break
+        url, kind, depth, meta = item
+        host = urlparse(url).hostname or ''
+
+        try:
+            transfermarkt.polite_sleep(0.8, 1.5)
+            response = transfermarkt.fetch_page(session, url, timeout=30)
+            status, retry_after = response.status_code, response.headers.get('Retry-After')
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            status, retry_after = None, None
+
+        # Only a page we actually got (or one that is really gone) counts as seen
+        if status == BLOCKED_STATUS:
+            print(f"🚧 {host} answered HTTP 403, no more requests to it this run")
+            frontier.block_host(host)
+            metrics.incr('blocked_hosts')
+            continue
+        if status is None or status in RETRY_STATUSES:
+            attempts = meta.get('attempts', 0)
+            if attempts >= MAX_RETRIES:
+                if status == 429:
+                    print(f"🚧 {host} is still throttling after {attempts} retries, no more requests to it this run")
+                    frontier.block_host(host)
+                else:
+                    print(f"❌ {url}: giving up for this run")
+                metrics.incr('failed_pages')
+                continue
+            delay = max(RETRY_DELAY * 2 ** attempts, float(retry_after) if (retry_after or '').isdigit() else 0)
+            print(f"⏳ {url}: {f'HTTP {status}' if status else 'failed'}, retrying in {delay:.0f}s")
+            frontier.requeue(url, kind, depth, meta)
+            metrics.incr('retried_pages')
+            with metrics.stage('sleep'):
+                time.sleep(delay)
+            continue
+        frontier.seen.mark(url)
+        if status != 200:
+            print(f"❌ {url}: HTTP {status}")
+            continue
+        fetched += 1
+
+        if kind == 'squad':
+            squad = transfermarkt.parse_squad_rows(response.text) or []
+            for row in squad:
+                edges_writer.writerow({
+                    'player_url': row['Profile_URL'], 'player': row['Player'], 'club_id': meta['club_id'],
+                    'club': meta['club'], 'club_country': meta['country'], 'season': f"{year}/{year+1}",
+                    'relation': 'squad', 'depth': depth,
+                })
+                frontier.push(row['Profile_URL'], 'profile', depth, dict(meta, player=row['Player']))
+            metrics.incr('squads')
+            print(f"✅ [{depth}] {meta['club']} ({meta['country'] or '?'}): {len(squad)} players, {len(frontier)} queued")
+
+        elif kind == 'profile':
+            details = transfermarkt.parse_player_details(response.text)
+            club = club_from_url(details.get('Current_Club_URL', ''))
+            metrics.incr('profiles')
+            if not club:
+                continue
+            country = details.get('Current_Club_Country', '')
+            edges_writer.writerow({
+                'player_url': url, 'player': meta.get('player', ''), 'club_id': club[1],
+                'club': details.get('Current_Club', ''), 'club_country': country, 'season': '',
+                'relation': 'current_club', 'depth': depth,
+            })
+            # A player who moved on leads one hop further out
+            if club[1] != meta['club_id']:
+                frontier.push(transfermarkt.squad_page_url(year, *club), 'squad', depth + 1,
+                              {'club': details.get('Current_Club', ''), 'club_id': club[1], 'country': country})
+
+    return fetched
+
+def main():
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    parser = argparse.ArgumentParser(description="Expand the player graph from former players' current clubs")
+    parser.add_argument('--dataset', default=DATASET_FILE, help="CSV whose Current_Club_URL columns seed the crawl")
+    parser.add_argument('--seen', default=SEEN_FILE)
+    parser.add_argument('--edges', default=EDGES_FILE)
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH)
+    parser.add_argument('--host-budget', type=int, default=HOST_BUDGET, help="Requests per host this run")
+    parser.add_argument('--season', type=int, default=transfermarkt.CURRENT_YEAR, help="Squad season to crawl")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics.reset('frontier')
+
+    seen = SeenStore(args.seen)
+    frontier = CrawlFrontier(seen, max_depth=args.max_depth, host_budgets={}, default_budget=args.host_budget)
+    print(f"🧭 {seed_clubs(frontier, args.dataset, args.season)} seed clubs, {len(seen)} URLs already seen")
+
+    new_file = not os.path.exists(args.edges)
+    try:
+        with open(args.edges, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=EDGE_FIELDS)
+            if new_file:
+                writer.writeheader()
+            fetched = crawl(frontier, writer, args.season)
+    finally:
+        seen.compact()
+        seen.close()
+
+    print(f"✅ {fetched} pages fetched, {len(frontier)} left in the frontier, skipped: {frontier.skipped}")
+    print(f"💾 Edges appended to {args.edges}, {len(seen)} URLs in {args.seen}")
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Materialised dataset aggregates
+Field completeness, players per current club and country, squad size per season and the
+club-to-club flow of former players, kept up to date record by record as the scraper produces
+them and saved next to the dataset CSV, so reports read counters instead of rescanning every row
+"""
+
+import argparse
+import csv
+import json
+import os
+from collections import Counter
+
+# Configuration
+DATASET_FILE = "esperance_2012_2025_all_seasons.csv"
+SOURCE_CLUB = "Esperance de Tunis"  # club the players left, for datasets without a Club column
+COMPLETENESS_FIELDS = ['Age', 'Height', 'Position', 'Nationality', 'Current_Club']
+NO_CLUB_VALUES = ('', 'Without Club')  # Current_Club values that don't count as filled
+
+def aggregates_path(dataset_file):
+    return os.path.splitext(dataset_file)[0] + '.aggregates.json'
+
+def player_key(record):
+    """Same identity as remove_duplicates: profile URL, or the name when there is none"""
+    return record.get('Profile_URL') or f"name_{record.get('Player', '')}"
+
+def season_year(record):
+    try:
+        return int((record.get('Season') or '').split('/')[0])
+    except ValueError:
+        return 0
+
+def club_category(record):
+    """'retired', 'without_club', 'tunisia' or 'abroad' (the split used by the Tunisia filter)"""
+    club = (record.get('Current_Club') or '').strip()
+    if club == 'Retired':
+        return 'retired'
+    if club == 'Without Club':
+        return 'without_club'
+    if (record.get('Current_Club_Country') or '').strip() == 'Tunisia':
+        return 'tunisia'
+    return 'abroad'
+
+def filled_fields(record):
+    filled = []
+    for field in COMPLETENESS_FIELDS:
+        value = record.get(field) or ''
+        if value and not (field == 'Current_Club' and value in NO_CLUB_VALUES):
+            filled.append(field)
+    return filled
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+class DatasetAggregates:
+    """
+    Counters over a player dataset. Season sizes count every (player, season) squad entry;
+    the other counters count each player once, by their most recent season (like remove_duplicates).
+    """
+
+    def __init__(self, source_club=SOURCE_CLUB):
+        self.source_club = source_club
+        self.entries = {}  # "player key|year" -> season label
+        self.latest = {}  # player key -> contribution of the player's most recent record
+        self.season_sizes = Counter()
+        self.completeness = Counter()
+        self.clubs = Counter()  # "country|club" -> players
+        self.countries = Counter()
+        self.categories = Counter()
+        self.flows = Counter()  # "from club|to club" -> players
+        self.source = None  # signature of the CSV these counters describe
+
+    def _contribution(self, record, year):
+        return {
+            'year': year,
+            'filled': filled_fields(record),
+            'club': f"{(record.get('Current_Club_Country') or '').strip()}|{(record.get('Current_Club') or '').strip()}",
+            'country': (record.get('Current_Club_Country') or '').strip(),
+            'category': club_category(record),
+            'flow': f"{record.get('Club') or self.source_club}|{(record.get('Current_Club') or '').strip()}",
+        }
+
+    def _apply(self, contribution, sign):
+        self.completeness.update({field: sign for field in contribution['filled']})
+        self.clubs[contribution['club']] += sign
+        self.countries[contribution['country']] += sign
+        self.categories[contribution['category']] += sign
+        self.flows[contribution['flow']] += sign
+
+    def upsert(self, record):
+        """Add a squad entry, or replace the stored one for the same player and season"""
+        key, year = player_key(record), season_year(record)
+        entry_key = f"{key}|{year}"
+
+        old_season = self.entries.get(entry_key)
+        if old_season is not None:
+            self.season_sizes[old_season] -= 1
+        self.entries[entry_key] = record.get('Season', '')
+        self.season_sizes[record.get('Season', '')] += 1
+
+        # Player-level counters only move when this entry is (or replaces) the player's most recent one
+        current = self.latest.get(key)
+        if current is not None and current['year'] > year:
+            return
+        if current is not None:
+            self._apply(current, -1)
+        contribution = self._contribution(record, year)
+        self._apply(contribution, +1)
+        self.latest[key] = contribution
+
+    def upsert_many(self, records):
+        for record in records:
+            self.upsert(record)
+
+    # Reports (read straight from the counters)
+
+    @property
+    def players(self):
+        return len(self.latest)
+
+    def completeness_report(self):
+        """{field: (filled, players)}"""
+        return {field: (self.completeness[field], self.players) for field in COMPLETENESS_FIELDS}
+
+    def club_counts(self, country=None):
+        """[(club, players)] most common first, optionally only the clubs of one country"""
+        counts = []
+        for key, count in self.clubs.most_common():
+            club_country, club = key.split('|', 1)
+            if count > 0 and (country is None or club_country == country):
+                counts.append((club, count))
+        return counts
+
+    def season_counts(self):
+        return sorted((season, count) for season, count in self.season_sizes.items() if count > 0)
+
+    def top_flows(self, limit=10):
+        return [(tuple(key.split('|', 1)), count) for key, count in self.flows.most_common(limit) if count > 0]
+
+    # Persistence
+
+    def to_dict(self):
+        return {
+            'source_club': self.source_club,
+            'source': self.source,
+            'entries': self.entries,
+            'latest': self.latest,
+            'season_sizes': self.season_sizes,
+            'completeness': self.completeness,
+            'clubs': self.clubs,
+            'countries': self.countries,
+            'categories': self.categories,
+            'flows': self.flows,
+        }
+
+    def save(self, dataset_file):
+        """Write the counters next to the dataset, stamped with the CSV's size and mtime"""
+        self.source = file_signature(dataset_file)
+        with open(aggregates_path(dataset_file), 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, dataset_file):
+        """Saved aggregates of a dataset, or None when missing or older than the CSV"""
+        path = aggregates_path(dataset_file)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not os.path.exists(dataset_file) or data.get('source') != file_signature(dataset_file):
+            return None
+
+        aggregates = cls(data['source_club'])
+        aggregates.source = data['source']
+        aggregates.entries = data['entries']
+        aggregates.latest = data['latest']
+        for name in ('season_sizes', 'completeness', 'clubs', 'countries', 'categories', 'flows'):
+            setattr(aggregates, name, Counter(data[name]))
+        return aggregates
+
+    @classmethod
+    def for_dataset(cls, dataset_file):
+        """
+        Saved aggregates when they match the CSV, otherwise rebuilt from it once (and saved).
+        A rebuilt one only knows the rows of the CSV, so its season sizes count one season per player.
+        """
+        aggregates = cls.load(dataset_file)
+        if aggregates is None:
+            print(f"🔄 Building aggregates for {dataset_file}")
+            aggregates = cls()
+            with open(dataset_file, 'r', encoding='utf-8') as f:
+                aggregates.upsert_many(csv.DictReader(f))
+            aggregates.save(dataset_file)
+        return aggregates
+
+def print_report(aggregates, flows=10):
+    total = aggregates.players
+    print(f"📊 {total} players")
+    for field, (count, players) in aggregates.completeness_report().items():
+        print(f"   {field}: {count}/{players} ({count / players * 100 if players else 0:.1f}%)")
+
+    print("\n📅 Squad entries per season")
+    for season, count in aggregates.season_counts():
+        print(f"   {season}: {count}")
+
+    print("\n🌍 Players per current club country")
+    for country, count in aggregates.countries.most_common(10):
+        if count > 0:
+            print(f"   {country or '(none)'}: {count}")
+
+    print(f"\n🔀 Top {flows} club-to-club flows")
+    for (origin, destination), count in aggregates.top_flows(flows):
+        print(f"   {origin} → {destination or '(unknown)'}: {count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the materialised aggregates of a player dataset")
+    parser.add_argument('--dataset', default=DATASET_FILE)
+    parser.add_argument('--flows', type=int, default=10, help="Number of club-to-club flows to show")
+    args = parser.parse_args()
+
+    print_report(DatasetAggregates.for_dataset(args.dataset), args.flows)
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,37 @@
+import argparse
 import csv
 
+from dataset_aggregates import DatasetAggregates
+
+# Configuration
+INPUT_FILE = "esperance_2012_2025_all_seasons.csv"
+OUTPUT_FILE = "esperance_2012_2025_tunisia_clubs.csv"
+
 def filter_tunisia_clubs(input_file, output_file):
     """
     Filter the all seasons CSV to only include players whose current club is in Tunisia.
     Excludes players who are 'Retired' or 'Without Club'.
+    The statistics come from the dataset's saved aggregates (see dataset_aggregates.py).
     """
     
     print(f"📂 Reading from: {input_file}")
     print(f"📝 Will write to: {output_file}")
     print()
     
-    tunisia_players = []
-    total_count = 0
-    tunisia_count = 0
-    retired_count = 0
-    without_club_count = 0
-    other_country_count = 0
+    aggregates = DatasetAggregates.for_dataset(input_file)
+    total_count = aggregates.players
+    tunisia_count = aggregates.categories['tunisia']
+    retired_count = aggregates.categories['retired']
+    without_club_count = aggregates.categories['without_club']
+    other_country_count = aggregates.categories['abroad']
     
     with open(input_file, 'r', encoding='utf-8') as infile:
         reader = csv.DictReader(infile)
-        
-        for row in reader:
-            total_count += 1
-            
-            current_club = row.get('Current_Club', '').strip()
-            current_club_country = row.get('Current_Club_Country', '').strip()
-            
-            # Count different categories
-            if current_club == 'Retired':
-                retired_count += 1
-            elif current_club == 'Without Club':
-                without_club_count += 1
-            elif current_club_country == 'Tunisia':
-                tunisia_count += 1
-                tunisia_players.append(row)
-            else:
-                other_country_count += 1
+        tunisia_players = [
+            row for row in reader
+            if row.get('Current_Club', '').strip() not in ('Retired', 'Without Club')
+            and row.get('Current_Club_Country', '').strip() == 'Tunisia'
+        ]
     
     # Write filtered data to new CSV
     if tunisia_players:
@@ -68,22 +64,21 @@ def filter_tunisia_clubs(input_file, output_file):
     if tunisia_players:
         print("🇹🇳 TUNISIA CLUBS BREAKDOWN")
         print("=" * 60)
-        club_counts = {}
-        for player in tunisia_players:
-            club = player['Current_Club']
-            club_counts[club] = club_counts.get(club, 0) + 1
         
-        # Sort by count descending
-        sorted_clubs = sorted(club_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        for club, count in sorted_clubs:
+        # Sorted by count descending
+        for club, count in aggregates.club_counts(country='Tunisia'):
             print(f"{club}: {count} player(s)")
         print("=" * 60)
 
-if __name__ == "__main__":
-    input_file = "esperance_2012_2025_all_seasons.csv"
-    output_file = "esperance_2012_2025_tunisia_clubs.csv"
+def main():
+    parser = argparse.ArgumentParser(description="Keep only the players whose current club is in Tunisia")
+    parser.add_argument('--input', default=INPUT_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
     
-    filter_tunisia_clubs(input_file, output_file)
+    filter_tunisia_clubs(args.input, args.output)
     
     print("\n✨ Done! Check the output file for Tunisia-based players only.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Fixture store with incremental sync
+Keeps the last known version of every match and records only inserts, updates and status transitions
+"""
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict, replace
+from datetime import datetime, timezone
+
+from fixtures_crawler import MATCH_FIELDS, MatchRecord
+
+# Configuration
+STORE_FILE = "fixtures.db"
+CHANGES_FILE = "fixture_changes.jsonl"
+
+# Fields that describe where a row was seen rather than the match itself
+UNHASHED_FIELDS = {'source'}
+
+def record_hash(record):
+    """Stable hash of a match record's content"""
+    content = {k: v for k, v in asdict(record).items() if k not in UNHASHED_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def fill_blanks(record, stored_values):
+    """
+    Copy of `record` with its empty fields taken from the stored version, like merge_match does within
+    one crawl: a team page leaves the season blank where the fixtures crawl filled it, and that is not a change
+    """
+    missing = {
+        name: stored_values[name] for name in MATCH_FIELDS
+        if name not in UNHASHED_FIELDS and not getattr(record, name) and stored_values.get(name)
+    }
+    return replace(record, **missing) if missing else record
+
+class FixtureStore:
+    """SQLite-backed store of MatchRecords keyed by Flashscore match ID"""
+
+    def __init__(self, path=STORE_FILE, changes_file=CHANGES_FILE):
+        self.path = path
+        self.changes_file = changes_file
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fixtures (
+                match_id TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                kickoff TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS fixtures_kickoff ON fixtures (kickoff)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, match_id):
+        row = self.conn.execute("SELECT record FROM fixtures WHERE match_id = ?", (match_id,)).fetchone()
+        return MatchRecord(**json.loads(row[0])) if row else None
+
+    def all(self):
+        rows = self.conn.execute("SELECT record FROM fixtures ORDER BY kickoff, match_id").fetchall()
+        return [MatchRecord(**json.loads(row[0])) for row in rows]
+
+    def kickoffs_between(self, start, end):
+        """Matches whose kickoff (ISO text, as stored) falls in [start, end)"""
+        rows = self.conn.execute(
+            "SELECT record FROM fixtures WHERE kickoff >= ? AND kickoff < ? ORDER BY kickoff, match_id", (start, end)
+        ).fetchall()
+        return [MatchRecord(**json.loads(row[0])) for row in rows]
+
+    def sync(self, records):
+        """
+        Compare records against the stored versions and write only what changed.
+        Returns the change log entries (also appended to the changes file).
+        """
+        stored = {
+            match_id: (record_hash_value, json.loads(record))
+            for match_id, record_hash_value, record in self.conn.execute("SELECT match_id, hash, record FROM fixtures")
+        }
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        changes = []
+
+        for record in records:
+            known = stored.get(record.match_id)
+            if known:
+                record = fill_blanks(record, known[1])
+            new_hash = record_hash(record)
+            if known and known[0] == new_hash:
+                continue
+
+            new_values = asdict(record)
+            if known is None:
+                change = {'op': 'insert', 'match_id': record.match_id, 'record': new_values}
+            else:
+                old_values = known[1]
+                changed = {
+                    name: [old_values.get(name, ''), new_values[name]]
+                    for name in MATCH_FIELDS
+                    if name not in UNHASHED_FIELDS and old_values.get(name, '') != new_values[name]
+                }
+                op = 'status' if 'status' in changed else 'update'
+                change = {'op': op, 'match_id': record.match_id, 'changes': changed}
+
+            change['at'] = now
+            changes.append(change)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fixtures (match_id, record, hash, status, kickoff, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (record.match_id, json.dumps(new_values, ensure_ascii=False), new_hash,
+                 record.status, record.kickoff, now),
+            )
+
+        self.conn.commit()
+
+        if changes and self.changes_file:
+            with open(self.changes_file, 'a', encoding='utf-8') as f:
+                for change in changes:
+                    f.write(json.dumps(change, ensure_ascii=False) + '\n')
+
+        return changes
+
+def print_sync_summary(changes, total):
+    """Print counts per change type and the status transitions"""
+    counts = {'insert': 0, 'update': 0, 'status': 0}
+    for change in changes:
+        counts[change['op']] += 1
+
+    print(f"🔄 Synced {total} matches: {counts['insert']} new, {counts['update']} updated, "
+          f"{counts['status']} status changes, {total - len(changes)} unchanged")
+
+    for change in changes:
+        if change['op'] == 'status':
+            old_status, new_status = change['changes']['status']
+            print(f"   {change['match_id']}: {old_status} -> {new_status}")
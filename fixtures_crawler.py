@@ -0,0 +1,299 @@
+"""
+Flashscore Fixtures & Results Crawler
+Collects fixtures and results for every team of the Tunisian league (and past league seasons)
+into one deduplicated match file
+"""
+
+import argparse
+import asyncio
+import csv
+import re
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime
+
+from browser_pool import BrowserPool, accept_cookies
+from readiness import PageNotReady, goto_ready
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+
+# Configuration
+TEAMS_FILE = "tunisian_league_teams.csv"
+OUTPUT_FILE = "tunisian_league_matches.csv"
+LEAGUE_URL = "https://www.flashscore.com/football/tunisia/ligue-professionnelle-1"
+SEASONS = ["2021-2022", "2022-2023", "2023-2024", "2024-2025"]  # archived league seasons to crawl
+MAX_SHOW_MORE_CLICKS = 50
+
+# Row states Flashscore shows in place of a kickoff time
+ROW_STATUSES = {
+    'postp.': 'postponed',
+    'canc.': 'cancelled',
+    'abn.': 'abandoned',
+    'awrd.': 'awarded',
+    'live': 'live',
+    'finished': 'finished',
+    'after pen.': 'finished',
+    'aet': 'finished',
+    'half time': 'live',
+    'break time': 'live',
+}
+
+# Clicks "Show more matches" inside the page until no more rows load, in a single round-trip
+EXPAND_JS = """
+async (maxClicks) => {
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const rowCount = () => document.querySelectorAll('.event__match').length;
+    const findMore = () => document.querySelector('.event__more')
+        || Array.from(document.querySelectorAll('a, button'))
+            .find((el) => /show more matches/i.test(el.textContent || ''));
+
+    let clicks = 0;
+    while (clicks < maxClicks) {
+        const more = findMore();
+        if (!more) break;
+        const before = rowCount();
+        more.click();
+        clicks++;
+        for (let waited = 0; rowCount() === before && waited < 5000; waited += 50) {
+            await sleep(50);
+        }
+        if (rowCount() === before) break;
+    }
+    return clicks;
+}
+"""
+
+# Reads every header and match row in document order
+EXTRACT_JS = """
+() => {
+    const text = (root, selector) => {
+        const el = root.querySelector(selector);
+        return el ? el.textContent.trim() : '';
+    };
+    const rows = [];
+    let competition = '';
+    for (const el of document.querySelectorAll('.event__header, .headerLeague, .wclLeagueHeader, .event__match')) {
+        if (!el.classList.contains('event__match')) {
+            competition = [
+                text(el, '.event__title--type, .headerLeague__category-text'),
+                text(el, '.event__title--name, .headerLeague__title-text'),
+            ].filter(Boolean).join(': ');
+            continue;
+        }
+        const link = el.querySelector('a.eventRowLink, a[href*="/match/"]');
+        rows.push({
+            row_id: el.id || '',
+            competition: competition,
+            time: text(el, '.event__time'),
+            stage: text(el, '.event__stage'),
+            home_team: text(el, '.event__homeParticipant, .event__participant--home'),
+            away_team: text(el, '.event__awayParticipant, .event__participant--away'),
+            home_score: text(el, '.event__score--home'),
+            away_score: text(el, '.event__score--away'),
+            match_url: link ? link.href : '',
+        });
+    }
+    return rows;
+}
+"""
+
+@dataclass
+class MatchRecord:
+    """One Flashscore match as stored in the matches file"""
+    match_id: str
+    season: str
+    competition: str
+    kickoff: str
+    status: str
+    home_team: str
+    away_team: str
+    home_score: str
+    away_score: str
+    match_url: str
+    source: str
+
+MATCH_FIELDS = [f.name for f in fields(MatchRecord)]
+
+def match_id_from_row(row_id, match_url=''):
+    """Flashscore row IDs look like 'g_1_4fpHHhtQ'; the last part is the match ID"""
+    if row_id:
+        return row_id.split('_')[-1]
+    found = re.search(r'/match/(?:football/)?([A-Za-z0-9]{8})', match_url)
+    return found.group(1) if found else ''
+
+def parse_kickoff(time_text, season='', now=None):
+    """
+    Turn Flashscore's "18.10. 14:00" / "18.10.2023" into an ISO date(time).
+    Rows don't show the year, so it comes from the season (Jul-Dec -> first year)
+    or, without a season, from the year that puts the date closest to today.
+    """
+    found = re.search(r'(\d{1,2})\.(\d{1,2})\.(\d{4})?\s*(\d{1,2}:\d{2})?', time_text or '')
+    if not found:
+        return ''
+
+    day, month = int(found.group(1)), int(found.group(2))
+    year = found.group(3)
+    clock = found.group(4)
+
+    if year:
+        year = int(year)
+    elif re.match(r'^\d{4}-\d{4}$', season or ''):
+        first_year, second_year = (int(y) for y in season.split('-'))
+        year = first_year if month >= 7 else second_year
+    else:
+        now = now or datetime.now()
+        candidates = [now.year - 1, now.year, now.year + 1]
+        year = min(candidates, key=lambda y: abs((datetime(y, month, min(day, 28)) - now).days))
+
+    try:
+        if clock:
+            hour, minute = (int(x) for x in clock.split(':'))
+            return datetime(year, month, day, hour, minute).isoformat(timespec='minutes')
+        return datetime(year, month, day).date().isoformat()
+    except ValueError:
+        return ''
+
+def row_status(row):
+    """Match status from the row's stage/time text, falling back to whether a score is shown"""
+    for candidate in (row.get('stage', ''), row.get('time', '')):
+        key = candidate.strip().lower()
+        if key in ROW_STATUSES:
+            return ROW_STATUSES[key]
+    if row.get('home_score') and row.get('away_score'):
+        return 'finished'
+    return 'scheduled'
+
+def build_match_record(row, season, source):
+    """Convert one extracted row into a MatchRecord (None if it has no match ID)"""
+    match_id = match_id_from_row(row.get('row_id', ''), row.get('match_url', ''))
+    if not match_id:
+        return None
+
+    return MatchRecord(
+        match_id=match_id,
+        season=season,
+        competition=row.get('competition', ''),
+        kickoff=parse_kickoff(row.get('time', ''), season),
+        status=row_status(row),
+        home_team=row.get('home_team', ''),
+        away_team=row.get('away_team', ''),
+        home_score=row.get('home_score', ''),
+        away_score=row.get('away_score', ''),
+        match_url=row.get('match_url', ''),
+        source=source,
+    )
+
+def merge_match(matches, record):
+    """Deduplicate by match ID; a finished/result row wins over a fixture row of the same match"""
+    known = matches.get(record.match_id)
+    if known is None:
+        matches[record.match_id] = record
+        return
+
+    winner, other = (record, known) if record.status != 'scheduled' or known.status == 'scheduled' else (known, record)
+    # Keep labels (season, competition, ...) that only one of the two pages showed
+    for name in MATCH_FIELDS:
+        if not getattr(winner, name):
+            setattr(winner, name, getattr(other, name))
+    matches[record.match_id] = winner
+
+def load_team_links(teams_file=TEAMS_FILE):
+    """Read team name and Flashscore link from the league teams file"""
+    teams = []
+    with open(teams_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            link = row.get('Team Link', '').strip()
+            if link:
+                teams.append((row.get('Team Name', '').strip(), link.rstrip('/') + '/'))
+    return teams
+
+def build_crawl_targets(teams, seasons=SEASONS):
+    """(label, url, season, source) for every team page and every archived league season"""
+    targets = []
+    for team_name, team_link in teams:
+        targets.append((f"{team_name} fixtures", f"{team_link}fixtures/", '', 'fixtures'))
+        targets.append((f"{team_name} results", f"{team_link}results/", '', 'results'))
+
+    targets.append(("League fixtures", f"{LEAGUE_URL}/fixtures/", '', 'fixtures'))
+    for season in seasons:
+        targets.append((f"League {season} results", f"{LEAGUE_URL}-{season}/results/", season, 'results'))
+
+    return targets
+
+async def crawl_page(pool, label, page_url, season, source):
+    """Load one fixtures/results page, expand all its rows and return MatchRecords"""
+    async with pool.page() as page:
+        try:
+            await goto_ready(page, page_url, 'fixtures')
+        except PageNotReady as e:
+            print(f"⚠️ {label}: no matches ({e})")
+            return []
+        except Exception as e:
+            print(f"❌ {label}: failed to load {page_url}: {e}")
+            return []
+
+        await accept_cookies(page)
+        with metrics.stage('download'):
+            clicks = await page.evaluate(EXPAND_JS, MAX_SHOW_MORE_CLICKS)
+        with metrics.stage('extract'):
+            rows = await page.evaluate(EXTRACT_JS)
+
+    with metrics.stage('extract'):
+        records = [r for r in (build_match_record(row, season, source) for row in rows) if r]
+    metrics.incr('matches', len(records))
+    print(f"✅ {label}: {len(records)} matches ({clicks} 'show more' clicks)")
+    return records
+
+async def crawl_fixtures(teams, seasons=SEASONS, max_pages=4):
+    """Crawl every target concurrently in one browser and return matches keyed by match ID"""
+    targets = build_crawl_targets(teams, seasons)
+    print(f"🌐 Crawling {len(targets)} pages with up to {max_pages} open at once")
+
+    async with BrowserPool(max_pages=max_pages) as pool:
+        results = await asyncio.gather(*(crawl_page(pool, *target) for target in targets))
+
+    matches = {}
+    for records in results:
+        for record in records:
+            merge_match(matches, record)
+    return matches
+
+def save_matches_csv(matches, filename=OUTPUT_FILE):
+    """Write match records sorted by kickoff"""
+    records = sorted(matches.values(), key=lambda m: (m.kickoff, m.match_id))
+    with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=MATCH_FIELDS)
+        writer.writeheader()
+        writer.writerows(asdict(m) for m in records)
+    print(f"💾 Saved {len(records)} unique matches to {filename}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl Flashscore fixtures and results for the Tunisian league")
+    parser.add_argument('--teams', default=TEAMS_FILE, help="Teams file with a 'Team Link' column")
+    parser.add_argument('--seasons', nargs='*', default=SEASONS, help="Archived league seasons, e.g. 2023-2024")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--max-pages', type=int, default=4, help="Pages crawled at the same time")
+    parser.add_argument('--sync', action='store_true', help="Also sync into the fixture store and log only the changes")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics.reset('fixtures')
+
+    teams = load_team_links(args.teams)
+    print(f"📂 {len(teams)} teams loaded from {args.teams}")
+
+    matches = asyncio.run(crawl_fixtures(teams, args.seasons, max_pages=args.max_pages))
+    save_matches_csv(matches, args.output)
+
+    if args.sync:
+        from fixture_store import FixtureStore, print_sync_summary
+
+        store = FixtureStore()
+        try:
+            with metrics.stage('write'):
+                changes = store.sync(matches.values())
+            print_sync_summary(changes, len(matches))
+        finally:
+            store.close()
+
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Job scheduler daemon
+Starts a live monitor for each stored fixture a few minutes before kickoff and drops it at full time,
+and runs the periodic squad, fixture and standings jobs, each with its own concurrency limit.
+The browser only runs while at least one match is being followed
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from fixture_store import STORE_FILE, FixtureStore
+
+# Configuration
+LEAD_MINUTES = 10  # start following a match this long before kickoff
+MAX_MATCH_MINUTES = 180  # stop following a match this long after kickoff even without a final status
+SCHEDULE_INTERVAL = 60  # seconds between two looks at the fixture store
+LIVE_STATUSES = ('scheduled', 'live')
+STOP_TIMEOUT = 10  # seconds a job process gets to exit after SIGTERM before it is killed
+CLI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+
+@dataclass
+class PeriodicJob:
+    """A command run every `interval` seconds, at most `concurrency` copies at a time"""
+    name: str
+    interval: int
+    command: list
+    concurrency: int = 1
+    browser: bool = False  # opens the default persistent browser profile, which only one process can hold
+    last_started: float = 0.0
+    running: int = 0
+    semaphore: asyncio.Semaphore = field(default=None, repr=False)
+    processes: set = field(default_factory=set, repr=False)  # running child processes
+
+def default_jobs():
+    """Fresh default periodic jobs (they carry run state); commands are cli.py subcommands run in their own process"""
+    return [
+        PeriodicJob('fixtures', 6 * 3600, ['fixtures', '--sync'], browser=True),
+        PeriodicJob('standings', 24 * 3600, ['standings'], browser=True),
+        PeriodicJob('squads', 7 * 24 * 3600, ['squads']),
+    ]
+
+async def stop_process(name, process):
+    """Terminate a job process, killing it if it doesn't exit within STOP_TIMEOUT"""
+    if process.returncode is not None:
+        return
+    print(f"⏹️ Stopping {name} (pid {process.pid})")
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+    except ProcessLookupError:
+        pass
+
+class JobScheduler:
+    """Asyncio loop driving the live monitors and the periodic jobs"""
+
+    def __init__(self, store_path=STORE_FILE, jobs=None, lead_minutes=LEAD_MINUTES,
+                 poll_interval=None, publisher=None, timeline=None):
+        self.store_path = store_path
+        self.jobs = default_jobs() if jobs is None else jobs
+        self.lead = timedelta(minutes=lead_minutes)
+        self.poll_interval = poll_interval
+        self.publisher = publisher
+        self.timeline = timeline
+        self.pool = None
+        self.monitor = None
+        self.following = {}  # match ID -> kickoff datetime
+        self.load_failures = None  # failed match page loads, kept across browser restarts
+        self.done = set()  # matches that reached full time (or timed out) in this run
+        for job in self.jobs:
+            job.semaphore = asyncio.Semaphore(job.concurrency)
+        # Browser jobs run one at a time: Chromium won't open a profile directory another process is using
+        self.browser_semaphore = asyncio.Semaphore(1)
+        self.job_tasks = set()
+
+    # Live matches
+
+    def due_matches(self, now):
+        """Scheduled/live matches whose follow window [kickoff - lead, kickoff + max duration) contains now"""
+        start = (now - timedelta(minutes=MAX_MATCH_MINUTES)).isoformat(timespec='minutes')
+        end = (now + self.lead).isoformat(timespec='minutes')
+        store = FixtureStore(self.store_path)
+        try:
+            records = store.kickoffs_between(start, end)
+        finally:
+            store.close()
+
+        due = []
+        for record in records:
+            # Date-only kickoffs (no time shown yet) can't be scheduled
+            if record.status not in LIVE_STATUSES or 'T' not in record.kickoff or not record.match_url:
+                continue
+            due.append((record, datetime.fromisoformat(record.kickoff)))
+        return due
+
+    async def ensure_monitor(self):
+        from browser_pool import BrowserPool
+        from livescorescrap import POLL_INTERVAL, LoadFailures, MatchMonitor
+
+        if self.monitor is None:
+            print("🌐 Starting the browser for live matches")
+            if self.load_failures is None:
+                self.load_failures = LoadFailures()
+            self.pool = await BrowserPool(profile='live', max_pages=None).start()
+            self.monitor = MatchMonitor(self.pool, poll_interval=self.poll_interval or POLL_INTERVAL,
+                                        publisher=self.publisher, on_finished=self._match_finished,
+                                        timeline=self.timeline, failures=self.load_failures)
+        return self.monitor
+
+    def _match_finished(self, match_id):
+        self.done.add(match_id)
+
+    async def release_monitor_if_idle(self):
+        if self.monitor is not None and not self.monitor.active_matches():
+            await self.monitor.close()
+            await self.pool.close()
+            self.monitor = self.pool = None
+            print("💤 No live matches, browser closed")
+
+    async def update_live_matches(self, now=None):
+        now = now or datetime.now()
+
+        for record, kickoff in self.due_matches(now):
+            if record.match_id in self.done:
+                continue
+            # A match whose page failed to load is picked up again once its retry wait is over
+            if self.load_failures is not None and not self.load_failures.ready(record.match_id):
+                continue
+            if self.monitor is not None and self.monitor.is_following(record.match_id):
+                continue
+            monitor = await self.ensure_monitor()
+            print(f"⏱️ {record.home_team} vs {record.away_team} kicks off at {kickoff:%H:%M}")
+            monitor.add_match(record.match_url)
+            self.following[record.match_id] = kickoff
+
+        for match_id, kickoff in list(self.following.items()):
+            timed_out = now >= kickoff + timedelta(minutes=MAX_MATCH_MINUTES)
+            if match_id in self.done or timed_out:
+                if timed_out and match_id not in self.done:
+                    print(f"⌛ {match_id}: no final status {MAX_MATCH_MINUTES} minutes after kickoff, giving up")
+                    self.done.add(match_id)
+                if self.monitor is not None:
+                    await self.monitor.remove_match(match_id)
+                del self.following[match_id]
+
+        await self.release_monitor_if_idle()
+
+    # Periodic jobs
+
+    def start_due_jobs(self, now=None):
+        now = now or time.time()
+        for job in self.jobs:
+            if now - job.last_started < job.interval:
+                continue
+            if job.semaphore.locked():
+                print(f"⏭️ {job.name}: {job.running} run(s) still going, skipping this slot")
+                continue
+            job.last_started = now
+            task = asyncio.create_task(self.run_job(job))
+            self.job_tasks.add(task)
+            task.add_done_callback(self.job_tasks.discard)
+
+    async def run_job(self, job):
+        async with job.semaphore:
+            job.running += 1
+            try:
+                if job.browser:
+                    if self.browser_semaphore.locked():
+                        print(f"⏳ {job.name}: waiting for the browser profile")
+                    async with self.browser_semaphore:
+                        await self._run_command(job)
+                else:
+                    await self._run_command(job)
+            finally:
+                job.running -= 1
+
+    async def _run_command(self, job):
+        started = time.monotonic()
+        print(f"▶️ {job.name}: cli.py {' '.join(job.command)}")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, CLI_SCRIPT, *job.command,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            )
+            job.processes.add(process)
+            try:
+                _, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                await stop_process(job.name, process)
+                raise
+            finally:
+                job.processes.discard(process)
+            if process.returncode == 0:
+                print(f"✅ {job.name} finished in {time.monotonic() - started:.0f}s")
+            else:
+                tail = stderr.decode('utf-8', errors='replace').strip().splitlines()[-1:] or ['']
+                print(f"❌ {job.name} exited with {process.returncode}: {tail[0]}")
+        except Exception as e:
+            print(f"❌ {job.name} could not run: {e}")
+
+    async def run(self, run_jobs=True):
+        try:
+            while True:
+                if run_jobs:
+                    self.start_due_jobs()
+                try:
+                    await self.update_live_matches()
+                except Exception as e:
+                    print(f"⚠️ Could not update live matches: {e}")
+                await asyncio.sleep(SCHEDULE_INTERVAL)
+        finally:
+            # Job processes are stopped by their tasks, so a browser job doesn't outlive us holding the profile
+            for task in list(self.job_tasks):
+                task.cancel()
+            await asyncio.gather(*self.job_tasks, return_exceptions=True)
+            if self.monitor is not None:
+                await self.monitor.close()
+                await self.pool.close()
+
+def main():
+    from live_events import EVENTS_LOG_FILE, SSE_PORT, EventPublisher, EventStreamServer
+    from timeline_store import TIMELINE_FILE, TimelineStore
+
+    parser = argparse.ArgumentParser(description="Run live monitors around kickoff and the periodic scraping jobs")
+    parser.add_argument('--store', default=STORE_FILE, help="Fixture store to read kickoffs from")
+    parser.add_argument('--lead', type=int, default=LEAD_MINUTES, help="Minutes before kickoff to start following")
+    parser.add_argument('--interval', type=int, default=None, help="Seconds between polls of a live match")
+    parser.add_argument('--no-jobs', action='store_true', help="Only run the live monitors")
+    parser.add_argument('--events-log', default=EVENTS_LOG_FILE, help="Append-only JSONL event log ('' to disable)")
+    parser.add_argument('--sse-port', type=int, default=SSE_PORT, help="Port of the local SSE endpoint (0 to disable)")
+    parser.add_argument('--timeline', default=TIMELINE_FILE, help="SQLite timeline store ('' to disable)")
+    args = parser.parse_args()
+
+    sse_server = EventStreamServer(port=args.sse_port).start() if args.sse_port else None
+    publisher = EventPublisher(log_file=args.events_log or None, sse_server=sse_server)
+    timeline = TimelineStore(args.timeline) if args.timeline else None
+
+    async def run():
+        scheduler = JobScheduler(args.store, lead_minutes=args.lead, poll_interval=args.interval, publisher=publisher,
+                                 timeline=timeline)
+        print(f"🗓️ Scheduler started: matches followed from {args.lead} min before kickoff, "
+              f"jobs: {', '.join(f'{j.name} every {j.interval // 3600}h' for j in scheduler.jobs) if not args.no_jobs else 'none'}")
+        await scheduler.run(run_jobs=not args.no_jobs)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 Scheduler stopped")
+    finally:
+        if sse_server:
+            sse_server.stop()
+        if timeline:
+            timeline.close()
+
+if __name__ == "__main__":
+    main()
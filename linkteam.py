@@ -1,5 +1,4 @@
-import pandas as pd
-import requests
+import argparse
 from bs4 import BeautifulSoup
 import time
 import csv
@@ -7,6 +6,10 @@ import re
 from urllib.parse import urljoin
 import json
 
+import profiling
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+from transport import add_transport_argument, shared_client
+
 def get_country_code(country):
     """Map country names to Flashscore country codes"""
     country_mapping = {
@@ -151,7 +154,7 @@ def extract_teams_from_matches_and_standings(soup, country):
     
     return teams_dict
 
-def scrape_teams_from_country_page(country):
+def scrape_teams_from_country_page(country, session=None):
     """Scrape teams from country's Flashscore page with improved targeting"""
     country_code = get_country_code(country)
     if not country_code:
@@ -171,17 +174,24 @@ def scrape_teams_from_country_page(country):
     
     try:
         print(f"Scraping teams from: {country_url}")
-        session = requests.Session()
+        # The shared client keeps the connection to Flashscore open across countries
+        session = session or shared_client()
+        start = time.perf_counter()
         response = session.get(country_url, headers=headers, timeout=20)
+        metrics.record_response(response.status_code, time.perf_counter() - start,
+                                response.elapsed.total_seconds(), len(response.content))
         
         if response.status_code != 200:
             print(f"Failed to access {country_url}, status code: {response.status_code}")
             return {}
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with metrics.stage('parse'):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # Extract teams using improved methods
-        teams_dict = extract_teams_from_matches_and_standings(soup, country)
+        with metrics.stage('extract'):
+            teams_dict = extract_teams_from_matches_and_standings(soup, country)
+        metrics.incr('country_pages')
         
         print(f"Found {len(teams_dict)} potential teams for {country}")
         
@@ -246,14 +256,17 @@ def find_team_link(team_name, teams_dict):
 def read_csv_and_extract_teams(filename):
     """Read CSV file and extract unique teams with their correct countries"""
     try:
-        df = pd.read_csv(filename)
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            rows = list(reader)
         
         # Find relevant columns
         current_club_col = None
         nationality_col = None
         club_country_col = None
         
-        for col in df.columns:
+        for col in columns:
             col_lower = col.lower().strip()
             if 'current_club' in col_lower and not 'country' in col_lower and not 'url' in col_lower and not 'logo' in col_lower:
                 current_club_col = col
@@ -270,10 +283,10 @@ def read_csv_and_extract_teams(filename):
         # Extract teams with correct country assignment
         teams_by_country = {}
         
-        for _, row in df.iterrows():
-            club_name = str(row[current_club_col]).strip()
-            nationality = str(row[nationality_col]).strip()
-            club_country = str(row[club_country_col]).strip() if club_country_col else ''
+        for row in rows:
+            club_name = (row[current_club_col] or '').strip()
+            nationality = (row[nationality_col] or '').strip()
+            club_country = (row[club_country_col] or '').strip() if club_country_col else ''
             
             # Filter out invalid entries
             if (club_name and 
@@ -314,6 +327,20 @@ def read_csv_and_extract_teams(filename):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Find Flashscore links for the clubs in a player CSV")
+    add_transport_argument(parser)
+    add_metrics_arguments(parser)
+    profiling.add_profile_argument(parser, 'profile_linkteam')
+    args = parser.parse_args()
+    metrics.reset('linkteam')
+    
+    with profiling.profiled(args.profile):
+        find_all_team_links(args.transport)
+    
+    export_metrics(args)
+
+def find_all_team_links(transport=None):
+    """Scrape the country pages of every club in the CSV and save the matched links"""
     filename = 'esperance_tunis_enhanced_2019.csv'
     
     print("Reading CSV file and extracting teams...")
@@ -338,13 +365,16 @@ def main():
     
     for country in teams_by_country.keys():
         print(f"\n--- Processing {country} ---")
-        scraped_teams = scrape_teams_from_country_page(country)
+        scraped_teams = scrape_teams_from_country_page(country, session=shared_client(transport))
         
         # Add country prefix to avoid conflicts
         for key, info in scraped_teams.items():
             all_scraped_teams[f"{country}_{key}"] = info
         
-        time.sleep(2)  # Be respectful
+        profiling.checkpoint(country)
+        
+        with metrics.stage('sleep'):
+            time.sleep(2)  # Be respectful
     
     print(f"\nTotal teams found: {len(all_scraped_teams)}")
     
@@ -366,7 +396,8 @@ def main():
         }
         
         if country_specific_teams:
-            url, status = find_team_link(team_name, country_specific_teams)
+            with metrics.stage('extract'):
+                url, status = find_team_link(team_name, country_specific_teams)
         else:
             url, status = None, f"No {country} teams scraped"
         
@@ -385,7 +416,7 @@ def main():
     # Save results
     output_filename = 'flashscore_team_links_final.csv'
     
-    with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
+    with metrics.stage('write'), open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['Team Name', 'Country', 'Flashscore URL', 'Status', 'Country URL']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         
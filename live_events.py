@@ -0,0 +1,281 @@
+"""
+Structured live event stream for Flashscore matches
+Turns scraped incidents into events with stable IDs and publishes them as JSONL and Server-Sent Events
+"""
+
+import hashlib
+import json
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Configuration
+EVENTS_LOG_FILE = "live_events.jsonl"
+SSE_HOST = "127.0.0.1"
+SSE_PORT = 8765
+SSE_HISTORY_SIZE = 1000  # events kept in memory for Last-Event-ID replay
+SSE_KEEPALIVE = 15  # seconds between keep-alive comments
+
+# DOM attributes that already identify an incident on the page
+ID_ATTRIBUTES = ['id', 'data-id', 'data-incident-id', 'data-event-id']
+
+# Icon class / data-testid fragments -> event type (checked in order)
+INCIDENT_TYPES = [
+    ('owngoal', 'own_goal'),
+    ('penaltymissed', 'penalty_missed'),
+    ('penalty', 'penalty_goal'),
+    ('goal', 'goal'),
+    ('soccer', 'goal'),
+    ('yellowred', 'second_yellow'),
+    ('redyellow', 'second_yellow'),
+    ('yellow', 'yellow_card'),
+    ('red', 'red_card'),
+    ('substitution', 'substitution'),
+    ('var', 'var'),
+]
+
+@dataclass
+class LiveEvent:
+    """One match incident (or the match status line) with a stable identifier"""
+    event_id: str
+    match_id: str
+    minute: str
+    type: str
+    team: str
+    player: str
+    score_after: str
+    text: str = ""
+
+    def to_dict(self):
+        return asdict(self)
+
+def classify_incident(icon_hint):
+    """Map an incident icon's class / data-testid to an event type"""
+    hint = (icon_hint or '').lower().replace('-', '').replace('_', '')
+    for fragment, event_type in INCIDENT_TYPES:
+        if fragment in hint:
+            return event_type
+    return 'other'
+
+def make_event_id(match_id, raw, event_type, side, player, ordinal):
+    """
+    Build an event ID from the incident's DOM attributes.
+    Uses an explicit ID attribute when the page provides one; otherwise hashes the
+    attributes that don't change during a match (side, icon, player link) plus the
+    position among identical incidents. Minute and text are left out on purpose so a
+    corrected minute updates the event instead of creating a new one.
+    """
+    attributes = raw.get('attributes', {})
+    for name in ID_ATTRIBUTES:
+        if attributes.get(name):
+            return f"{match_id}:{attributes[name]}"
+
+    key = '|'.join([match_id, side, event_type, raw.get('player_href') or player, str(ordinal)])
+    return f"{match_id}:{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+
+def parse_incidents(match_id, state):
+    """Convert the raw incidents read from the page into LiveEvent objects (in page order)"""
+    events = []
+    seen = {}
+    home_goals, away_goals = 0, 0
+
+    for raw in state.get('incidents', []):
+        if not isinstance(raw, dict):
+            continue
+
+        side = raw.get('side') or ''
+        team = state.get(f'{side}_team', '') if side in ('home', 'away') else ''
+        player = raw.get('player') or ''
+        event_type = classify_incident(raw.get('icon'))
+
+        ordinal_key = (side, event_type, raw.get('player_href') or player)
+        ordinal = seen.get(ordinal_key, 0)
+        seen[ordinal_key] = ordinal + 1
+
+        # Score after the incident: taken from the goal row when shown, otherwise carried forward
+        score = raw.get('score') or ''
+        parts = [p.strip() for p in score.split('-')]
+        if len(parts) == 2 and all(p.isdigit() for p in parts):
+            home_goals, away_goals = int(parts[0]), int(parts[1])
+
+        events.append(LiveEvent(
+            event_id=make_event_id(match_id, raw, event_type, side, player, ordinal),
+            match_id=match_id,
+            minute=(raw.get('minute') or '').rstrip("'"),
+            type=event_type,
+            team=team,
+            player=player,
+            score_after=f"{home_goals}-{away_goals}",
+            text=raw.get('text') or '',
+        ))
+
+    return events
+
+def status_event(match_id, state, timer):
+    """The match status line (teams, clock and score) as a single updatable event"""
+    return LiveEvent(
+        event_id=f"{match_id}:status",
+        match_id=match_id,
+        minute=state.get('minute', ''),
+        type='status',
+        team=f"{state.get('home_team', '')} vs {state.get('away_team', '')}",
+        player='',
+        score_after=f"{state.get('home_score', '')}-{state.get('away_score', '')}",
+        text=timer,
+    )
+
+class EventTracker:
+    """Remembers the last version of every event and reports only what is new or changed"""
+
+    def __init__(self):
+        self.events = {}
+
+    def diff(self, events):
+        """Return (op, event) pairs for events that are new ('new') or changed ('update')"""
+        changes = []
+        for event in events:
+            known = self.events.get(event.event_id)
+            if known is None:
+                changes.append(('new', event))
+            elif known != event:
+                changes.append(('update', event))
+            self.events[event.event_id] = event
+        return changes
+
+def last_logged_seq(log_file):
+    """Sequence number of the last envelope in an existing JSONL log (0 if none)"""
+    try:
+        with open(log_file, 'rb') as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+        return json.loads(lines[-1])['seq'] if lines else 0
+    except (OSError, ValueError, KeyError, IndexError):
+        return 0
+
+class EventPublisher:
+    """Fans events out to an append-only JSONL log and, optionally, an SSE server"""
+
+    def __init__(self, log_file=EVENTS_LOG_FILE, sse_server=None):
+        self.log_file = log_file
+        self.sse_server = sse_server
+        self.lock = threading.Lock()
+        # Continue the sequence of an existing log so envelope IDs stay increasing
+        self.seq = last_logged_seq(log_file) if log_file else 0
+
+    def publish(self, op, event):
+        with self.lock:
+            self.seq += 1
+            envelope = {
+                'seq': self.seq,
+                'op': op,
+                'emitted_at': datetime.now(timezone.utc).isoformat(),
+                'event': event.to_dict(),
+            }
+
+            if self.log_file:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(envelope, ensure_ascii=False) + '\n')
+
+        if self.sse_server:
+            self.sse_server.broadcast(envelope)
+
+        return envelope
+
+class EventStreamServer:
+    """Local Server-Sent-Events endpoint: GET /events[?match=<id>] streams event envelopes"""
+
+    def __init__(self, host=SSE_HOST, port=SSE_PORT, history_size=SSE_HISTORY_SIZE):
+        self.host = host
+        self.port = port
+        self.history = deque(maxlen=history_size)
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    def broadcast(self, envelope):
+        with self.lock:
+            self.history.append(envelope)
+            clients = list(self.clients)
+        for client in clients:
+            client.put(envelope)
+
+    def start(self):
+        """Serve in a background thread"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"📡 Live events on http://{self.host}:{self.port}/events")
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def _subscribe(self, last_event_id):
+        client = queue.Queue()
+        with self.lock:
+            # Replay what the client missed since its Last-Event-ID
+            for envelope in self.history:
+                if envelope['seq'] > last_event_id:
+                    client.put(envelope)
+            self.clients.add(client)
+        return client
+
+    def _unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path != '/events':
+                    self.send_error(404)
+                    return
+
+                match_filter = parse_qs(parsed.query).get('match', [None])[0]
+                try:
+                    last_event_id = int(self.headers.get('Last-Event-ID', 0))
+                except ValueError:
+                    last_event_id = 0
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+
+                client = server._subscribe(last_event_id)
+                try:
+                    while True:
+                        try:
+                            envelope = client.get(timeout=SSE_KEEPALIVE)
+                        except queue.Empty:
+                            self.wfile.write(b": keep-alive\n\n")
+                            self.wfile.flush()
+                            continue
+
+                        if match_filter and envelope['event']['match_id'] != match_filter:
+                            continue
+
+                        payload = json.dumps(envelope, ensure_ascii=False)
+                        message = f"id: {envelope['seq']}\nevent: {envelope['op']}\ndata: {payload}\n\n"
+                        self.wfile.write(message.encode('utf-8'))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._unsubscribe(client)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
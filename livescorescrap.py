@@ -1,102 +1,317 @@
-from playwright.sync_api import sync_playwright
+"""
+Flashscore Live Match Monitor
+Follows several live matches at once from a single headless browser (one page per match)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
 import time
 
+from browser_pool import BrowserPool
+from readiness import PageNotReady, goto_ready
+from live_events import (
+    EVENTS_LOG_FILE, SSE_PORT, EventPublisher, EventStreamServer, EventTracker,
+    parse_incidents, status_event,
+)
+from timeline_store import TIMELINE_FILE, TimelineStore
+
 url = "https://www.flashscore.com/match/football/4fpHHhtQ/#/match-summary/match-summary"
 
-def scrape_live_match():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-
-        page.goto(url, wait_until="networkidle", timeout=60000)
-        page.wait_for_timeout(5000)  # wait for JS to fully load
-
-        previous_events = set()
-        previous_home_score = None
-        previous_away_score = None
-        previous_timer = None
-        previous_home_team = None
-        previous_away_team = None
-
-        while True:
-            # Get team names
-            home_team_el = page.query_selector('.duelParticipant__home .participant__participantName')
-            away_team_el = page.query_selector('.duelParticipant__away .participant__participantName')
-
-            home_team = home_team_el.inner_text().strip() if home_team_el else "N/A"
-            away_team = away_team_el.inner_text().strip() if away_team_el else "N/A"
-
-            # Get match status (e.g. "2nd half")
-            status_el = page.query_selector('span.fixedHeaderDuel__detailStatus')
-            status_text = status_el.inner_text().strip() if status_el else ""
-
-            # Get current minute/time (last eventTime span)
-            event_times = page.query_selector_all('div.eventAndAddedTime > span.eventTime')
-            minute_text = event_times[-1].inner_text().strip() if event_times else ""
-
-            # Combine timer display
-            if status_text and minute_text:
-                timer = f"{status_text} {minute_text}'"
-            elif status_text:
-                timer = status_text
-            elif minute_text:
-                timer = f"{minute_text}'"
-            else:
-                timer = "N/A"
-
-            # Get current score
-            score_wrapper = page.query_selector('.detailScore__wrapper.detailScore__live')
-            if score_wrapper:
-                spans = score_wrapper.query_selector_all('span')
-                if len(spans) >= 3:
-                    home_score = spans[0].inner_text().strip()
-                    away_score = spans[2].inner_text().strip()
-                else:
-                    home_score = away_score = "N/A"
-            else:
-                home_score = away_score = "N/A"
-
-            # Get live events (e.g. goals, cards, substitutions)
-            event_elements = page.query_selector_all('.event__incident')
-            current_events = set()
-            for event in event_elements:
-                text = event.inner_text().strip()
-                current_events.add(text)
-
-            # Detect changes
-            changed = False
-
-            if (home_team != previous_home_team) or (away_team != previous_away_team):
-                print(f"Teams: {home_team} vs {away_team}")
-                previous_home_team = home_team
-                previous_away_team = away_team
-                changed = True
-
-            if timer != previous_timer:
-                print(f"Time: {timer}")
-                previous_timer = timer
-                changed = True
-
-            if (home_score != previous_home_score) or (away_score != previous_away_score):
-                print(f"Score: {home_score} - {away_score}")
-                previous_home_score = home_score
-                previous_away_score = away_score
-                changed = True
-
-            # Detect new events
-            new_events = current_events - previous_events
-            if new_events:
-                print("New events:")
-                for ev in new_events:
-                    print(f" - {ev}")
-                changed = True
-
-            previous_events = current_events
-
-            if not changed:
-                print("No changes...")
-
-            time.sleep(30)
+# Configuration
+FIXTURES_FILE = "live_matches.txt"
+POLL_INTERVAL = 30  # seconds between two polls of the same match
+FIXTURES_RELOAD_INTERVAL = 10  # seconds between two reads of the fixture list
+RETRY_DELAY = 60  # seconds before reloading a match page that failed, doubled at every further failure
+MAX_LOAD_ATTEMPTS = 5  # failed loads after which a match is given up
+
+# Match page statuses after which nothing changes any more
+FINAL_STATUSES = ('finished', 'after penalties', 'after extra time', 'awarded', 'abandoned', 'cancelled', 'postponed')
+
+# Reads the whole match state in one round-trip instead of one query per element
+MATCH_STATE_JS = """
+() => {
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? el.innerText.trim() : '';
+    };
+    const eventTimes = document.querySelectorAll('div.eventAndAddedTime > span.eventTime');
+    const scoreSpans = document.querySelectorAll('.detailScore__wrapper.detailScore__live span');
+    return {
+        home_team: text('.duelParticipant__home .participant__participantName') || 'N/A',
+        away_team: text('.duelParticipant__away .participant__participantName') || 'N/A',
+        status: text('span.fixedHeaderDuel__detailStatus'),
+        minute: eventTimes.length ? eventTimes[eventTimes.length - 1].innerText.trim() : '',
+        home_score: scoreSpans.length >= 3 ? scoreSpans[0].innerText.trim() : 'N/A',
+        away_score: scoreSpans.length >= 3 ? scoreSpans[2].innerText.trim() : 'N/A',
+        incidents: Array.from(document.querySelectorAll('.smv__incident, .event__incident')).map(el => {
+            const attributes = {};
+            for (const attr of el.attributes) attributes[attr.name] = attr.value;
+            const icon = el.querySelector('.smv__incidentIcon svg, .smv__incidentIcon [class], svg');
+            const player = el.querySelector('.smv__playerName, a[href*="/player/"]');
+            const score = el.querySelector('.smv__incidentHomeScore, .smv__incidentAwayScore');
+            const time = el.querySelector('.smv__timeBox');
+            const side = el.closest('.smv__homeParticipant') ? 'home'
+                : (el.closest('.smv__awayParticipant') ? 'away' : '');
+            return {
+                attributes: attributes,
+                side: side,
+                icon: icon ? [icon.getAttribute('class') || '', icon.getAttribute('data-testid') || ''].join(' ') : '',
+                minute: time ? time.innerText.trim() : '',
+                player: player ? player.innerText.trim() : '',
+                player_href: player ? (player.getAttribute('href') || '') : '',
+                score: score ? score.innerText.trim() : '',
+                text: el.innerText.trim(),
+            };
+        }),
+    };
+}
+"""
+
+def match_id_from_url(match_url):
+    """Extract the Flashscore match ID from a match URL"""
+    found = re.search(r'/match/(?:football/)?([A-Za-z0-9]{8})', match_url)
+    return found.group(1) if found else match_url
+
+def load_fixture_urls(fixtures_file):
+    """Read match URLs from the fixture list (one URL per line, '#' for comments)"""
+    if not fixtures_file or not os.path.exists(fixtures_file):
+        return []
+
+    urls = []
+    with open(fixtures_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                urls.append(line)
+    return urls
+
+def is_final_status(status):
+    """True once the match page says the match is over (or won't be played)"""
+    return (status or '').strip().lower() in FINAL_STATUSES
+
+def format_timer(state):
+    """Combine match status and current minute into a timer display"""
+    status_text = state['status']
+    minute_text = state['minute']
+
+    if status_text and minute_text:
+        return f"{status_text} {minute_text}'"
+    elif status_text:
+        return status_text
+    elif minute_text:
+        return f"{minute_text}'"
+    return "N/A"
+
+def report_changes(match_id, previous, state, tracker, publisher=None, timeline=None):
+    """Print what changed since the previous poll of a match, publish the event deltas and log them to the timeline"""
+    prefix = f"[{match_id}]"
+    changed = False
+
+    if (state['home_team'], state['away_team']) != (previous.get('home_team'), previous.get('away_team')):
+        print(f"{prefix} Teams: {state['home_team']} vs {state['away_team']}")
+        changed = True
+
+    timer = format_timer(state)
+    if timer != previous.get('timer'):
+        print(f"{prefix} Time: {timer}")
+        changed = True
+    state['timer'] = timer
+
+    if (state['home_score'], state['away_score']) != (previous.get('home_score'), previous.get('away_score')):
+        print(f"{prefix} Score: {state['home_score']} - {state['away_score']}")
+        changed = True
+
+    events = [status_event(match_id, state, timer)] + parse_incidents(match_id, state)
+    changes = tracker.diff(events)
+    for op, event in changes:
+        if event.type != 'status':
+            label = "New event" if op == 'new' else "Updated event"
+            print(f"{prefix} {label}: {event.minute}' {event.type} {event.player} ({event.team}) {event.score_after}")
+            changed = True
+        if publisher:
+            publisher.publish(op, event)
+
+    if timeline:
+        timeline.record_poll(match_id, state, changes, finished=is_final_status(state.get('status')))
+
+    if not changed:
+        print(f"{prefix} No changes...")
+
+class LoadFailures:
+    """Failed match page loads per match ID, with a growing wait before the next attempt"""
+
+    def __init__(self, retry_delay=RETRY_DELAY, max_attempts=MAX_LOAD_ATTEMPTS):
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.attempts = {}
+        self.retry_at = {}
+
+    def record(self, match_id):
+        """Count a failed load; returns the seconds until the next attempt, None when the match is given up"""
+        attempts = self.attempts[match_id] = self.attempts.get(match_id, 0) + 1
+        if attempts >= self.max_attempts:
+            self.retry_at[match_id] = float('inf')
+            return None
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        self.retry_at[match_id] = time.monotonic() + delay
+        return delay
+
+    def clear(self, match_id):
+        self.attempts.pop(match_id, None)
+        self.retry_at.pop(match_id, None)
+
+    def ready(self, match_id):
+        """True when the match has no failed load or its wait is over"""
+        return time.monotonic() >= self.retry_at.get(match_id, 0.0)
+
+class MatchMonitor:
+    """Follows live matches in one browser pool, one page and one asyncio task per match"""
+
+    def __init__(self, pool, poll_interval=POLL_INTERVAL, publisher=None, on_finished=None, timeline=None,
+                 failures=None):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.publisher = publisher
+        self.timeline = timeline
+        self.on_finished = on_finished  # called with the match ID at full time
+        self.tasks = {}
+        self.finished = set()
+        self.failures = failures if failures is not None else LoadFailures()  # can outlive the monitor
+
+    def is_following(self, match_id):
+        """True while the match's task is still polling (a task that died on an error doesn't count)"""
+        task = self.tasks.get(match_id)
+        return task is not None and not task.done()
+
+    def can_follow(self, match_id):
+        """Not followed yet, not finished, and past the wait of its last failed load"""
+        return not self.is_following(match_id) and match_id not in self.finished and self.failures.ready(match_id)
+
+    def add_match(self, match_url):
+        """Start following a match (no-op if it is already followed, finished or waiting to retry a failed load)"""
+        match_id = match_id_from_url(match_url)
+        if self.can_follow(match_id):
+            print(f"➕ Following match {match_id}")
+            self.tasks[match_id] = asyncio.create_task(self._follow_match(match_id, match_url))
+        return match_id
+
+    async def remove_match(self, match_id):
+        """Stop following a match and close its page"""
+        task = self.tasks.pop(match_id, None)
+        if task:
+            print(f"➖ Stopped following match {match_id}")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def sync_fixtures(self, match_urls):
+        """Add matches that appeared in the fixture list and drop the ones that were removed"""
+        wanted = {match_id_from_url(u): u for u in match_urls}
+
+        for match_id in list(self.tasks):
+            if match_id not in wanted:
+                await self.remove_match(match_id)
+
+        for match_id, match_url in wanted.items():
+            self.add_match(match_url)
+
+    def active_matches(self):
+        """IDs of the matches still being polled"""
+        return [match_id for match_id in self.tasks if self.is_following(match_id)]
+
+    async def close(self):
+        """Stop following every match"""
+        for match_id in list(self.tasks):
+            await self.remove_match(match_id)
+
+    async def _follow_match(self, match_id, match_url):
+        async with self.pool.page() as page:
+            try:
+                await goto_ready(page, match_url, 'match')
+                self.failures.clear(match_id)
+
+                # Spread the polls so matches don't all hit the browser at the same moment
+                await asyncio.sleep(random.uniform(0, self.poll_interval))
+
+                previous = {}
+                tracker = EventTracker()
+                while True:
+                    try:
+                        state = await page.evaluate(MATCH_STATE_JS)
+                        report_changes(match_id, previous, state, tracker, self.publisher, self.timeline)
+                        previous = state
+                    except Exception as e:
+                        print(f"[{match_id}] ⚠️ Error reading match state: {e}")
+
+                    # Stop polling at full time; the page is closed when the task returns
+                    if is_final_status(previous.get('status')):
+                        print(f"[{match_id}] 🏁 {previous['status']}, no longer polling")
+                        self.finished.add(match_id)
+                        if self.on_finished:
+                            self.on_finished(match_id)
+                        return
+
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except PageNotReady as e:
+                print(f"[{match_id}] ❌ Match page not ready: {e}")
+                self._load_failed(match_id)
+            except Exception as e:
+                print(f"[{match_id}] ❌ Error loading match page: {e}")
+                self._load_failed(match_id)
+
+    def _load_failed(self, match_id):
+        delay = self.failures.record(match_id)
+        if delay is None:
+            print(f"[{match_id}] 🛑 Giving up after {self.failures.max_attempts} failed loads")
+        else:
+            print(f"[{match_id}] ⏳ Retrying in {delay:.0f}s")
+
+async def monitor_matches(match_urls, fixtures_file=FIXTURES_FILE, poll_interval=POLL_INTERVAL, publisher=None,
+                         timeline=None):
+    """Follow the given matches plus the fixture list, re-reading the list while running"""
+    # One page per followed match, so the pool itself is not capped
+    async with BrowserPool(profile='live', max_pages=None) as pool:
+        monitor = MatchMonitor(pool, poll_interval=poll_interval, publisher=publisher, timeline=timeline)
+
+        try:
+            while True:
+                await monitor.sync_fixtures(list(match_urls) + load_fixture_urls(fixtures_file))
+                await asyncio.sleep(FIXTURES_RELOAD_INTERVAL)
+        finally:
+            await monitor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow live Flashscore matches")
+    parser.add_argument('urls', nargs='*', help="Match URLs to follow")
+    parser.add_argument('--fixtures', default=FIXTURES_FILE, help="File with one match URL per line, re-read at runtime")
+    parser.add_argument('--interval', type=int, default=POLL_INTERVAL, help="Seconds between polls of a match")
+    parser.add_argument('--events-log', default=EVENTS_LOG_FILE, help="Append-only JSONL event log ('' to disable)")
+    parser.add_argument('--sse-port', type=int, default=SSE_PORT, help="Port of the local SSE endpoint (0 to disable)")
+    parser.add_argument('--timeline', default=TIMELINE_FILE, help="SQLite timeline store ('' to disable)")
+    args = parser.parse_args()
+
+    match_urls = args.urls
+    if not match_urls and not os.path.exists(args.fixtures):
+        match_urls = [url]
+
+    sse_server = EventStreamServer(port=args.sse_port).start() if args.sse_port else None
+    publisher = EventPublisher(log_file=args.events_log or None, sse_server=sse_server)
+    timeline = TimelineStore(args.timeline) if args.timeline else None
+
+    try:
+        asyncio.run(monitor_matches(match_urls, fixtures_file=args.fixtures, poll_interval=args.interval,
+                                    publisher=publisher, timeline=timeline))
+    except KeyboardInterrupt:
+        print("\n👋 Monitor stopped")
+    finally:
+        if sse_server:
+            sse_server.stop()
+        if timeline:
+            timeline.close()
 
 if __name__ == "__main__":
-    scrape_live_match()
+    main()
@@ -0,0 +1,227 @@
+"""
+Market value and transfer history enrichment
+Fetches every player's market value development and transfer history from Transfermarkt's JSON
+endpoints (a few KB each instead of a full profile page, and no HTML parsing), concurrently under
+one per-host politeness budget, and saves them as typed time series in two CSV files
+"""
+
+import argparse
+import csv
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from typing import Optional
+
+import scrape_esperance_2012_2025_all_seasons as transfermarkt
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+from throttle import MAX_INTERVAL, MIN_INTERVAL, HostRateLimiter
+from transport import add_transport_argument, check_transport_arguments, create_proxy_pool
+
+# Configuration
+DATASET_FILE = "esperance_2012_2025_all_seasons.csv"
+MARKET_VALUES_FILE = "player_market_values.csv"
+TRANSFERS_FILE = "player_transfers.csv"
+MAX_WORKERS = 4
+MARKET_VALUE_URL = "https://www.transfermarkt.com/ceapi/marketValueDevelopment/graph/{player_id}"
+TRANSFER_HISTORY_URL = "https://www.transfermarkt.com/ceapi/transferHistory/list/{player_id}"
+JSON_HEADERS = {"Accept": "application/json", "X-Requested-With": "XMLHttpRequest"}
+
+PLAYER_ID_PATTERN = re.compile(r'/spieler/(\d+)')
+CLUB_ID_PATTERN = re.compile(r'/verein/(\d+)')
+AMOUNT_PATTERN = re.compile(r'([0-9]+(?:[.,][0-9]+)?)\s*(bn|m|k|th\.)?', re.IGNORECASE)
+AMOUNT_MULTIPLIERS = {'bn': 1_000_000_000, 'm': 1_000_000, 'k': 1_000, 'th.': 1_000, '': 1}
+
+@dataclass
+class MarketValuePoint:
+    """One point of a player's market value curve"""
+    player_id: int
+    date: str  # YYYY-MM-DD
+    value_eur: Optional[int]
+    value_text: str
+    club: str
+    age: Optional[int]
+
+@dataclass
+class TransferRecord:
+    """One transfer (or loan) of a player"""
+    player_id: int
+    date: str  # YYYY-MM-DD, '' when unknown
+    season: str
+    from_club: str
+    from_club_id: Optional[int]
+    to_club: str
+    to_club_id: Optional[int]
+    fee_text: str
+    fee_eur: Optional[int]  # 0 for free transfers, None for fee-less loans and undisclosed fees
+    market_value_eur: Optional[int]
+    upcoming: bool
+
+def player_id_from_url(profile_url):
+    found = PLAYER_ID_PATTERN.search(profile_url or '')
+    return int(found.group(1)) if found else None
+
+def club_id_from_url(club_url):
+    found = CLUB_ID_PATTERN.search(club_url or '')
+    return int(found.group(1)) if found else None
+
+def parse_amount(text):
+    """'€1.50m' -> 1500000, 'Loan fee:€200k' -> 200000, 'free transfer' -> 0; None for 'loan transfer', '-', '?'"""
+    text = (text or '').strip()
+    if 'free' in text.lower():
+        return 0
+    if not any(c.isdigit() for c in text):
+        return None
+    found = AMOUNT_PATTERN.search(text)
+    if not found:
+        return None
+    number, unit = found.groups()
+    return round(float(number.replace(',', '.')) * AMOUNT_MULTIPLIERS[(unit or '').lower()])
+
+def parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_market_values(player_id, data):
+    """MarketValuePoints from a marketValueDevelopment/graph payload, oldest first"""
+    points = []
+    for item in (data or {}).get('list', []):
+        if item.get('x') is not None:
+            date = datetime.fromtimestamp(item['x'] / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+        else:
+            date = transfermarkt.parse_header_date(item.get('datum_mw'))
+        points.append(MarketValuePoint(
+            player_id=player_id,
+            date=date,
+            value_eur=parse_int(item.get('y')) if item.get('y') is not None else parse_amount(item.get('mw')),
+            value_text=item.get('mw') or '',
+            club=item.get('verein') or '',
+            age=parse_int(item.get('age')),
+        ))
+    points.sort(key=lambda p: p.date)
+    return points
+
+def parse_transfers(player_id, data):
+    """TransferRecords from a transferHistory/list payload, oldest first"""
+    transfers = []
+    for item in (data or {}).get('transfers', []):
+        origin, destination = item.get('from') or {}, item.get('to') or {}
+        transfers.append(TransferRecord(
+            player_id=player_id,
+            date=item.get('dateUnformatted') or transfermarkt.parse_header_date(item.get('date')),
+            season=item.get('season') or '',
+            from_club=origin.get('clubName') or '',
+            from_club_id=club_id_from_url(origin.get('href')),
+            to_club=destination.get('clubName') or '',
+            to_club_id=club_id_from_url(destination.get('href')),
+            fee_text=item.get('fee') or '',
+            fee_eur=parse_amount(item.get('fee')),
+            market_value_eur=parse_amount(item.get('marketValue')),
+            upcoming=bool(item.get('upcoming')),
+        ))
+    transfers.sort(key=lambda t: t.date)
+    return transfers
+
+# One HTTP client per worker thread, sharing the proxy pool when there is one (see squad_crawler.thread_session)
+TRANSPORT = None
+PROXY_POOL = None
+_local = threading.local()
+
+def thread_session():
+    if not hasattr(_local, 'session'):
+        _local.session = transfermarkt.create_session(TRANSPORT, PROXY_POOL)
+    return _local.session
+
+def fetch_json(url):
+    """Decoded JSON of an endpoint, None on HTTP errors or a non-JSON answer"""
+    response = transfermarkt.fetch_page(thread_session(), url, timeout=30, headers=JSON_HEADERS)
+    if response.status_code != 200:
+        print(f"❌ {url}: HTTP {response.status_code}")
+        return None
+    try:
+        with metrics.stage('parse'):
+            return json.loads(response.content)
+    except ValueError:
+        print(f"⚠️ {url}: response is not JSON")
+        return None
+
+def enrich_player(player_id):
+    """(market value points, transfers) of one player"""
+    try:
+        market_value_data = fetch_json(MARKET_VALUE_URL.format(player_id=player_id))
+        transfer_data = fetch_json(TRANSFER_HISTORY_URL.format(player_id=player_id))
+        with metrics.stage('extract'):
+            market_values = parse_market_values(player_id, market_value_data)
+            transfers = parse_transfers(player_id, transfer_data)
+    except Exception as e:
+        print(f"❌ Player {player_id}: {e}")
+        return [], []
+    metrics.incr('players')
+    return market_values, transfers
+
+def load_player_ids(dataset_file):
+    """Unique Transfermarkt player IDs from the Profile_URL column, in first-seen order"""
+    player_ids = {}
+    with open(dataset_file, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            player_id = player_id_from_url(row.get('Profile_URL'))
+            if player_id is not None:
+                player_ids.setdefault(player_id, None)
+    return list(player_ids)
+
+def enrich_players(player_ids, workers=MAX_WORKERS, limiter=None):
+    """Fetch both histories of every player concurrently; returns (all market value points, all transfers)"""
+    transfermarkt.RATE_LIMITER = None if PROXY_POOL is not None else (limiter or HostRateLimiter())
+    transfermarkt.THROTTLE = False  # the shared limiter replaces the per-thread sleeps
+
+    market_values, transfers = [], []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i, (points, moves) in enumerate(executor.map(enrich_player, player_ids), 1):
+            market_values.extend(points)
+            transfers.extend(moves)
+            if i % 25 == 0 or i == len(player_ids):
+                print(f"📈 {i}/{len(player_ids)} players, {len(market_values)} values, {len(transfers)} transfers")
+    return market_values, transfers
+
+def save_dataclass_csv(records, record_type, filename):
+    with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(record_type)])
+        writer.writeheader()
+        writer.writerows(asdict(record) for record in records)
+    print(f"💾 Saved {len(records)} rows to {filename}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch market value and transfer histories of the dataset's players")
+    parser.add_argument('--dataset', default=DATASET_FILE, help="CSV with a Profile_URL column")
+    parser.add_argument('--market-values', default=MARKET_VALUES_FILE)
+    parser.add_argument('--transfers', default=TRANSFERS_FILE)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--limit', type=int, default=None, help="Only the first N players")
+    parser.add_argument('--min-interval', type=float, default=MIN_INTERVAL, help="Seconds between requests to a host")
+    parser.add_argument('--max-interval', type=float, default=MAX_INTERVAL)
+    add_transport_argument(parser, proxies=True)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    check_transport_arguments(parser, args)
+    metrics.reset('enrichment')
+
+    global TRANSPORT, PROXY_POOL
+    TRANSPORT = args.transport
+    PROXY_POOL = create_proxy_pool(args.proxies, args.min_interval, args.max_interval)
+
+    player_ids = load_player_ids(args.dataset)[:args.limit]
+    print(f"🌐 {len(player_ids)} players, 2 requests each, {args.workers} workers")
+    market_values, transfers = enrich_players(player_ids, workers=args.workers,
+                                              limiter=HostRateLimiter(args.min_interval, args.max_interval))
+    if PROXY_POOL is not None:
+        PROXY_POOL.print_summary()
+    save_dataclass_csv(market_values, MarketValuePoint, args.market_values)
+    save_dataclass_csv(transfers, TransferRecord, args.transfers)
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
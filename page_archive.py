@@ -0,0 +1,107 @@
+"""
+Compressed raw page archive
+Every fetched page is appended to a segment file as one compressed frame, with a WARC-like
+JSONL index keyed by URL and fetch time, so extractors can be re-run offline
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:  # gzip keeps the archive usable where zstandard isn't installed
+    zstandard = None
+
+# Configuration
+ARCHIVE_DIR = "page_archive"
+INDEX_NAME = "index.jsonl"
+ZSTD_LEVEL = 10
+
+def compress(data):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return 'gzip', gzip.compress(data)
+
+def decompress(codec, data):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("this archive record is zstd-compressed; install 'zstandard' to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    raise ValueError(f"unknown codec {codec!r}")
+
+class PageArchive:
+    """Append-only archive of fetched pages under one directory"""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.lock = threading.Lock()
+        self.segment_name = None
+
+    def store(self, url, status, content_type, body, fetched_at=None):
+        """Append one fetched page; returns its index entry"""
+        fetched_at = fetched_at or datetime.now(timezone.utc).isoformat(timespec='seconds')
+        codec, payload = compress(body)
+
+        with self.lock:
+            if self.segment_name is None:
+                os.makedirs(self.root, exist_ok=True)
+                stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+                self.segment_name = f"segment-{stamp}-{os.getpid()}.{codec}"
+
+            segment_path = os.path.join(self.root, self.segment_name)
+            with open(segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(payload)
+
+            entry = {
+                'url': url,
+                'fetched_at': fetched_at,
+                'status': status,
+                'content_type': content_type,
+                'sha256': hashlib.sha256(body).hexdigest(),
+                'size': len(body),
+                'segment': self.segment_name,
+                'offset': offset,
+                'length': len(payload),
+                'codec': codec,
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+        return entry
+
+    def entries(self):
+        """Every index entry, in the order pages were archived"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def latest_entries(self):
+        """URL -> most recent index entry"""
+        latest = {}
+        for entry in self.entries():
+            known = latest.get(entry['url'])
+            if known is None or entry['fetched_at'] >= known['fetched_at']:
+                latest[entry['url']] = entry
+        return latest
+
+    def read(self, entry):
+        """Raw bytes of an archived page"""
+        with open(os.path.join(self.root, entry['segment']), 'rb') as f:
+            f.seek(entry['offset'])
+            payload = f.read(entry['length'])
+        return decompress(entry['codec'], payload)
+
+    def read_text(self, entry, encoding='utf-8'):
+        return self.read(entry).decode(encoding, errors='replace')
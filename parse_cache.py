@@ -0,0 +1,115 @@
+"""
+Parse result cache
+Maps (page content hash, extractor version) to the record extracted from that page, so a page
+whose bytes haven't changed since the last run is never parsed again. The extractor version is
+a hash of the extractor's source and of every module function it calls, so editing any of them
+invalidates its entries automatically
+"""
+
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import types
+from datetime import datetime, timezone
+
+from run_metrics import metrics
+
+# Configuration
+PARSE_CACHE_FILE = "parse_cache.db"
+
+def content_hash(html):
+    data = html.encode('utf-8') if isinstance(html, str) else html
+    return hashlib.sha256(data).hexdigest()
+
+def _called_functions(function, seen):
+    """`function` plus every function of its own module that it references, transitively"""
+    if function in seen:
+        return
+    seen.add(function)
+    module_globals = function.__globals__
+    codes = [function.__code__]
+    while codes:
+        code = codes.pop()
+        codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+        for name in code.co_names:
+            value = module_globals.get(name)
+            if isinstance(value, types.FunctionType) and value.__module__ == function.__module__:
+                _called_functions(value, seen)
+
+def extractor_version(function):
+    """Short hash of the source of an extractor and of the helpers it calls"""
+    functions = set()
+    _called_functions(function, functions)
+    digest = hashlib.sha256()
+    for helper in sorted(functions, key=lambda f: f.__qualname__):
+        digest.update(helper.__qualname__.encode('utf-8'))
+        digest.update(inspect.getsource(helper).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+class ParseCache:
+    """SQLite store of extraction results, safe to share between threads and processes"""
+
+    def __init__(self, path=PARSE_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                extractor TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (extractor, content_hash)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def version(self, extractor):
+        if extractor not in self.versions:
+            self.versions[extractor] = extractor_version(extractor)
+        return self.versions[extractor]
+
+    def get_or_parse(self, extractor, html):
+        """extractor(html), or the stored result of an earlier call on the same content with the same extractor code"""
+        name, version, key = extractor.__qualname__, self.version(extractor), content_hash(html)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT version, result FROM results WHERE extractor = ? AND content_hash = ?", (name, key)
+            ).fetchone()
+        if row and row[0] == version:
+            metrics.cache_hit('parse')
+            return json.loads(row[1])
+
+        metrics.cache_miss('parse')
+        result = extractor(html)
+        # An entry left by an older extractor version is overwritten
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (extractor, content_hash, version, result, created_at) VALUES (?, ?, ?, ?, ?)",
+                (name, key, version, json.dumps(result, ensure_ascii=False),
+                 datetime.now(timezone.utc).isoformat(timespec='seconds')),
+            )
+        return result
+
+    def prune(self, extractors):
+        """Delete the entries written by other versions of these extractors; returns the number removed"""
+        removed = 0
+        with self.lock, self.conn:
+            for extractor in extractors:
+                removed += self.conn.execute(
+                    "DELETE FROM results WHERE extractor = ? AND version != ?",
+                    (extractor.__qualname__, self.version(extractor)),
+                ).rowcount
+        return removed
+
+def add_parse_cache_argument(parser):
+    parser.add_argument('--parse-cache', default=PARSE_CACHE_FILE,
+                        help="SQLite cache of extraction results keyed by page hash ('' to disable)")
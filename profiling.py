@@ -0,0 +1,136 @@
+"""
+Profiling mode for the scrapers
+Runs an entry point under cProfile and tracemalloc, with memory checkpoints at season/country
+boundaries, and reports the hottest functions and the biggest allocation sites
+"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+# Configuration
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+TRACEBACK_FRAMES = 10  # frames kept per allocation (more = slower, better attribution)
+
+class RunProfiler:
+    """cProfile + tracemalloc around one run"""
+
+    def __init__(self, prefix, top_functions=TOP_FUNCTIONS, top_allocations=TOP_ALLOCATIONS):
+        self.prefix = prefix
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+        self.profile = cProfile.Profile()
+        self.checkpoints = []  # (label, snapshot, current bytes, peak bytes)
+
+    def start(self):
+        tracemalloc.start(TRACEBACK_FRAMES)
+        self._snapshot('start')
+        self.profile.enable()
+
+    def checkpoint(self, label):
+        """Take a memory snapshot; the CPU profiler is paused so the snapshot doesn't show up in its report"""
+        self.profile.disable()
+        try:
+            self._snapshot(label)
+        finally:
+            self.profile.enable()
+
+    def _snapshot(self, label):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        self.checkpoints.append((label, snapshot, current, peak))
+
+    def stop(self):
+        self.profile.disable()
+        self._snapshot('end')
+        tracemalloc.stop()
+
+        pstats_file = f"{self.prefix}.pstats"
+        self.profile.dump_stats(pstats_file)
+        memory_file = f"{self.prefix}.memory.txt"
+        with open(memory_file, 'w', encoding='utf-8') as f:
+            f.write(self.memory_report(limit=self.top_allocations * 4))
+
+        self.print_report()
+        print(f"💾 CPU profile written to {pstats_file} (open with snakeviz, tuna or flameprof)")
+        print(f"💾 Allocation report written to {memory_file}")
+
+    def function_report(self, limit=None):
+        output = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(limit or self.top_functions)
+        return output.getvalue()
+
+    def memory_report(self, limit=None):
+        limit = limit or self.top_allocations
+        lines = []
+
+        lines.append("Traced memory at each checkpoint (current / peak):")
+        for label, _, current, peak in self.checkpoints:
+            lines.append(f"   {label:<24} {current / 1024 / 1024:>8.1f} MB / {peak / 1024 / 1024:>8.1f} MB")
+
+        # What each season/country added on top of the previous checkpoint
+        lines.append("\nBiggest growth between checkpoints:")
+        for (_, before, _, _), (label, after, _, _) in zip(self.checkpoints, self.checkpoints[1:]):
+            growth = [d for d in after.compare_to(before, 'lineno') if d.size_diff > 0][:3]
+            summary = ', '.join(f"{d.traceback[0].filename.rsplit('/', 1)[-1]}:{d.traceback[0].lineno} "
+                                f"+{d.size_diff / 1024:.0f} KiB" for d in growth)
+            lines.append(f"   {label:<24} {summary or '-'}")
+
+        final = self.checkpoints[-1][1]
+        lines.append(f"\nTop {limit} allocation sites still alive at the end:")
+        for i, stat in enumerate(final.statistics('lineno')[:limit], 1):
+            frame = stat.traceback[0]
+            lines.append(f"   {i:>2}. {frame.filename}:{frame.lineno}  {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+
+        lines.append(f"\nTop {limit} allocation sites by call stack:")
+        for i, stat in enumerate(final.statistics('traceback')[:limit], 1):
+            lines.append(f"   {i:>2}. {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+            lines.extend(f"         {line}" for line in stat.traceback.format(limit=4))
+
+        return '\n'.join(lines) + '\n'
+
+    def print_report(self):
+        print(f"\n{'='*80}")
+        print(f"🔬 TOP {self.top_functions} FUNCTIONS BY CUMULATIVE TIME")
+        print(f"{'='*80}")
+        print(self.function_report())
+        print(f"{'='*80}")
+        print(f"🧠 MEMORY")
+        print(f"{'='*80}")
+        print(self.memory_report())
+
+# The profiler of the current run, if any (so scrapers can mark checkpoints without passing it around)
+_active = None
+
+def checkpoint(label):
+    """Memory checkpoint in profile mode; does nothing otherwise"""
+    if _active is not None:
+        _active.checkpoint(label)
+
+@contextmanager
+def profiled(prefix):
+    """Profile the enclosed block when `prefix` is set: `with profiled(args.profile): run(args)`"""
+    global _active
+    if not prefix:
+        yield None
+        return
+
+    _active = RunProfiler(prefix)
+    _active.start()
+    try:
+        yield _active
+    finally:
+        profiler, _active = _active, None
+        profiler.stop()
+
+def add_profile_argument(parser, default_prefix):
+    parser.add_argument('--profile', nargs='?', const=default_prefix, default=None, metavar='PREFIX',
+                        help=f"Profile the run; writes PREFIX.pstats and PREFIX.memory.txt (default: {default_prefix})")
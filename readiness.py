@@ -0,0 +1,68 @@
+"""
+Readiness waits for the Flashscore pages
+Waits until the elements a scraper reads are actually rendered instead of sleeping a fixed time
+"""
+
+import time
+
+from run_metrics import metrics
+
+# Configuration
+READY_TIMEOUT = 20000  # ms to wait for the expected elements
+NAVIGATION_TIMEOUT = 60000  # ms to wait for the document itself
+
+# Page kind -> (selector that must be rendered, minimum number of matches)
+PAGE_READY_CONDITIONS = {
+    'fixtures': ('.event__match', 1),
+    'standings': ('div.tableCellParticipant__block', 1),
+    'match': ('.duelParticipant__home', 1),
+}
+
+COUNT_JS = "([selector, minCount]) => document.querySelectorAll(selector).length >= minCount"
+
+class PageNotReady(Exception):
+    """Raised when a page did not render the expected elements in time"""
+
+    def __init__(self, url, selector, min_count, found, timeout):
+        self.url = url
+        self.selector = selector
+        self.min_count = min_count
+        self.found = found
+        self.timeout = timeout
+        super().__init__(
+            f"{url}: expected at least {min_count} '{selector}' within {timeout} ms, found {found}"
+        )
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'selector': self.selector,
+            'min_count': self.min_count,
+            'found': self.found,
+            'timeout_ms': self.timeout,
+        }
+
+async def wait_ready(page, selector, min_count=1, timeout=READY_TIMEOUT):
+    """Wait until `selector` matches at least `min_count` elements; returns the count found"""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    try:
+        await page.wait_for_function(COUNT_JS, arg=[selector, min_count], timeout=timeout)
+    except PlaywrightTimeoutError:
+        found = await page.evaluate("(selector) => document.querySelectorAll(selector).length", selector)
+        raise PageNotReady(page.url, selector, min_count, found, timeout)
+
+    return await page.evaluate("(selector) => document.querySelectorAll(selector).length", selector)
+
+async def goto_ready(page, page_url, kind, timeout=READY_TIMEOUT):
+    """Open a page and wait for the elements its kind needs (see PAGE_READY_CONDITIONS)"""
+    selector, min_count = PAGE_READY_CONDITIONS[kind]
+    start = time.perf_counter()
+    response = await page.goto(page_url, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT)
+    try:
+        return await wait_ready(page, selector, min_count=min_count, timeout=timeout)
+    finally:
+        # Until the response headers = 'connect', the rest of loading and rendering = 'download'
+        headers_ms = response.request.timing.get('responseStart', -1) if response else -1
+        metrics.record_response(response.status if response else 'none', time.perf_counter() - start,
+                                headers_ms / 1000 if headers_ms >= 0 else None)
@@ -0,0 +1,266 @@
+"""
+Priority-based profile refresh scheduler
+Keeps a last-checked time and a volatility score per player and re-fetches only the profiles whose
+refresh is due (active, expiring or recently transferred players often, retired ones rarely),
+within a request budget, then updates the current-club columns of the dataset
+"""
+
+import argparse
+import csv
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from dataset_aggregates import DatasetAggregates
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+
+# Configuration
+STORE_FILE = "player_refresh.db"
+DATASET_FILE = "esperance_2012_2025_all_seasons.csv"
+REQUEST_BUDGET = 100  # profile fetches per run
+EXPIRING_WINDOW_DAYS = 180  # a contract ending within this many days counts as expiring
+TRANSFER_WINDOW_DAYS = 180  # a club change within this many days counts as a recent transfer
+VOLATILITY_DECAY = 0.7  # weight of the previous score; each observed club change adds the rest
+FAILURE_BACKOFF_HOURS = 6  # wait after a failed fetch, doubled at every further failure in a row
+MAX_FAILURE_BACKOFF_DAYS = 30
+
+# Base refresh interval in days per player class; volatility shortens it further
+REFRESH_INTERVALS = {
+    'expiring': 7,
+    'transferred': 7,
+    'without_club': 14,
+    'active': 30,
+    'retired': 180,
+}
+
+# Dataset columns refreshed from the profile
+CLUB_COLUMNS = ['Current_Club', 'Current_Club_URL', 'Current_Club_Logo', 'Current_Club_Country']
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc) if value else None
+    except ValueError:
+        return None
+
+def classify_player(current_club, contract_expires, joined, last_changed, now):
+    """Refresh class of a player: retired, without_club, expiring, transferred or active"""
+    if current_club == 'Retired':
+        return 'retired'
+    if current_club in ('', 'Without Club'):
+        return 'without_club'
+    expires = parse_date(contract_expires)
+    if expires and expires - now <= timedelta(days=EXPIRING_WINDOW_DAYS):
+        return 'expiring'
+    changed = max(filter(None, [parse_date(joined), parse_date((last_changed or '')[:10])]), default=None)
+    if changed and now - changed <= timedelta(days=TRANSFER_WINDOW_DAYS):
+        return 'transferred'
+    return 'active'
+
+def refresh_interval(player_class, volatility):
+    """Days between two checks; a volatility of 1 (club changes at every check) divides it by 5"""
+    return REFRESH_INTERVALS[player_class] / (1 + 4 * volatility)
+
+def failure_backoff(failures):
+    """Days to wait before retrying a profile whose last `failures` fetches failed"""
+    return min(FAILURE_BACKOFF_HOURS * 2 ** (failures - 1) / 24, MAX_FAILURE_BACKOFF_DAYS)
+
+class RefreshScheduler:
+    """SQLite-backed refresh state of every known player profile"""
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS players (
+                profile_url TEXT PRIMARY KEY,
+                player TEXT NOT NULL,
+                current_club TEXT NOT NULL DEFAULT '',
+                current_club_country TEXT NOT NULL DEFAULT '',
+                contract_expires TEXT NOT NULL DEFAULT '',
+                joined TEXT NOT NULL DEFAULT '',
+                last_checked TEXT,
+                last_changed TEXT,
+                volatility REAL NOT NULL DEFAULT 0,
+                checks INTEGER NOT NULL DEFAULT 0,
+                last_attempt TEXT,
+                failures INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Stores created before failed fetches were recorded
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(players)")}
+        if 'last_attempt' not in columns:
+            self.conn.execute("ALTER TABLE players ADD COLUMN last_attempt TEXT")
+        if 'failures' not in columns:
+            self.conn.execute("ALTER TABLE players ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def seed(self, rows):
+        """Register players from dataset rows; existing players keep their state. Returns how many were new"""
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO players (profile_url, player, current_club, current_club_country) VALUES (?, ?, ?, ?)",
+            [(r['Profile_URL'], r.get('Player', ''), r.get('Current_Club', ''), r.get('Current_Club_Country', ''))
+             for r in rows if r.get('Profile_URL')]
+        )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def plan(self, now=None, budget=REQUEST_BUDGET):
+        """
+        Profiles due for a refresh, most overdue first, at most `budget` of them.
+        Never-checked players come first; profiles whose last fetches failed wait out a growing backoff
+        and are then ranked by how far past it they are. Returns (profile_url, player, class, overdue ratio) tuples.
+        """
+        now = now or datetime.now(timezone.utc)
+        due = []
+        for url, player, club, expires, joined, last_checked, last_changed, volatility, last_attempt, failures in \
+                self.conn.execute(
+                    "SELECT profile_url, player, current_club, contract_expires, joined, last_checked, last_changed, "
+                    "volatility, last_attempt, failures FROM players"):
+            player_class = classify_player(club, expires, joined, last_changed, now)
+            if not last_checked:
+                overdue = float('inf')
+            else:
+                age_days = (now - datetime.fromisoformat(last_checked)).total_seconds() / 86400
+                overdue = age_days / refresh_interval(player_class, volatility)
+            if failures and last_attempt:
+                since_attempt = (now - datetime.fromisoformat(last_attempt)).total_seconds() / 86400
+                overdue = min(overdue, since_attempt / failure_backoff(failures))
+            if overdue >= 1:
+                due.append((url, player, player_class, overdue))
+
+        due.sort(key=lambda d: d[3], reverse=True)
+        return due[:budget]
+
+    def record(self, profile_url, details, now=None):
+        """Store the result of a check; returns True when the current club changed"""
+        now = now or datetime.now(timezone.utc)
+        row = self.conn.execute("SELECT current_club, volatility FROM players WHERE profile_url = ?",
+                                (profile_url,)).fetchone()
+        old_club, volatility = row or ('', 0.0)
+        new_club = details.get('Current_Club', 'Without Club')
+        changed = bool(old_club) and new_club != old_club
+        volatility = volatility * VOLATILITY_DECAY + ((1 - VOLATILITY_DECAY) if changed else 0.0)
+        stamp = now.isoformat(timespec='seconds')
+
+        self.conn.execute("""
+            UPDATE players SET current_club = ?, current_club_country = ?, contract_expires = ?, joined = ?,
+                   last_checked = ?, last_changed = COALESCE(?, last_changed), volatility = ?, checks = checks + 1,
+                   last_attempt = ?, failures = 0
+            WHERE profile_url = ?
+        """, (new_club, details.get('Current_Club_Country', ''), details.get('Contract_Expires', ''),
+              details.get('Joined', ''), stamp, stamp if changed else None, volatility, stamp, profile_url))
+        self.conn.commit()
+        return changed
+
+    def record_failure(self, profile_url, now=None):
+        """Store a failed check; returns the number of failures in a row"""
+        now = now or datetime.now(timezone.utc)
+        self.conn.execute("UPDATE players SET last_attempt = ?, failures = failures + 1 WHERE profile_url = ?",
+                          (now.isoformat(timespec='seconds'), profile_url))
+        self.conn.commit()
+        row = self.conn.execute("SELECT failures FROM players WHERE profile_url = ?", (profile_url,)).fetchone()
+        return row[0] if row else 0
+
+    def class_counts(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        counts = {}
+        for club, expires, joined, last_changed in self.conn.execute(
+                "SELECT current_club, contract_expires, joined, last_changed FROM players"):
+            player_class = classify_player(club, expires, joined, last_changed, now)
+            counts[player_class] = counts.get(player_class, 0) + 1
+        return counts
+
+def read_dataset(filename=DATASET_FILE):
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+def write_dataset(fieldnames, rows, filename=DATASET_FILE):
+    with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def refresh_due_profiles(scheduler, budget=REQUEST_BUDGET, session=None):
+    """Fetch the due profiles; returns {profile_url: details} for the successful ones"""
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    plan = scheduler.plan(budget=budget)
+    print(f"🗓️ {len(plan)} profiles due (budget {budget})")
+    session = session or transfermarkt.create_session()
+
+    refreshed = {}
+    for i, (url, player, player_class, _) in enumerate(plan, 1):
+        details = transfermarkt.get_player_details(session, url, player)
+        if not details:
+            metrics.incr('failed_profiles')
+            failures = scheduler.record_failure(url)
+            print(f"   ⚠️ {player}: fetch failed ({failures} in a row), retried in {failure_backoff(failures) * 24:.0f}h")
+            continue
+
+        if scheduler.record(url, details):
+            metrics.incr('club_changes')
+            print(f"   🔁 {player}: now at {details.get('Current_Club', 'Without Club')}")
+        refreshed[url] = details
+        metrics.incr('refreshed_profiles')
+        metrics.incr(f"refreshed_{player_class}")
+
+        if i % 10 == 0:
+            print(f"  Progress: {i}/{len(plan)} profiles refreshed...")
+
+    return refreshed
+
+def apply_refreshed(rows, refreshed):
+    """Copy the refreshed current-club columns onto every dataset row of those players"""
+    updated = 0
+    for row in rows:
+        details = refreshed.get(row.get('Profile_URL'))
+        if details is None:
+            continue
+        new_values = {column: details.get(column, 'Without Club' if column == 'Current_Club' else '')
+                      for column in CLUB_COLUMNS}
+        if any(row.get(column, '') != value for column, value in new_values.items()):
+            row.update(new_values)
+            updated += 1
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the current club of the players whose check is due")
+    parser.add_argument('--dataset', default=DATASET_FILE)
+    parser.add_argument('--store', default=STORE_FILE)
+    parser.add_argument('--budget', type=int, default=REQUEST_BUDGET, help="Maximum profile fetches this run")
+    parser.add_argument('--dry-run', action='store_true', help="Only show what is due")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics.reset('refresh')
+
+    fieldnames, rows = read_dataset(args.dataset)
+    scheduler = RefreshScheduler(args.store)
+    try:
+        new_players = scheduler.seed(rows)
+        print(f"📂 {len(rows)} dataset rows, {new_players} new players registered")
+        print(f"📊 Players by class: {scheduler.class_counts()}")
+
+        if args.dry_run:
+            for url, player, player_class, overdue in scheduler.plan(budget=args.budget):
+                print(f"   {player:<30} {player_class:<13} {'never checked' if overdue == float('inf') else f'{overdue:.1f}x overdue'}")
+            return
+
+        refreshed = refresh_due_profiles(scheduler, args.budget)
+    finally:
+        scheduler.close()
+
+    updated = apply_refreshed(rows, refreshed)
+    if updated:
+        aggregates = DatasetAggregates.for_dataset(args.dataset)
+        aggregates.upsert_many(row for row in rows if row.get('Profile_URL') in refreshed)
+        write_dataset(fieldnames, rows, args.dataset)
+        aggregates.save(args.dataset)
+    print(f"✅ {len(refreshed)} profiles refreshed, {updated} dataset rows updated in {args.dataset}")
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Local record/replay stand-in for transfermarkt.com and flashscore.com
+Serves pages from the page archive at their real URL paths, with configurable latency, jitter
+and injected 429 responses, so scrapers can be benchmarked without touching the real sites.
+Stand-in forward proxies with a per-exit rate limit let the proxy pool be tested the same way
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+from page_archive import ARCHIVE_DIR, PageArchive
+
+# Configuration
+REPLAY_HOST = "127.0.0.1"
+REPLAY_PORT = 8799
+PROXY_BASE_PORT = 8800  # stand-in proxies listen on consecutive ports from here
+HOST_PREFIX = "/_/"  # /_/<host>/<path> addresses a page of a specific host
+
+def replay_path(url):
+    """Path on the replay server for a real URL (keeps the host so several sites can share one server)"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return f"{HOST_PREFIX}{parts.netloc}{path}"
+
+class ReplayAdapter(requests.adapters.HTTPAdapter):
+    """requests adapter that sends every request to the replay server instead of the real host"""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url.rstrip('/')
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + replay_path(request.url)
+        return super().send(request, **kwargs)
+
+def use_replay(session, base_url):
+    """Route a requests.Session to the replay server"""
+    adapter = ReplayAdapter(base_url)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class ReplayServer:
+    """Threaded HTTP server answering from the latest archived copy of each URL"""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, host=REPLAY_HOST, port=REPLAY_PORT,
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.archive = PageArchive(archive_dir)
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.by_host_path = {}
+        self.by_path = {}
+        self.stats = {'served': 0, 'missing': 0, 'injected_429': 0}
+        self.httpd = None
+        self.reload()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def reload(self):
+        """(Re)load the archive index"""
+        self.by_host_path = {}
+        self.by_path = {}
+        for url, entry in self.archive.latest_entries().items():
+            parts = urlsplit(url)
+            path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+            self.by_host_path[(parts.netloc, path)] = entry
+            self.by_path.setdefault(path, entry)
+        print(f"📼 Replay server loaded {len(self.by_host_path)} recorded pages")
+
+    def lookup(self, request_path):
+        if request_path.startswith(HOST_PREFIX):
+            host, _, rest = request_path[len(HOST_PREFIX):].partition('/')
+            return self.by_host_path.get((host, '/' + rest))
+        return self.by_path.get(request_path)
+
+    def _delay_and_fault(self):
+        """Sleep for latency + jitter; True when this request should get an injected 429"""
+        with self.random_lock:
+            delay = self.latency_ms + (self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+            inject = self.error_rate > 0 and self.random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return inject
+
+    def start(self):
+        """Serve in a background thread"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"📼 Replaying on {self.base_url} (latency {self.latency_ms}±{self.jitter_ms} ms, "
+              f"429 rate {self.error_rate:.0%})")
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                inject_429 = server._delay_and_fault()
+                entry = server.lookup(self.path)
+
+                outcome = 'injected_429' if inject_429 else ('missing' if entry is None else 'served')
+                with server.random_lock:
+                    server.stats[outcome] += 1
+
+                if inject_429:
+                    self._send(429, b'Too Many Requests', 'text/plain', {'Retry-After': '1'})
+                elif entry is None:
+                    self._send(404, b'Not recorded', 'text/plain')
+                else:
+                    self._send(entry['status'], server.archive.read(entry),
+                               entry.get('content_type') or 'text/html; charset=utf-8')
+
+            def _send(self, status, body, content_type, extra_headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+class StandInProxy:
+    """
+    Minimal forward proxy for plain-HTTP requests (e.g. to the replay server). Like a site limiting
+    one IP, it answers `block_status` once more than `max_per_second` requests arrived within a second
+    """
+
+    def __init__(self, host=REPLAY_HOST, port=0, max_per_second=None, block_status=429):
+        self.host = host
+        self.port = port
+        self.max_per_second = max_per_second
+        self.block_status = block_status
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.stats = {'forwarded': 0, 'blocked': 0}
+        self.upstream = requests.Session()
+        self.upstream.trust_env = False  # never chain into the environment's own proxy
+        self.httpd = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _over_limit(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] >= 1.0:
+                self.recent.popleft()
+            blocked = self.max_per_second is not None and len(self.recent) >= self.max_per_second
+            if not blocked:
+                self.recent.append(now)
+            self.stats['blocked' if blocked else 'forwarded'] += 1
+        return blocked
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def _make_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if proxy._over_limit():
+                    self._send(proxy.block_status, b'Rate limited', 'text/plain', {'Retry-After': '1'})
+                    return
+                if not self.path.startswith('http://'):
+                    self._send(400, b'Absolute http:// URL expected', 'text/plain')
+                    return
+                try:
+                    headers = {name: value for name, value in self.headers.items()
+                               if name.lower() not in ('host', 'proxy-connection', 'connection')}
+                    response = proxy.upstream.get(self.path, headers=headers, timeout=30)
+                except requests.RequestException as e:
+                    self._send(502, str(e).encode('utf-8'), 'text/plain')
+                    return
+                self._send(response.status_code, response.content,
+                           response.headers.get('Content-Type', 'application/octet-stream'))
+
+            def _send(self, status, body, content_type, extra_headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def start_stand_in_proxies(count, base_port=PROXY_BASE_PORT, max_per_second=None):
+    """Start `count` stand-in proxies on consecutive ports; returns them (their .url go to --proxies)"""
+    return [StandInProxy(port=base_port + i if base_port else 0, max_per_second=max_per_second).start()
+            for i in range(count)]
+
+def record_urls(urls, archive_dir=ARCHIVE_DIR):
+    """Fetch URLs from the real sites into the archive so they can be replayed"""
+    from scrape_esperance_2012_2025_all_seasons import create_session
+
+    archive = PageArchive(archive_dir)
+    session = create_session()
+    for url in urls:
+        try:
+            response = session.get(url, timeout=30)
+            archive.store(url, response.status_code, response.headers.get('Content-Type', ''), response.content)
+            print(f"✅ Recorded {url} (HTTP {response.status_code}, {len(response.content)} bytes)")
+        except Exception as e:
+            print(f"❌ Could not record {url}: {e}")
+
+def record_browser_urls(urls, archive_dir=ARCHIVE_DIR):
+    """Open Flashscore pages in the browser pool and archive every document, script and XHR they load"""
+    import asyncio
+
+    from browser_pool import BrowserPool
+
+    async def run():
+        async with BrowserPool(profile='record', block_resources=True, archive=PageArchive(archive_dir)) as pool:
+            for url in urls:
+                async with pool.page() as page:
+                    try:
+                        await page.goto(url, wait_until="networkidle", timeout=60000)
+                        print(f"✅ Recorded {url} and its resources")
+                    except Exception as e:
+                        print(f"❌ Could not record {url}: {e}")
+
+    asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Record pages or replay them from a local server")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Serve the archive")
+    serve.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    serve.add_argument('--port', type=int, default=REPLAY_PORT)
+    serve.add_argument('--latency', type=float, default=0, help="Base latency in ms")
+    serve.add_argument('--jitter', type=float, default=0, help="Latency jitter in ms (+/-)")
+    serve.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 429")
+
+    record = subparsers.add_parser('record', help="Fetch URLs into the archive")
+    record.add_argument('urls', nargs='+')
+    record.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    record.add_argument('--browser', action='store_true', help="Record JS pages with everything they load")
+
+    proxies = subparsers.add_parser('proxies', help="Run local stand-in proxies for testing the proxy pool")
+    proxies.add_argument('--count', type=int, default=3)
+    proxies.add_argument('--base-port', type=int, default=PROXY_BASE_PORT)
+    proxies.add_argument('--max-per-second', type=int, default=None, help="Requests per second before a proxy answers 429")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if args.browser:
+            record_browser_urls(args.urls, args.archive_dir)
+        else:
+            record_urls(args.urls, args.archive_dir)
+        return
+
+    if args.command == 'proxies':
+        stand_ins = start_stand_in_proxies(args.count, args.base_port, args.max_per_second)
+        print(f"🔀 Stand-in proxies: --proxies {','.join(p.url for p in stand_ins)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            for proxy in stand_ins:
+                proxy.stop()
+            print(f"\n👋 Proxies stopped: {[p.stats for p in stand_ins]}")
+        return
+
+    server = ReplayServer(args.archive_dir, port=args.port, latency_ms=args.latency,
+                          jitter_ms=args.jitter, error_rate=args.error_rate).start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"\n👋 Replay server stopped: {server.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Run metrics for the scrapers
+Per-stage wall time and counts, requests by status code and cache hit ratios,
+exported as a JSON summary and optionally as a Prometheus text file
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Stages reported for every run, in this order:
+#   connect  - DNS + connect + waiting for the response headers (requests doesn't expose them separately)
+#   download - reading the response body / loading the page
+#   parse    - building the BeautifulSoup tree
+#   extract  - running the extractors on a parsed page
+#   sleep    - politeness delays
+#   write    - writing CSV/JSON output and archiving pages
+# Stages overlap when pages are fetched concurrently, so their sum can exceed the wall time
+STAGES = ['connect', 'download', 'parse', 'extract', 'sleep', 'write']
+
+class RunMetrics:
+    """Thread-safe accumulator for one scraper run"""
+
+    def __init__(self, name='scraper'):
+        self.reset(name)
+
+    def reset(self, name=None):
+        self.name = name or getattr(self, 'name', 'scraper')
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.stage_counts = {stage: 0 for stage in STAGES}
+        self.status_codes = {}
+        self.bytes_downloaded = 0
+        self.cache = {}
+        self.counters = {}
+
+    def add_time(self, stage, seconds, count=1):
+        with self.lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_counts[stage] = self.stage_counts.get(stage, 0) + count
+
+    @contextmanager
+    def stage(self, stage):
+        """Time a block: `with metrics.stage('parse'): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def record_response(self, status_code, total_seconds, headers_seconds=None, size=0):
+        """Account one HTTP request: time to headers as 'connect', the rest as 'download'"""
+        headers_seconds = total_seconds if headers_seconds is None else min(headers_seconds, total_seconds)
+        with self.lock:
+            key = str(status_code)
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+            self.bytes_downloaded += size
+        self.add_time('connect', headers_seconds)
+        self.add_time('download', total_seconds - headers_seconds)
+
+    def cache_hit(self, cache='default'):
+        with self.lock:
+            self.cache.setdefault(cache, {'hits': 0, 'misses': 0})['hits'] += 1
+
+    def cache_miss(self, cache='default'):
+        with self.lock:
+            self.cache.setdefault(cache, {'hits': 0, 'misses': 0})['misses'] += 1
+
+    def incr(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def summary(self):
+        wall = time.perf_counter() - self.start
+        with self.lock:
+            stages = {
+                stage: {
+                    'seconds': round(self.stage_seconds[stage], 4),
+                    'count': self.stage_counts[stage],
+                    'share_of_wall': round(self.stage_seconds[stage] / wall, 4) if wall else 0.0,
+                }
+                for stage in self.stage_seconds
+            }
+            cache = {
+                name: dict(counts, hit_ratio=round(counts['hits'] / (counts['hits'] + counts['misses']), 4)
+                           if counts['hits'] + counts['misses'] else 0.0)
+                for name, counts in self.cache.items()
+            }
+            return {
+                'run': self.name,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'wall_seconds': round(wall, 3),
+                'stages': stages,
+                'requests': {
+                    'total': sum(self.status_codes.values()),
+                    'by_status': dict(sorted(self.status_codes.items())),
+                    'bytes': self.bytes_downloaded,
+                },
+                'cache': cache,
+                'counters': dict(self.counters),
+            }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write('\n')
+
+    def write_prometheus(self, path):
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)"""
+        summary = self.summary()
+        run = summary['run']
+        lines = [
+            '# HELP scraper_run_wall_seconds Wall time of the last run',
+            '# TYPE scraper_run_wall_seconds gauge',
+            f'scraper_run_wall_seconds{{run="{run}"}} {summary["wall_seconds"]}',
+            '# HELP scraper_stage_seconds Time spent per stage in the last run',
+            '# TYPE scraper_stage_seconds gauge',
+        ]
+        lines += [f'scraper_stage_seconds{{run="{run}",stage="{stage}"}} {values["seconds"]}'
+                  for stage, values in summary['stages'].items()]
+        lines += ['# HELP scraper_stage_operations Operations per stage in the last run',
+                  '# TYPE scraper_stage_operations gauge']
+        lines += [f'scraper_stage_operations{{run="{run}",stage="{stage}"}} {values["count"]}'
+                  for stage, values in summary['stages'].items()]
+        lines += ['# HELP scraper_requests Requests by HTTP status in the last run',
+                  '# TYPE scraper_requests gauge']
+        lines += [f'scraper_requests{{run="{run}",status="{status}"}} {count}'
+                  for status, count in summary['requests']['by_status'].items()]
+        lines += ['# HELP scraper_cache_hit_ratio Cache hit ratio in the last run',
+                  '# TYPE scraper_cache_hit_ratio gauge']
+        lines += [f'scraper_cache_hit_ratio{{run="{run}",cache="{name}"}} {values["hit_ratio"]}'
+                  for name, values in summary['cache'].items()]
+        lines += ['# HELP scraper_items Items processed in the last run',
+                  '# TYPE scraper_items gauge']
+        lines += [f'scraper_items{{run="{run}",item="{name}"}} {count}'
+                  for name, count in summary['counters'].items()]
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n{'='*80}")
+        print(f"⏱️ RUN METRICS ({summary['run']}, {summary['wall_seconds']:.1f}s wall)")
+        print(f"{'='*80}")
+        for stage, values in summary['stages'].items():
+            print(f"   {stage:<10} {values['seconds']:>10.2f}s  {values['share_of_wall']*100:>5.1f}%  ({values['count']} ops)")
+        print(f"   Requests: {summary['requests']['total']} {summary['requests']['by_status']}")
+        for name, values in summary['cache'].items():
+            print(f"   Cache {name}: {values['hits']} hits / {values['misses']} misses ({values['hit_ratio']*100:.1f}%)")
+        for name, count in summary['counters'].items():
+            print(f"   {name}: {count}")
+
+# Shared instance used by the scraper modules
+metrics = RunMetrics()
+
+def add_metrics_arguments(parser):
+    """--metrics-json / --prometheus options shared by the entry points"""
+    parser.add_argument('--metrics-json', help="Write the run metrics summary to this JSON file")
+    parser.add_argument('--prometheus', help="Also write the run metrics as a Prometheus text file")
+
+def export_metrics(args):
+    """Print the summary and write the files requested on the command line"""
+    metrics.print_summary()
+    if getattr(args, 'metrics_json', None):
+        metrics.write_json(args.metrics_json)
+        print(f"💾 Metrics written to {args.metrics_json}")
+    if getattr(args, 'prometheus', None):
+        metrics.write_prometheus(args.prometheus)
+        print(f"💾 Prometheus metrics written to {args.prometheus}")
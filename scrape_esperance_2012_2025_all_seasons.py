@@ -3,8 +3,8 @@ Transfermarkt Scraper for Esperance de Tunis - Multiple Seasons (2012-2025)
 Extracts complete player data including current club information for all seasons
 """
 
-import requests
 from bs4 import BeautifulSoup
+import argparse
 import csv
 import time
 import random
@@ -12,6 +12,14 @@ from urllib.parse import urljoin
 import re
 from datetime import datetime
 import json
+import multiprocessing
+
+import profiling
+from dataset_aggregates import DatasetAggregates
+from page_archive import ARCHIVE_DIR, PageArchive
+from parse_cache import ParseCache, add_parse_cache_argument
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+from transport import add_transport_argument, check_transport_arguments, create_client, create_proxy_pool
 
 # Configuration
 START_YEAR = 2012
@@ -35,16 +43,49 @@ HEADERS = {
     "Referer": "https://www.transfermarkt.com/"
 }
 
-def create_session():
-    """Create a session with proper configuration"""
-    session = requests.Session()
-    session.headers.update(HEADERS)
+# Set to a PageArchive to keep a compressed copy of every fetched page (see main)
+PAGE_ARCHIVE = None
+
+# Set to a ParseCache to reuse the extraction results of pages whose content hasn't changed (see main)
+PARSE_CACHE = None
+
+# Random politeness delays between requests (turned off when benchmarking against a local replay)
+THROTTLE = True
+
+# Set to a throttle.HostRateLimiter when several threads share one politeness budget (see squad_crawler)
+RATE_LIMITER = None
+
+def create_session(transport=None, proxy_pool=None):
+    """Create a session with proper configuration ('requests' or 'http2' transport, optional proxy pool, see transport.py)"""
+    session = create_client(transport, HEADERS, proxy_pool)
     session.cookies.update({
         'tm_cookie_consent': 'functional%2Cstatistics%2Cmarketing',
         'oneTrustCookie': 'true'
     })
     return session
 
+def polite_sleep(low, high):
+    """Random delay between requests to stay under the site's rate limits"""
+    if THROTTLE:
+        with metrics.stage('sleep'):
+            time.sleep(random.uniform(low, high))
+
+def fetch_page(session, url, timeout, headers=None):
+    """GET a page and archive the raw response when an archive is configured (headers override the session's)"""
+    if RATE_LIMITER is not None:
+        RATE_LIMITER.wait_for_url(url)
+    start = time.perf_counter()
+    response = session.get(url, timeout=timeout, headers=headers)
+    metrics.record_response(response.status_code, time.perf_counter() - start,
+                            response.elapsed.total_seconds(), len(response.content))
+    if PAGE_ARCHIVE is not None:
+        try:
+            with metrics.stage('write'):
+                PAGE_ARCHIVE.store(url, response.status_code, response.headers.get('Content-Type', ''), response.content)
+        except Exception as e:
+            print(f"      ⚠️ Could not archive {url}: {e}")
+    return response
+
 def extract_player_image(soup):
     """Extract player image URL from profile page"""
     try:
@@ -181,6 +222,162 @@ def extract_current_club_info(soup):
         'Current_Club_Country': ''
     }
 
+def parse_header_date(text):
+    """'Jun 30, 2026' or '30.06.2026' -> '2026-06-30' ('' for '-' or anything else)"""
+    text = (text or '').strip()
+    for fmt in ('%b %d, %Y', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return ''
+
+def extract_labelled_date(soup, label):
+    """Date next to a label such as 'Contract expires:' in the profile header or info table"""
+    try:
+        for span in soup.find_all('span', class_='data-header__label'):
+            if span.get_text(strip=True).lower().startswith(label.lower()):
+                content = span.find('span', class_='data-header__content')
+                if content:
+                    return parse_header_date(content.get_text(strip=True))
+
+        info_table = soup.find('div', class_='info-table')
+        if info_table:
+            content_spans = info_table.find_all('span', class_='info-table__content')
+            for i, span in enumerate(content_spans[:-1]):
+                if span.get_text(strip=True).lower().startswith(label.lower()):
+                    return parse_header_date(content_spans[i + 1].get_text(strip=True))
+    except:
+        pass
+    return ''
+
+def extract_contract_expiry(soup):
+    """Contract expiry of the current club as YYYY-MM-DD ('' if unknown or without club)"""
+    return extract_labelled_date(soup, 'Contract expires')
+
+def parse_player_details(html):
+    """Extract age, height, nationality, image and current club from a profile page's HTML"""
+    if PARSE_CACHE is not None:
+        return PARSE_CACHE.get_or_parse(_parse_player_details, html)
+    return _parse_player_details(html)
+
+def _parse_player_details(html):
+    with metrics.stage('parse'):
+        soup = BeautifulSoup(html, 'html.parser')
+    with metrics.stage('extract'):
+        return extract_player_details(soup)
+
+def extract_player_details(soup):
+    """Profile fields from an already parsed profile page"""
+    details = {}
+
+    # Extract Age and Birth Date
+    try:
+        birth_span = soup.find('span', {'itemprop': 'birthDate'})
+        if birth_span:
+            birth_text = birth_span.get_text(strip=True)
+            # Parse "Jan 15, 2003 (22)" or "15.01.2003 (22)"
+            age_match = re.search(r'\((\d{1,2})\)', birth_text)
+            if age_match:
+                details['Age'] = age_match.group(1)
+
+            # Extract birth date
+            date_match = re.search(r'([A-Za-z]{3}\s+\d{1,2},\s+\d{4}|\d{1,2}\.\d{1,2}\.\d{4})', birth_text)
+            if date_match:
+                details['Birth'] = date_match.group(1)
+    except:
+        pass
+
+    # Extract Height
+    try:
+        height_span = soup.find('span', {'itemprop': 'height'})
+        if height_span:
+            height_text = height_span.get_text(strip=True)
+            # Parse "1.85 m" or "185 cm"
+            height_match = re.search(r'(\d{1,2}[.,]\d{2})\s*m', height_text)
+            if height_match:
+                details['Height'] = height_match.group(1).replace(',', '.') + 'm'
+    except:
+        pass
+
+    # Extract Nationality
+    try:
+        # Method 1: Look in info-table for "Citizenship:" label
+        info_table = soup.find('div', class_='info-table')
+        if info_table:
+            content_spans = info_table.find_all('span', class_='info-table__content')
+            for i, span in enumerate(content_spans):
+                span_text = span.get_text(strip=True).lower()
+                if 'citizenship' in span_text:
+                    # Next span should have the nationality
+                    if i + 1 < len(content_spans):
+                        nat_span = content_spans[i + 1]
+                        # Look for flag image
+                        flag_img = nat_span.find('img', class_='flaggenrahmen')
+                        if flag_img:
+                            nationality = flag_img.get('title', '').strip() or flag_img.get('alt', '').strip()
+                            if nationality and len(nationality) > 1:
+                                details['Nationality'] = nationality
+                                break
+                        # Fallback: get text after flag
+                        nat_text = nat_span.get_text(strip=True)
+                        if nat_text and len(nat_text) > 1:
+                            details['Nationality'] = nat_text
+                            break
+
+        # Method 2: Look in data-header for citizenship
+        if 'Nationality' not in details:
+            data_header = soup.find('div', class_='data-header__details')
+            if data_header:
+                # Look for spans with flag images
+                flag_imgs = data_header.find_all('img', class_='flaggenrahmen')
+                for flag in flag_imgs:
+                    # Make sure it's not a club/league flag
+                    parent_text = flag.find_parent(['span', 'div']).get_text().lower() if flag.find_parent(['span', 'div']) else ''
+                    if any(keyword in parent_text for keyword in ['citizenship', 'nationality', 'citizen']):
+                        nationality = flag.get('title', '').strip() or flag.get('alt', '').strip()
+                        if nationality and len(nationality) > 1:
+                            details['Nationality'] = nationality
+                            break
+    except:
+        pass
+
+    # Extract Player Image
+    details['Player_Image'] = extract_player_image(soup)
+
+    # Extract current club information
+    club_info = extract_current_club_info(soup)
+    details.update(club_info)
+
+    # Contract dates (used to decide how often a profile needs refreshing)
+    details['Contract_Expires'] = extract_contract_expiry(soup)
+    details['Joined'] = extract_labelled_date(soup, 'Joined')
+
+    # Post-process: Check if "club" is actually a country (national team page)
+    # This indicates the player is likely retired
+    country_names = [
+        'Tunisia', 'Algeria', 'Morocco', 'Egypt', 'Libya', 'Ivory Coast', 
+        'Cote d\'Ivoire', 'Nigeria', 'Ghana', 'Senegal', 'Cameroon', 
+        'South Africa', 'Mali', 'Burkina Faso', 'France', 'Germany', 
+        'Spain', 'Italy', 'England', 'Portugal', 'Brazil', 'Argentina'
+    ]
+
+    if details.get('Current_Club') in country_names:
+        # This is a national team page, player is likely retired or without club
+        details['Current_Club'] = 'Retired'
+        details['Current_Club_URL'] = ''
+        details['Current_Club_Logo'] = ''
+        details['Current_Club_Country'] = ''
+
+    # Clear club details for "Without Club" or "Retired" players
+    if details.get('Current_Club') in ['Without Club', 'Retired']:
+        details['Current_Club_URL'] = ''
+        details['Current_Club_Logo'] = ''
+        details['Current_Club_Country'] = ''
+        details['Contract_Expires'] = ''
+
+    return details
+
 def get_player_details(session, player_url, player_name, debug=False):
     """Get detailed information from player profile page"""
     if not player_url:
@@ -191,115 +388,14 @@ def get_player_details(session, player_url, player_name, debug=False):
             print(f"      🔍 Fetching details for: {player_name}")
         
         # Add random delay
-        time.sleep(random.uniform(0.8, 1.5))
+        polite_sleep(0.8, 1.5)
         
-        response = session.get(player_url, timeout=20)
+        response = fetch_page(session, player_url, timeout=20)
         if response.status_code != 200:
             print(f"      ❌ Failed to fetch player page: HTTP {response.status_code}")
             return {}
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        details = {}
-        
-        # Extract Age and Birth Date
-        try:
-            birth_span = soup.find('span', {'itemprop': 'birthDate'})
-            if birth_span:
-                birth_text = birth_span.get_text(strip=True)
-                # Parse "Jan 15, 2003 (22)" or "15.01.2003 (22)"
-                age_match = re.search(r'\((\d{1,2})\)', birth_text)
-                if age_match:
-                    details['Age'] = age_match.group(1)
-                
-                # Extract birth date
-                date_match = re.search(r'([A-Za-z]{3}\s+\d{1,2},\s+\d{4}|\d{1,2}\.\d{1,2}\.\d{4})', birth_text)
-                if date_match:
-                    details['Birth'] = date_match.group(1)
-        except:
-            pass
-        
-        # Extract Height
-        try:
-            height_span = soup.find('span', {'itemprop': 'height'})
-            if height_span:
-                height_text = height_span.get_text(strip=True)
-                # Parse "1.85 m" or "185 cm"
-                height_match = re.search(r'(\d{1,2}[.,]\d{2})\s*m', height_text)
-                if height_match:
-                    details['Height'] = height_match.group(1).replace(',', '.') + 'm'
-        except:
-            pass
-        
-        # Extract Nationality
-        try:
-            # Method 1: Look in info-table for "Citizenship:" label
-            info_table = soup.find('div', class_='info-table')
-            if info_table:
-                content_spans = info_table.find_all('span', class_='info-table__content')
-                for i, span in enumerate(content_spans):
-                    span_text = span.get_text(strip=True).lower()
-                    if 'citizenship' in span_text:
-                        # Next span should have the nationality
-                        if i + 1 < len(content_spans):
-                            nat_span = content_spans[i + 1]
-                            # Look for flag image
-                            flag_img = nat_span.find('img', class_='flaggenrahmen')
-                            if flag_img:
-                                nationality = flag_img.get('title', '').strip() or flag_img.get('alt', '').strip()
-                                if nationality and len(nationality) > 1:
-                                    details['Nationality'] = nationality
-                                    break
-                            # Fallback: get text after flag
-                            nat_text = nat_span.get_text(strip=True)
-                            if nat_text and len(nat_text) > 1:
-                                details['Nationality'] = nat_text
-                                break
-            
-            # Method 2: Look in data-header for citizenship
-            if 'Nationality' not in details:
-                data_header = soup.find('div', class_='data-header__details')
-                if data_header:
-                    # Look for spans with flag images
-                    flag_imgs = data_header.find_all('img', class_='flaggenrahmen')
-                    for flag in flag_imgs:
-                        # Make sure it's not a club/league flag
-                        parent_text = flag.find_parent(['span', 'div']).get_text().lower() if flag.find_parent(['span', 'div']) else ''
-                        if any(keyword in parent_text for keyword in ['citizenship', 'nationality', 'citizen']):
-                            nationality = flag.get('title', '').strip() or flag.get('alt', '').strip()
-                            if nationality and len(nationality) > 1:
-                                details['Nationality'] = nationality
-                                break
-        except:
-            pass
-        
-        # Extract Player Image
-        details['Player_Image'] = extract_player_image(soup)
-        
-        # Extract current club information
-        club_info = extract_current_club_info(soup)
-        details.update(club_info)
-        
-        # Post-process: Check if "club" is actually a country (national team page)
-        # This indicates the player is likely retired
-        country_names = [
-            'Tunisia', 'Algeria', 'Morocco', 'Egypt', 'Libya', 'Ivory Coast', 
-            'Cote d\'Ivoire', 'Nigeria', 'Ghana', 'Senegal', 'Cameroon', 
-            'South Africa', 'Mali', 'Burkina Faso', 'France', 'Germany', 
-            'Spain', 'Italy', 'England', 'Portugal', 'Brazil', 'Argentina'
-        ]
-        
-        if details.get('Current_Club') in country_names:
-            # This is a national team page, player is likely retired or without club
-            details['Current_Club'] = 'Retired'
-            details['Current_Club_URL'] = ''
-            details['Current_Club_Logo'] = ''
-            details['Current_Club_Country'] = ''
-        
-        # Clear club details for "Without Club" or "Retired" players
-        if details.get('Current_Club') in ['Without Club', 'Retired']:
-            details['Current_Club_URL'] = ''
-            details['Current_Club_Logo'] = ''
-            details['Current_Club_Country'] = ''
+        details = parse_player_details(response.text)
         
         if debug:
             print(f"      ✅ Extracted: Age={details.get('Age', 'N/A')}, Height={details.get('Height', 'N/A')}, "
@@ -402,10 +498,73 @@ def extract_market_value(row):
     
     return ""
 
+def squad_page_url(year, club_name=CLUB_NAME, club_id=CLUB_ID):
+    """Transfermarkt squad page of a club (Esperance by default) for a season"""
+    return f"https://www.transfermarkt.com/{club_name}/kader/verein/{club_id}/saison_id/{year}"
+
+def parse_squad_rows(html):
+    """Extract name, profile URL, jersey number, position and market value for each squad row (None if no table)"""
+    if PARSE_CACHE is not None:
+        return PARSE_CACHE.get_or_parse(_parse_squad_rows, html)
+    return _parse_squad_rows(html)
+
+def _parse_squad_rows(html):
+    with metrics.stage('parse'):
+        soup = BeautifulSoup(html, 'html.parser')
+    with metrics.stage('extract'):
+        return extract_squad_rows(soup)
+
+def extract_squad_rows(soup):
+    """Squad rows from an already parsed squad page (None if no table)"""
+    # Find the squad table
+    table = soup.find('table', class_='items')
+    if not table:
+        return None
+    
+    squad = []
+    for i, row in enumerate(table.find_all('tr', class_=['odd', 'even']), 1):
+        try:
+            # Extract player name and profile URL
+            player_link = row.find('a', href=lambda x: x and '/profil/spieler/' in x)
+            if not player_link:
+                continue
+            
+            squad.append({
+                'Player': player_link.get_text(strip=True),
+                'Profile_URL': urljoin("https://www.transfermarkt.com", player_link.get('href', '')),
+                'Jersey_Number': extract_jersey_number(row),
+                'Position': extract_position(row),
+                'Market_Value': extract_market_value(row)
+            })
+        except Exception as e:
+            print(f"   ❌ Error processing player {i}: {e}")
+            continue
+    
+    return squad
+
+def build_player_record(squad_row, year, player_details):
+    """Combine a squad row and the profile details into one dataset record"""
+    return {
+        'Player': squad_row['Player'],
+        'Season': f"{year}/{year+1}",
+        'Jersey_Number': squad_row['Jersey_Number'],
+        'Age': player_details.get('Age', ''),
+        'Height': player_details.get('Height', ''),
+        'Position': squad_row['Position'],
+        'Nationality': player_details.get('Nationality', ''),
+        'Player_Image': player_details.get('Player_Image', ''),
+        'Profile_URL': squad_row['Profile_URL'],
+        'Current_Club': player_details.get('Current_Club', 'Without Club'),
+        'Current_Club_URL': player_details.get('Current_Club_URL', ''),
+        'Current_Club_Logo': player_details.get('Current_Club_Logo', ''),
+        'Current_Club_Country': player_details.get('Current_Club_Country', ''),
+        'Market_Value': squad_row['Market_Value']
+    }
+
 def scrape_season(session, year, debug=False):
     """Scrape squad data for a specific season"""
     
-    squad_url = f"https://www.transfermarkt.com/{CLUB_NAME}/kader/verein/{CLUB_ID}/saison_id/{year}"
+    squad_url = squad_page_url(year)
     
     print(f"\n{'='*80}")
     print(f"📅 Season {year}/{year+1}")
@@ -414,73 +573,40 @@ def scrape_season(session, year, debug=False):
     
     try:
         # Add delay between seasons
-        time.sleep(random.uniform(2.0, 4.0))
+        polite_sleep(2.0, 4.0)
         
-        response = session.get(squad_url, timeout=30)
+        response = fetch_page(session, squad_url, timeout=30)
         
         if response.status_code != 200:
             print(f"❌ Failed to fetch squad page: HTTP {response.status_code}")
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the squad table
-        table = soup.find('table', class_='items')
-        if not table:
+        squad = parse_squad_rows(response.text)
+        if squad is None:
             print("❌ Could not find squad table")
             return []
         
         players_data = []
-        rows = table.find_all('tr', class_=['odd', 'even'])
         
-        print(f"✅ Found {len(rows)} players")
+        print(f"✅ Found {len(squad)} players")
         
-        for i, row in enumerate(rows, 1):
+        for i, squad_row in enumerate(squad, 1):
             try:
-                # Extract player name and profile URL
-                player_link = row.find('a', href=lambda x: x and '/profil/spieler/' in x)
-                if not player_link:
-                    continue
-                
-                player_name = player_link.get_text(strip=True)
-                player_url = urljoin("https://www.transfermarkt.com", player_link.get('href', ''))
-                
-                # Extract basic info from table
-                jersey_number = extract_jersey_number(row)
-                position = extract_position(row)
-                market_value = extract_market_value(row)
-                
                 # Get detailed player information (only for first 3 players in debug mode)
-                player_details = get_player_details(session, player_url, player_name, debug=debug and i <= 3)
+                player_details = get_player_details(session, squad_row['Profile_URL'], squad_row['Player'], debug=debug and i <= 3)
                 
-                # Compile all data
-                player_data = {
-                    'Player': player_name,
-                    'Season': f"{year}/{year+1}",
-                    'Jersey_Number': jersey_number,
-                    'Age': player_details.get('Age', ''),
-                    'Height': player_details.get('Height', ''),
-                    'Position': position,
-                    'Nationality': player_details.get('Nationality', ''),
-                    'Player_Image': player_details.get('Player_Image', ''),
-                    'Profile_URL': player_url,
-                    'Current_Club': player_details.get('Current_Club', 'Without Club'),
-                    'Current_Club_URL': player_details.get('Current_Club_URL', ''),
-                    'Current_Club_Logo': player_details.get('Current_Club_Logo', ''),
-                    'Current_Club_Country': player_details.get('Current_Club_Country', ''),
-                    'Market_Value': market_value
-                }
-                
-                players_data.append(player_data)
+                players_data.append(build_player_record(squad_row, year, player_details))
+                metrics.incr('players')
                 
                 # Show progress every 10 players
                 if i % 10 == 0:
-                    print(f"  Progress: {i}/{len(rows)} players processed...")
+                    print(f"  Progress: {i}/{len(squad)} players processed...")
                 
             except Exception as e:
                 print(f"   ❌ Error processing player {i}: {e}")
                 continue
         
+        metrics.incr('seasons')
         print(f"✅ Successfully scraped {len(players_data)} players from {year}/{year+1}")
         return players_data
         
@@ -529,8 +655,8 @@ def remove_duplicates(all_players):
     
     return unique_players
 
-def save_to_csv(players_data, filename):
-    """Save player data to CSV file"""
+def save_to_csv(players_data, filename, aggregates=None):
+    """Save player data to CSV file, with the statistics read from (and the aggregates saved next to it)"""
     if not players_data:
         print("\n❌ No data to save!")
         return
@@ -540,7 +666,7 @@ def save_to_csv(players_data, filename):
     print(f"{'='*80}")
     
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
+        with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
             fieldnames = [
                 'Player', 'Season', 'Jersey_Number', 'Age', 'Height', 'Position',
                 'Nationality', 'Player_Image', 'Profile_URL', 'Current_Club',
@@ -554,25 +680,102 @@ def save_to_csv(players_data, filename):
         
         print(f"✅ Successfully saved {len(players_data)} players to {filename}")
         
+        if aggregates is None:
+            aggregates = DatasetAggregates()
+            aggregates.upsert_many(players_data)
+        aggregates.save(filename)
+        
         # Print statistics
         print(f"\n📊 DATA STATISTICS:")
-        complete_fields = {
-            'Age': len([p for p in players_data if p['Age']]),
-            'Height': len([p for p in players_data if p['Height']]),
-            'Position': len([p for p in players_data if p['Position']]),
-            'Nationality': len([p for p in players_data if p['Nationality']]),
-            'Current_Club': len([p for p in players_data if p['Current_Club'] not in ['', 'Without Club']]),
-        }
-        
-        for field, count in complete_fields.items():
-            percentage = (count / len(players_data) * 100) if len(players_data) > 0 else 0
-            print(f"   {field}: {count}/{len(players_data)} ({percentage:.1f}%)")
+        for field, (count, total) in aggregates.completeness_report().items():
+            percentage = (count / total * 100) if total > 0 else 0
+            print(f"   {field}: {count}/{total} ({percentage:.1f}%)")
         
     except Exception as e:
         print(f"❌ Error saving to CSV: {e}")
 
+# Worker state for --reparse (one archive handle and index per process)
+_reparse_archive = None
+_reparse_index = None
+
+def _init_reparse_worker(archive_dir):
+    global _reparse_archive, _reparse_index
+    _reparse_archive = PageArchive(archive_dir)
+    _reparse_index = _reparse_archive.latest_entries()
+
+def _archived_html(url):
+    entry = _reparse_index.get(url)
+    if entry is None or entry['status'] != 200:
+        return None
+    return _reparse_archive.read_text(entry)
+
+def _reparse_squad(task):
+    year, squad_url = task
+    html = _archived_html(squad_url)
+    return year, (parse_squad_rows(html) or []) if html else []
+
+def _reparse_profile(profile_url):
+    html = _archived_html(profile_url)
+    return profile_url, (parse_player_details(html) if html else None)
+
+def reparse_archive(archive_dir=ARCHIVE_DIR, workers=None):
+    """Re-run the extractors over the archived squad and profile pages, with no network access"""
+    archive = PageArchive(archive_dir)
+    index = archive.latest_entries()
+    squad_pattern = re.compile(rf"/kader/verein/{CLUB_ID}/saison_id/(\d+)")
+
+    tasks = []
+    for url, entry in index.items():
+        found = squad_pattern.search(url)
+        if found and START_YEAR <= int(found.group(1)) <= CURRENT_YEAR and entry['status'] == 200:
+            tasks.append((int(found.group(1)), url))
+    tasks.sort()
+
+    print(f"📦 Archive: {len(index)} pages, {len(tasks)} squad pages for {START_YEAR}-{CURRENT_YEAR}")
+
+    with multiprocessing.Pool(workers, initializer=_init_reparse_worker, initargs=(archive_dir,)) as pool:
+        squads = dict(pool.map(_reparse_squad, tasks))
+
+        # Each profile is parsed once even when the player appears in several seasons
+        profile_urls = sorted({row['Profile_URL'] for squad in squads.values() for row in squad})
+        profiles = dict(pool.imap_unordered(_reparse_profile, profile_urls, chunksize=8))
+
+    missing = [url for url, details in profiles.items() if details is None]
+    if missing:
+        print(f"⚠️ {len(missing)} profiles are not in the archive; their details are left empty")
+
+    all_players = []
+    for year in sorted(squads):
+        for squad_row in squads[year]:
+            all_players.append(build_player_record(squad_row, year, profiles.get(squad_row['Profile_URL']) or {}))
+        print(f"✅ {year}/{year+1}: {len(squads[year])} players")
+
+    return all_players
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Scrape Esperance de Tunis squads from Transfermarkt")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="Where raw pages are archived")
+    parser.add_argument('--no-archive', action='store_true', help="Don't archive fetched pages")
+    parser.add_argument('--reparse', action='store_true', help="Rebuild the dataset from the archive, without network")
+    parser.add_argument('--workers', type=int, default=None, help="Processes used by --reparse (default: all cores)")
+    add_transport_argument(parser, proxies=True)
+    add_parse_cache_argument(parser)
+    add_metrics_arguments(parser)
+    profiling.add_profile_argument(parser, 'profile_transfermarkt')
+    args = parser.parse_args()
+    check_transport_arguments(parser, args)
+    metrics.reset('transfermarkt')
+    
+    with profiling.profiled(args.profile):
+        run(args)
+    
+    export_metrics(args)
+
+def run(args):
+    """One scraper run (network or --reparse) up to the saved CSV"""
+    global PAGE_ARCHIVE, PARSE_CACHE, THROTTLE
+    
     print("\n" + "="*80)
     print("🚀 ESPERANCE DE TUNIS MULTI-SEASON SCRAPER")
     print("="*80)
@@ -580,13 +783,37 @@ def main():
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
     
-    session = create_session()
-    all_players = []
+    # Kept up to date as the seasons come in, then saved next to the CSV for the reports
+    aggregates = DatasetAggregates()
     
-    # Scrape each season
-    for year in range(START_YEAR, CURRENT_YEAR + 1):
-        season_players = scrape_season(session, year, debug=(year == START_YEAR))
-        all_players.extend(season_players)
+    if args.reparse:
+        all_players = reparse_archive(args.archive_dir, args.workers)
+        aggregates.upsert_many(all_players)
+    else:
+        if not args.no_archive:
+            PAGE_ARCHIVE = PageArchive(args.archive_dir)
+        if args.parse_cache:
+            PARSE_CACHE = ParseCache(args.parse_cache)
+            stale = PARSE_CACHE.prune([_parse_squad_rows, _parse_player_details])
+            if stale:
+                print(f"🧹 Dropped {stale} parse results of older extractor versions")
+        
+        # With a proxy pool every exit keeps its own request spacing, which replaces the fixed sleeps
+        proxy_pool = create_proxy_pool(args.proxies)
+        if proxy_pool is not None:
+            THROTTLE = False
+        session = create_session(args.transport, proxy_pool)
+        all_players = []
+        
+        # Scrape each season
+        for year in range(START_YEAR, CURRENT_YEAR + 1):
+            season_players = scrape_season(session, year, debug=(year == START_YEAR))
+            all_players.extend(season_players)
+            aggregates.upsert_many(season_players)
+            profiling.checkpoint(f"season {year}")
+        
+        if proxy_pool is not None:
+            proxy_pool.print_summary()
     
     if all_players:
         # Remove duplicates
@@ -594,7 +821,7 @@ def main():
         
         # Save to CSV
         filename = f'esperance_{START_YEAR}_{CURRENT_YEAR}_all_seasons.csv'
-        save_to_csv(unique_players, filename)
+        save_to_csv(unique_players, filename, aggregates)
         
         print("\n" + "="*80)
         print("🎉 SCRAPING COMPLETED SUCCESSFULLY!")
@@ -1,43 +1,42 @@
-from playwright.sync_api import sync_playwright
-import time
+import argparse
+import asyncio
 
-url = "https://www.flashscore.com/team/esperance-tunis/bVINpDMl/fixtures/"
-
-def scrape_fixtures():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page(user_agent=(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/115.0.0.0 Safari/537.36"
-        ))
+from browser_pool import BrowserPool
+from fixtures_crawler import crawl_page, merge_match
 
-        page.goto(url, wait_until="networkidle", timeout=90000)
-        page.wait_for_timeout(10000)  # wait 10 seconds for JS lazy loading
+url = "https://www.flashscore.com/team/esperance-tunis/bVINpDMl/fixtures/"
 
-        try:
-            page.click('button#onetrust-accept-btn-handler', timeout=5000)
-            print("✅ Accepted cookies")
-        except:
-            print("ℹ️ No cookie banner found")
+async def scrape_fixtures(pool, fixtures_url=url):
+    """Read one team's fixtures page and return its MatchRecords"""
+    return await crawl_page(pool, "Fixtures", fixtures_url, '', 'fixtures')
 
-        matches = page.query_selector_all('.event__match')
-        print(f"Found {len(matches)} matches")
+def print_fixtures(records):
+    for i, match in enumerate(records, 1):
+        if match.status == 'scheduled':
+            print(f"Match {i}: {match.kickoff or 'No time'} | {match.home_team} vs {match.away_team}")
 
-        for i, match in enumerate(matches, 1):
-            time_elem = match.query_selector('.event__time')
-            time_str = time_elem.inner_text().strip() if time_elem else "No time"
+async def main(sync=False):
+    async with BrowserPool() as pool:
+        records = await scrape_fixtures(pool)
 
-            home_elem = match.query_selector('.event__homeParticipant span')
-            away_elem = match.query_selector('.event__awayParticipant span')
+    if not sync:
+        print_fixtures(records)
+        return
 
-            home = home_elem.inner_text().strip() if home_elem else "No home team"
-            away = away_elem.inner_text().strip() if away_elem else "No away team"
+    from fixture_store import FixtureStore, print_sync_summary
 
-            if time_str.lower() not in ['live', 'postp.', 'canc.', 'abn.']:
-                print(f"Match {i}: {time_str} | {home} vs {away}")
+    matches = {}
+    for record in records:
+        merge_match(matches, record)
 
-        browser.close()                                  
+    store = FixtureStore()
+    try:
+        print_sync_summary(store.sync(matches.values()), len(matches))
+    finally:
+        store.close()
 
 if __name__ == "__main__":
-    scrape_fixtures()
+    parser = argparse.ArgumentParser(description="Scrape a team's Flashscore fixtures")
+    parser.add_argument('--sync', action='store_true', help="Write only new/changed matches to the fixture store")
+    args = parser.parse_args()
+    asyncio.run(main(sync=args.sync))
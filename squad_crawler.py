@@ -0,0 +1,198 @@
+"""
+Multi-club squad history crawler
+Crawls the Transfermarkt squads of every registry club for a range of seasons. (club, season) pairs
+run concurrently under one shared per-host politeness budget, and each player profile is
+fetched once even when the player appears at several clubs or seasons
+"""
+
+import argparse
+import csv
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import scrape_esperance_2012_2025_all_seasons as transfermarkt
+from club_registry import REGISTRY_FILE, load_registry
+from page_archive import ARCHIVE_DIR, PageArchive
+from parse_cache import ParseCache, add_parse_cache_argument
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+from throttle import MAX_INTERVAL, MIN_INTERVAL, HostRateLimiter
+from transport import add_transport_argument, check_transport_arguments, create_proxy_pool
+
+# Configuration
+OUTPUT_FILE = "tunisian_league_squads.csv"
+MAX_WORKERS = 4
+SQUAD_FIELDS = ['Club', 'Club_ID'] + [
+    'Player', 'Season', 'Jersey_Number', 'Age', 'Height', 'Position',
+    'Nationality', 'Player_Image', 'Profile_URL', 'Current_Club',
+    'Current_Club_URL', 'Current_Club_Logo', 'Current_Club_Country',
+    'Market_Value'
+]
+
+class ProfileCache:
+    """Profile URL -> details, shared by all workers; concurrent requests for one URL wait for a single fetch"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}
+
+    def get(self, profile_url, fetch):
+        with self.lock:
+            future = self.futures.get(profile_url)
+            owner = future is None
+            if owner:
+                future = self.futures[profile_url] = Future()
+
+        if not owner:
+            metrics.cache_hit('profiles')
+            return future.result()
+
+        metrics.cache_miss('profiles')
+        try:
+            details = fetch()
+        except Exception as e:
+            self._forget(profile_url)
+            future.set_exception(e)
+        else:
+            # An empty result is a failed fetch: the waiters get it, later callers fetch again
+            if not details:
+                self._forget(profile_url)
+            future.set_result(details)
+        return future.result()
+
+    def _forget(self, profile_url):
+        with self.lock:
+            self.futures.pop(profile_url, None)
+
+    def __len__(self):
+        return len(self.futures)
+
+# HTTP client used by the workers: one requests.Session per thread (sessions aren't documented as
+# thread-safe), or a single httpx client for the 'http2' transport so all threads multiplex over it.
+# With a proxy pool the per-thread sessions share it, and with it the per-exit budgets
+TRANSPORT = None
+PROXY_POOL = None
+_local = threading.local()
+_shared_session = None
+_shared_lock = threading.Lock()
+
+def thread_session():
+    global _shared_session
+    if TRANSPORT == 'http2':
+        with _shared_lock:
+            if _shared_session is None:
+                # Raises with a proxy pool, which can't drive httpx, rather than sending unpaced from one IP
+                _shared_session = transfermarkt.create_session(TRANSPORT, PROXY_POOL)
+        return _shared_session
+    if not hasattr(_local, 'session'):
+        _local.session = transfermarkt.create_session(TRANSPORT, PROXY_POOL)
+    return _local.session
+
+def crawl_club_season(club, year, profiles):
+    """Squad rows of one club in one season, each joined with its (shared) profile details"""
+    label = f"{club.name} {year}/{year+1}"
+    session = thread_session()
+    squad_url = transfermarkt.squad_page_url(year, club.tm_slug, club.tm_id)
+
+    try:
+        response = transfermarkt.fetch_page(session, squad_url, timeout=30)
+        if response.status_code != 200:
+            print(f"❌ {label}: HTTP {response.status_code}")
+            return []
+        squad = transfermarkt.parse_squad_rows(response.text)
+    except Exception as e:
+        print(f"❌ {label}: {e}")
+        return []
+
+    if squad is None:
+        print(f"⚠️ {label}: no squad table")
+        return []
+
+    records = []
+    for squad_row in squad:
+        details = profiles.get(squad_row['Profile_URL'], lambda: transfermarkt.get_player_details(
+            session, squad_row['Profile_URL'], squad_row['Player']))
+        record = transfermarkt.build_player_record(squad_row, year, details)
+        records.append(dict(record, Club=club.name, Club_ID=club.tm_id))
+        metrics.incr('players')
+
+    metrics.incr('club_seasons')
+    print(f"✅ {label}: {len(records)} players")
+    return records
+
+def crawl_squads(clubs, years, workers=MAX_WORKERS, limiter=None):
+    """Crawl every (club, season) pair; returns all player records"""
+    # A proxy pool paces each exit itself; otherwise one limiter spaces all threads' requests per host
+    transfermarkt.RATE_LIMITER = None if PROXY_POOL is not None else (limiter or HostRateLimiter())
+    transfermarkt.THROTTLE = False  # the shared limiter replaces the per-thread sleeps
+
+    profiles = ProfileCache()
+    pairs = [(club, year) for club in clubs for year in years]
+    print(f"🌐 {len(pairs)} club-seasons with {workers} workers")
+
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(crawl_club_season, club, year, profiles) for club, year in pairs]
+        for future in as_completed(futures):
+            records.extend(future.result())
+
+    print(f"👤 {len(profiles)} distinct profiles fetched for {len(records)} squad entries")
+    if PROXY_POOL is not None:
+        PROXY_POOL.print_summary()
+    records.sort(key=lambda r: (r['Club'], r['Season'], r['Player']))
+    return records
+
+def save_squads_csv(records, filename=OUTPUT_FILE):
+    with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SQUAD_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    print(f"💾 Saved {len(records)} squad entries to {filename}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl squad histories for every club of the registry")
+    parser.add_argument('--registry', default=REGISTRY_FILE)
+    parser.add_argument('--clubs', nargs='*', help="Only these club names (default: every resolved club)")
+    parser.add_argument('--start-year', type=int, default=transfermarkt.START_YEAR)
+    parser.add_argument('--end-year', type=int, default=transfermarkt.CURRENT_YEAR)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="(club, season) pairs crawled at once")
+    parser.add_argument('--min-interval', type=float, default=MIN_INTERVAL, help="Seconds between requests to a host")
+    parser.add_argument('--max-interval', type=float, default=MAX_INTERVAL)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="Where raw pages are archived")
+    parser.add_argument('--no-archive', action='store_true', help="Don't archive fetched pages")
+    add_transport_argument(parser, proxies=True)
+    add_parse_cache_argument(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    check_transport_arguments(parser, args)
+    metrics.reset('squads')
+
+    global TRANSPORT, PROXY_POOL
+    TRANSPORT = args.transport
+    PROXY_POOL = create_proxy_pool(args.proxies, args.min_interval, args.max_interval)
+
+    clubs = load_registry(args.registry)
+    if args.clubs:
+        clubs = [c for c in clubs if c.name in args.clubs]
+    missing = [c.name for c in clubs if not c.resolved]
+    if missing:
+        print(f"⚠️ Skipping clubs without a Transfermarkt ID (run 'club_registry.py --resolve'): {', '.join(missing)}")
+    clubs = [c for c in clubs if c.resolved]
+    if not clubs:
+        print("❌ No clubs to crawl")
+        return
+
+    if not args.no_archive:
+        transfermarkt.PAGE_ARCHIVE = PageArchive(args.archive_dir)
+    if args.parse_cache:
+        transfermarkt.PARSE_CACHE = ParseCache(args.parse_cache)
+
+    print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    records = crawl_squads(clubs, range(args.start_year, args.end_year + 1), workers=args.workers,
+                           limiter=HostRateLimiter(args.min_interval, args.max_interval))
+    save_squads_csv(records, args.output)
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Flashscore Standings Harvester
+Captures full league tables (position, W/D/L, goals, points, form, team link and logo)
+for several league seasons at once, one browser tab per season
+"""
+
+import argparse
+import asyncio
+import csv
+import re
+from dataclasses import dataclass, asdict, fields
+
+from browser_pool import BrowserPool
+from fixtures_crawler import LEAGUE_URL, SEASONS
+from readiness import PageNotReady, goto_ready
+from run_metrics import add_metrics_arguments, export_metrics, metrics
+
+# Configuration
+OUTPUT_FILE = "tunisian_league_standings.csv"
+CURRENT_SEASON = ("current", "fgzlZk5U", "6HCkYDZ1")  # (label, tournament ID, stage ID)
+
+STANDINGS_URL = "https://www.flashscore.com/standings/{tournament_id}/{stage_id}/#/{stage_id}/standings/overall/"
+
+# Reads every table row in one round-trip
+TABLE_JS = """
+() => {
+    const text = (root, selector) => {
+        const el = root.querySelector(selector);
+        return el ? el.textContent.trim() : '';
+    };
+    return Array.from(document.querySelectorAll('.ui-table__row')).map((row) => {
+        const participant = row.querySelector('.tableCellParticipant__block');
+        const link = participant ? participant.querySelector('a') : null;
+        const logo = participant ? participant.querySelector('img') : null;
+        return {
+            rank: text(row, '.tableCellRank, .table__cell--rank'),
+            name: participant ? participant.textContent.trim() : '',
+            link: link ? link.href : '',
+            logo: logo ? logo.src : '',
+            values: Array.from(row.querySelectorAll('.table__cell--value')).map((el) => el.textContent.trim()),
+            form: Array.from(row.querySelectorAll('.table__cell--form .tableCellFormIcon, .table__cell--form [class*="formIcon"]'))
+                .map((el) => el.textContent.trim())
+                .filter((result) => ['W', 'D', 'L'].includes(result)),
+        };
+    });
+}
+"""
+
+@dataclass
+class StandingRow:
+    """One team's line in a league table"""
+    season: str
+    position: str
+    team_name: str
+    played: str
+    wins: str
+    draws: str
+    losses: str
+    goals_for: str
+    goals_against: str
+    goal_difference: str
+    points: str
+    form: str
+    team_link: str
+    team_logo: str
+
+STANDING_FIELDS = [f.name for f in fields(StandingRow)]
+
+def standings_url(tournament_id, stage_id):
+    return STANDINGS_URL.format(tournament_id=tournament_id, stage_id=stage_id)
+
+def season_standings_url(season):
+    """Standings page of an archived league season, e.g. '2023-2024'"""
+    return f"{LEAGUE_URL}-{season}/standings/"
+
+def build_standing_row(season, raw):
+    """
+    Convert one raw table row. Value cells are MP, W, D, L, goals ("45:12"), [GD,] PTS;
+    the goal-difference column is only shown on some layouts.
+    """
+    values = raw.get('values', [])
+    if len(values) < 6:
+        return None
+
+    played, wins, draws, losses, goals = values[:5]
+    points = values[-1]
+    goals_for, _, goals_against = goals.partition(':')
+    if len(values) >= 7:
+        goal_difference = values[5]
+    elif goals_for.isdigit() and goals_against.isdigit():
+        goal_difference = str(int(goals_for) - int(goals_against))
+    else:
+        goal_difference = ''
+
+    return StandingRow(
+        season=season,
+        position=re.sub(r'\D', '', raw.get('rank', '')),
+        team_name=raw.get('name', ''),
+        played=played,
+        wins=wins,
+        draws=draws,
+        losses=losses,
+        goals_for=goals_for,
+        goals_against=goals_against,
+        goal_difference=goal_difference,
+        points=points,
+        form=''.join(raw.get('form', [])),
+        team_link=raw.get('link', ''),
+        team_logo=raw.get('logo', ''),
+    )
+
+async def harvest_table(pool, season, page_url):
+    """Open one standings page in its own tab and return its StandingRows"""
+    async with pool.page() as page:
+        try:
+            await goto_ready(page, page_url, 'standings')
+        except PageNotReady as e:
+            print(f"❌ {season}: standings not loaded ({e})")
+            return []
+        except Exception as e:
+            print(f"❌ {season}: failed to load {page_url}: {e}")
+            return []
+
+        with metrics.stage('extract'):
+            raw_rows = await page.evaluate(TABLE_JS)
+
+    with metrics.stage('extract'):
+        rows = [r for r in (build_standing_row(season, raw) for raw in raw_rows) if r]
+    metrics.incr('table_rows', len(rows))
+    print(f"✅ {season}: {len(rows)} teams")
+    return rows
+
+async def harvest_standings(targets, max_pages=4, pool=None):
+    """Harvest every (season label, standings URL) target in parallel tabs of one browser"""
+    if pool is None:
+        async with BrowserPool(max_pages=max_pages) as own_pool:
+            return await harvest_standings(targets, pool=own_pool)
+
+    results = await asyncio.gather(*(harvest_table(pool, season, page_url) for season, page_url in targets))
+    return [row for rows in results for row in rows]
+
+def build_targets(seasons=SEASONS, season_ids=None, include_current=True):
+    """(label, URL) for the current table, archived seasons and explicit tournament/stage IDs"""
+    targets = []
+    if include_current:
+        label, tournament_id, stage_id = CURRENT_SEASON
+        targets.append((label, standings_url(tournament_id, stage_id)))
+    for season in seasons:
+        targets.append((season, season_standings_url(season)))
+    for label, tournament_id, stage_id in season_ids or []:
+        targets.append((label, standings_url(tournament_id, stage_id)))
+    return targets
+
+def parse_season_id(value):
+    """Parse 'TOURNAMENT:STAGE[:LABEL]' from the command line"""
+    parts = value.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError("expected TOURNAMENT_ID:STAGE_ID[:LABEL]")
+    label = parts[2] if len(parts) == 3 else f"{parts[0]}/{parts[1]}"
+    return (label, parts[0], parts[1])
+
+def save_standings_csv(rows, filename=OUTPUT_FILE):
+    with metrics.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=STANDING_FIELDS)
+        writer.writeheader()
+        writer.writerows(asdict(r) for r in rows)
+    print(f"💾 Saved {len(rows)} table rows to {filename}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest Flashscore league tables for several seasons")
+    parser.add_argument('--seasons', nargs='*', default=SEASONS, help="Archived league seasons, e.g. 2023-2024")
+    parser.add_argument('--season-id', dest='season_ids', action='append', type=parse_season_id, default=[],
+                        help="Extra table as TOURNAMENT_ID:STAGE_ID[:LABEL] (repeatable)")
+    parser.add_argument('--no-current', action='store_true', help="Skip the current season's table")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--max-pages', type=int, default=4, help="Tabs open at the same time")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    metrics.reset('standings')
+
+    targets = build_targets(args.seasons, args.season_ids, include_current=not args.no_current)
+    print(f"🌐 Harvesting {len(targets)} league tables")
+
+    rows = asyncio.run(harvest_standings(targets, max_pages=args.max_pages))
+    save_standings_csv(rows, args.output)
+    export_metrics(args)
+
+if __name__ == "__main__":
+    main()
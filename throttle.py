@@ -0,0 +1,54 @@
+"""
+Shared politeness budget for concurrent scrapers
+Threads reserve the next free request slot of a host, so N workers together still send at most
+one request per interval to it, however many of them are running
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from run_metrics import metrics
+
+# Configuration
+MIN_INTERVAL = 0.8  # seconds between two requests to the same host
+MAX_INTERVAL = 1.5  # the gap is drawn between the two so requests don't look scheduled
+
+class HostRateLimiter:
+    """Per-key (by default per-host) request spacing shared by every thread"""
+
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, seed=None):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def reserve(self, key):
+        """Book the next slot for `key`; returns how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(key, now))
+            self.next_slot[key] = slot + self.random.uniform(self.min_interval, self.max_interval)
+        return slot - now
+
+    def delay(self, key):
+        """Seconds until the key's next free slot, without booking it"""
+        with self.lock:
+            return max(0.0, self.next_slot.get(key, 0.0) - time.monotonic())
+
+    def wait(self, key):
+        delay = self.reserve(key)
+        if delay > 0:
+            with metrics.stage('sleep'):
+                time.sleep(delay)
+        return delay
+
+    def wait_for_url(self, url):
+        return self.wait(urlparse(url).hostname or '')
+
+    def backoff(self, key, seconds):
+        """Push the key's next slot back, e.g. after a 429 with Retry-After"""
+        with self.lock:
+            self.next_slot[key] = max(self.next_slot.get(key, 0.0), time.monotonic() + seconds)
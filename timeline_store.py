@@ -0,0 +1,250 @@
+"""
+Live match timeline store
+Append-only log of the score, status and incident changes of every followed match, with a full
+snapshot every few entries so any minute can be replayed without reading the whole log.
+Finished matches can be exported for analysis without scraping them again
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+# Configuration
+TIMELINE_FILE = "live_timeline.db"
+SNAPSHOT_EVERY = 25  # log entries between two snapshots of a match
+
+MINUTE_PATTERN = re.compile(r'(\d+)(?:\s*\+\s*(\d+))?')
+
+def minute_value(text):
+    """Match clock text as a number: "67" -> 67, "45+2" -> 45.02; None when there is no clock"""
+    found = MINUTE_PATTERN.search(text or '')
+    if not found:
+        return None
+    base, added = found.groups()
+    return int(base) + int(added or 0) / 100
+
+def compact_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def empty_state(match_id):
+    return {
+        'match_id': match_id, 'home_team': '', 'away_team': '', 'status': '',
+        'minute': 0, 'home_score': '', 'away_score': '', 'events': {},
+    }
+
+def apply_entry(state, kind, payload):
+    """Apply one log entry to a replay state (in place)"""
+    if kind == 'teams':
+        state['home_team'], state['away_team'] = payload['home_team'], payload['away_team']
+    elif kind == 'status':
+        state['status'] = payload['status']
+    elif kind == 'score':
+        state['home_score'], state['away_score'] = payload['home_score'], payload['away_score']
+    elif kind == 'incident':
+        state['events'][payload['event_id']] = payload
+
+class TimelineStore:
+    """SQLite-backed timelines keyed by Flashscore match ID"""
+
+    def __init__(self, path=TIMELINE_FILE, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS matches (
+                match_id TEXT PRIMARY KEY,
+                home_team TEXT NOT NULL DEFAULT '',
+                away_team TEXT NOT NULL DEFAULT '',
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                finished INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                match_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                recorded_at TEXT NOT NULL,
+                minute REAL NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (match_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshots (
+                match_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                minute REAL NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (match_id, seq)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        self.live = {}  # match ID -> current state, last seq and minute of the matches recorded in this run
+
+    def close(self):
+        self.conn.close()
+
+    # Recording
+
+    def _live_state(self, match_id):
+        if match_id not in self.live:
+            # A match picked up again after a restart continues its existing log
+            row = self.conn.execute(
+                "SELECT MAX(seq), MAX(minute) FROM entries WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            state = self.state_at(match_id)
+            self.live[match_id] = {'state': state, 'seq': row[0] or 0, 'minute': row[1] or 0}
+        return self.live[match_id]
+
+    def record_poll(self, match_id, state, changes=(), finished=False):
+        """
+        Append what changed in one poll of a match: teams, status and score when they differ from
+        the log, and every new or updated incident from `changes` ((op, LiveEvent) pairs).
+        Clock ticks alone are not logged. Returns the number of entries written.
+        """
+        live = self._live_state(match_id)
+        current = live['state']
+
+        # Entries are stamped with the match clock, never going backwards so the log stays sorted by minute
+        minute = minute_value(state.get('minute'))
+        live['minute'] = max(live['minute'], minute if minute is not None else 0)
+
+        entries = []
+        if (state.get('home_team'), state.get('away_team')) != (current['home_team'], current['away_team']):
+            entries.append(('teams', {'home_team': state.get('home_team', ''), 'away_team': state.get('away_team', '')}))
+        if state.get('status', '') != current['status']:
+            entries.append(('status', {'status': state.get('status', '')}))
+        if (state.get('home_score'), state.get('away_score')) != (current['home_score'], current['away_score']):
+            entries.append(('score', {'home_score': state.get('home_score', ''), 'away_score': state.get('away_score', '')}))
+        for op, event in changes:
+            if event.type != 'status':
+                entries.append(('incident', event.to_dict()))
+
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO matches (match_id, home_team, away_team, first_seen, last_seen, finished)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(match_id) DO UPDATE SET
+                    home_team = excluded.home_team, away_team = excluded.away_team,
+                    last_seen = excluded.last_seen, finished = MAX(finished, excluded.finished)
+            """, (match_id, state.get('home_team', ''), state.get('away_team', ''), now, now, int(finished)))
+
+            for kind, payload in entries:
+                live['seq'] += 1
+                apply_entry(current, kind, payload)
+                current['minute'] = live['minute']
+                self.conn.execute(
+                    "INSERT INTO entries (match_id, seq, recorded_at, minute, kind, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                    (match_id, live['seq'], now, live['minute'], kind, compact_json(payload)),
+                )
+                if live['seq'] % self.snapshot_every == 0:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO snapshots (match_id, seq, minute, state) VALUES (?, ?, ?, ?)",
+                        (match_id, live['seq'], live['minute'], compact_json(current)),
+                    )
+
+        if finished:
+            self.live.pop(match_id, None)
+        return len(entries)
+
+    # Replay
+
+    def state_at(self, match_id, minute=None):
+        """
+        Match state (teams, status, score, incidents so far) as it was at `minute` of the match clock,
+        or the latest state when minute is None. Starts from the closest snapshot and replays the log after it.
+        """
+        limit = float('inf') if minute is None else minute
+        state, seq = empty_state(match_id), 0
+
+        snapshot = self.conn.execute(
+            "SELECT seq, state FROM snapshots WHERE match_id = ? AND minute <= ? ORDER BY seq DESC LIMIT 1",
+            (match_id, limit),
+        ).fetchone()
+        if snapshot:
+            seq, state = snapshot[0], json.loads(snapshot[1])
+
+        rows = self.conn.execute(
+            "SELECT minute, kind, payload FROM entries WHERE match_id = ? AND seq > ? ORDER BY seq",
+            (match_id, seq),
+        )
+        for entry_minute, kind, payload in rows:
+            if entry_minute > limit:
+                break
+            apply_entry(state, kind, json.loads(payload))
+            state['minute'] = entry_minute
+        if minute is not None:
+            state['minute'] = max(state['minute'], minute)
+        return state
+
+    def entries(self, match_id):
+        """The full log of a match as dicts, in recording order"""
+        rows = self.conn.execute(
+            "SELECT seq, recorded_at, minute, kind, payload FROM entries WHERE match_id = ? ORDER BY seq", (match_id,)
+        )
+        return [
+            {'seq': seq, 'recorded_at': recorded_at, 'minute': minute, 'kind': kind, 'payload': json.loads(payload)}
+            for seq, recorded_at, minute, kind, payload in rows
+        ]
+
+    def matches(self, finished_only=False):
+        """(match_id, home_team, away_team, last_seen, finished) rows, most recent first"""
+        query = "SELECT match_id, home_team, away_team, last_seen, finished FROM matches"
+        if finished_only:
+            query += " WHERE finished = 1"
+        return self.conn.execute(query + " ORDER BY last_seen DESC").fetchall()
+
+    def export_timeline(self, match_id):
+        """A finished (or partial) match as one JSON-ready dict: final state plus the full log"""
+        final = self.state_at(match_id)
+        final['events'] = list(final['events'].values())
+        return {'match_id': match_id, 'final_state': final, 'entries': self.entries(match_id)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and export recorded live match timelines")
+    parser.add_argument('--db', default=TIMELINE_FILE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help="Recorded matches")
+    list_parser.add_argument('--finished', action='store_true', help="Only matches that reached full time")
+
+    state_parser = subparsers.add_parser('state', help="Match state at a given minute")
+    state_parser.add_argument('match_id')
+    state_parser.add_argument('--minute', type=float, default=None, help="Match minute (default: latest)")
+
+    export_parser = subparsers.add_parser('export', help="Full timeline of a match as JSON")
+    export_parser.add_argument('match_id')
+    export_parser.add_argument('--output', default=None, help="JSON file (default: stdout)")
+    args = parser.parse_args()
+
+    store = TimelineStore(args.db)
+    try:
+        if args.command == 'list':
+            rows = store.matches(finished_only=args.finished)
+            for match_id, home_team, away_team, last_seen, finished in rows:
+                print(f"{'🏁' if finished else '⏱️'} {match_id}  {home_team} vs {away_team}  (last seen {last_seen})")
+            print(f"📊 {len(rows)} matches in {args.db}")
+
+        elif args.command == 'state':
+            state = store.state_at(args.match_id, args.minute)
+            print(f"⏱️ {state['home_team']} {state['home_score']} - {state['away_score']} {state['away_team']} "
+                  f"({state['status'] or 'not started'}, minute {state['minute']:g})")
+            for event in state['events'].values():
+                print(f"   {event['minute']}' {event['type']} {event['player']} ({event['team']}) {event['score_after']}")
+
+        elif args.command == 'export':
+            timeline = store.export_timeline(args.match_id)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(timeline, f, ensure_ascii=False, indent=2)
+                print(f"💾 {len(timeline['entries'])} entries of {args.match_id} saved to {args.output}")
+            else:
+                json.dump(timeline, sys.stdout, ensure_ascii=False, indent=2)
+                print()
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
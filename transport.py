@@ -0,0 +1,231 @@
+"""
+HTTP transport for the fetch layer
+'requests' (HTTP/1.1, pooled keep-alive connections) or 'http2' (httpx, many requests multiplexed
+over one TLS connection per host); one shared client per transport is reused by every scraper.
+With a proxy pool, requests leave through several outbound proxies, each with its own rate budget
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+
+from run_metrics import metrics
+from throttle import MAX_INTERVAL, MIN_INTERVAL, HostRateLimiter
+
+# Configuration
+TRANSPORTS = ('requests', 'http2')
+DEFAULT_TRANSPORT = os.environ.get('SCRAPER_TRANSPORT', 'requests')
+DEFAULT_PROXIES = os.environ.get('SCRAPER_PROXIES', '')  # comma-separated proxy URLs, 'direct' for no proxy
+POOL_CONNECTIONS = 10  # hosts kept in the requests pool
+POOL_MAXSIZE = 16  # connections per host (requests) / total connections (httpx)
+KEEPALIVE_EXPIRY = 60  # seconds an idle HTTP/2 connection is kept open
+BLOCK_STATUSES = (403, 429)  # answers that take an exit out of rotation for a host
+QUARANTINE_SECONDS = 60  # first quarantine of a blocked exit, doubled at every further block (up to 16x)
+HEALTH_RECOVERY = 0.2  # share of the gap to full health won back by a successful request
+EXIT_RETRIES = 2  # other exits tried when a request is blocked
+
+def create_client(transport=None, headers=None, proxy_pool=None):
+    """
+    New HTTP client for `transport`. Both kinds expose what the scrapers use:
+    get(url, headers=, timeout=) returning status_code/text/content/headers/elapsed, plus headers and cookies.
+    With a ProxyPool, every request goes through the pool's least-loaded healthy exit ('requests' only).
+    """
+    transport = transport or DEFAULT_TRANSPORT
+    if proxy_pool is not None and transport != 'requests':
+        raise ValueError("the proxy pool needs the 'requests' transport")
+
+    if transport == 'requests':
+        session = ProxyPoolSession(proxy_pool) if proxy_pool is not None else requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    elif transport == 'http2':
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("the 'http2' transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        session = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=POOL_MAXSIZE, keepalive_expiry=KEEPALIVE_EXPIRY),
+        )
+    else:
+        raise ValueError(f"unknown transport {transport!r}, expected one of {', '.join(TRANSPORTS)}")
+
+    if headers:
+        session.headers.update(headers)
+    return session
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def shared_client(transport=None):
+    """Process-wide client for `transport`, created on first use (its connection pool is shared by all callers)"""
+    transport = transport or DEFAULT_TRANSPORT
+    with _shared_lock:
+        if transport not in _shared:
+            _shared[transport] = create_client(transport)
+        return _shared[transport]
+
+def close_shared_clients():
+    with _shared_lock:
+        for client in _shared.values():
+            client.close()
+        _shared.clear()
+
+# Proxy pool
+
+@dataclass
+class ProxyExit:
+    """One outbound proxy (or 'direct') with its health and per-host quarantines"""
+    url: str
+    health: float = 1.0
+    in_flight: int = 0
+    requests: int = 0
+    blocked: int = 0
+    errors: int = 0
+    strikes: dict = field(default_factory=dict)  # host -> blocks in a row
+    quarantined_until: dict = field(default_factory=dict)  # host -> monotonic time
+
+    @property
+    def proxies(self):
+        return None if self.url == 'direct' else {'http': self.url, 'https': self.url}
+
+    def available(self, host, now):
+        return self.quarantined_until.get(host, 0.0) <= now
+
+class ProxyPool:
+    """
+    Routes each request to the exit that can send to the host soonest, weighted by its health.
+    Every (exit, host) pair has its own request spacing, so N exits together send N times the
+    single-IP rate. An exit answered with 403/429 is quarantined for that host and loses health;
+    errors cost health too, and successful requests win it back.
+    """
+
+    def __init__(self, proxies, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 quarantine=QUARANTINE_SECONDS, seed=None):
+        if not proxies:
+            raise ValueError("the proxy pool needs at least one exit")
+        self.exits = [ProxyExit(url) for url in proxies]
+        self.limiter = HostRateLimiter(min_interval, max_interval, seed)
+        self.quarantine = quarantine
+        self.lock = threading.Lock()
+
+    def _load(self, exit, host):
+        """Expected wait before this exit could send to the host, inflated for busy or unhealthy exits"""
+        wait = self.limiter.delay((exit.url, host))
+        return (wait + exit.in_flight * self.limiter.min_interval) / max(exit.health, 0.01)
+
+    def acquire(self, host, exclude=()):
+        """Pick an exit for a request to `host` and book its next slot; returns (exit, seconds to wait)"""
+        with self.lock:
+            now = time.monotonic()
+            candidates = [e for e in self.exits if e not in exclude] or self.exits
+            available = [e for e in candidates if e.available(host, now)]
+            if available:
+                chosen = min(available, key=lambda e: self._load(e, host))
+            else:
+                # Everything is out of rotation: wait for the exit that comes back first
+                chosen = min(candidates, key=lambda e: (e.quarantined_until.get(host, 0.0), -e.health))
+                self.limiter.backoff((chosen.url, host), chosen.quarantined_until.get(host, now) - now)
+            chosen.in_flight += 1
+            chosen.requests += 1
+            return chosen, self.limiter.reserve((chosen.url, host))
+
+    def release(self, exit, host, status=None, retry_after=None):
+        """Record the outcome of a request (status None when it raised)"""
+        with self.lock:
+            exit.in_flight -= 1
+            if status in BLOCK_STATUSES:
+                exit.blocked += 1
+                exit.health *= 0.5
+                strikes = exit.strikes[host] = exit.strikes.get(host, 0) + 1
+                seconds = max(self.quarantine * 2 ** min(strikes - 1, 4), retry_after or 0)
+                exit.quarantined_until[host] = time.monotonic() + seconds
+                metrics.incr('proxy_blocks')
+                print(f"🚧 Exit {exit.url} got HTTP {status} from {host}, out of rotation for {seconds:.0f}s")
+            elif status is None or status >= 500:
+                exit.errors += 1
+                exit.health *= 0.7
+            else:
+                exit.strikes.pop(host, None)
+                exit.health += (1.0 - exit.health) * HEALTH_RECOVERY
+
+    def summary(self):
+        return [
+            {'exit': e.url, 'requests': e.requests, 'blocked': e.blocked, 'errors': e.errors,
+             'health': round(e.health, 2)}
+            for e in self.exits
+        ]
+
+    def print_summary(self):
+        for row in self.summary():
+            print(f"   🔀 {row['exit']}: {row['requests']} requests, {row['blocked']} blocked, "
+                  f"{row['errors']} errors, health {row['health']}")
+
+def parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class ProxyPoolSession(requests.Session):
+    """requests.Session sending each request through an exit of a ProxyPool (the pool also does the pacing)"""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+    def request(self, method, url, **kwargs):
+        host = urlparse(url).hostname or ''
+        tried = []
+        while True:
+            exit, delay = self.pool.acquire(host, exclude=tried)
+            if delay > 0:
+                with metrics.stage('sleep'):
+                    time.sleep(delay)
+            try:
+                response = super().request(method, url, proxies=exit.proxies, **kwargs)
+            except Exception:
+                self.pool.release(exit, host)
+                raise
+            self.pool.release(exit, host, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+            # A blocked request is retried through another exit before giving up
+            tried.append(exit)
+            if response.status_code not in BLOCK_STATUSES or len(tried) > EXIT_RETRIES or len(tried) >= len(self.pool.exits):
+                return response
+
+def parse_proxies(value):
+    """Proxy URLs from a comma-separated list or from '@file' (one per line, '#' for comments)"""
+    value = (value or '').strip()
+    if value.startswith('@'):
+        with open(value[1:], 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def create_proxy_pool(value, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """ProxyPool for a --proxies value, None when no proxies are given"""
+    proxies = parse_proxies(value)
+    if not proxies:
+        return None
+    print(f"🔀 Proxy pool with {len(proxies)} exits")
+    return ProxyPool(proxies, min_interval, max_interval)
+
+def add_transport_argument(parser, proxies=False):
+    """--transport, plus --proxies for the scrapers that can route through a ProxyPool"""
+    parser.add_argument('--transport', choices=TRANSPORTS, default=DEFAULT_TRANSPORT,
+                        help="HTTP client: 'requests' (HTTP/1.1) or 'http2' (httpx, needs httpx[http2])")
+    if proxies:
+        parser.add_argument('--proxies', default=DEFAULT_PROXIES,
+                            help="Outbound proxies, comma-separated or @file ('direct' = no proxy); "
+                                 "each gets its own rate budget")
+
+def check_transport_arguments(parser, args):
+    """Reject --proxies with a transport the pool can't drive, before any work starts"""
+    if getattr(args, 'proxies', '') and parse_proxies(args.proxies) and args.transport != 'requests':
+        parser.error(f"--proxies needs --transport requests (the proxy pool can't route '{args.transport}' requests)")
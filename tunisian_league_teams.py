@@ -1,44 +1,30 @@
-import time
+import asyncio
 import csv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
-URL = "https://www.flashscore.com/standings/fgzlZk5U/6HCkYDZ1/#/6HCkYDZ1/standings/overall/"
+from standings_harvester import CURRENT_SEASON, harvest_standings, standings_url
 
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
+OUTPUT_FILE = "tunisian_league_teams.csv"
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+async def scrape_league_teams():
+    """Team name, link and logo of the current league table"""
+    label, tournament_id, stage_id = CURRENT_SEASON
+    rows = await harvest_standings([(label, standings_url(tournament_id, stage_id))])
+    return [[row.team_name, row.team_link, row.team_logo] for row in rows]
 
-try:
-    driver.get(URL)
-    time.sleep(5)  # wait for JS to load
-
-    teams_data = []
-
-    rows = driver.find_elements(By.CSS_SELECTOR, 'div.tableCellParticipant__block')
-
-    for row in rows:
-        try:
-            link_el = row.find_element(By.CSS_SELECTOR, 'a')
-            name = row.text.strip()  # ✅ use row.text instead of link_el.text
-            link = link_el.get_attribute("href")
-            logo = row.find_element(By.CSS_SELECTOR, 'img').get_attribute("src")
-
-            teams_data.append([name, link, logo])
-        except Exception as e:
-            print("Skipping row due to error:", e)
-
-    with open("tunisian_league_teams.csv", "w", newline="", encoding="utf-8") as f:
+def save_teams_csv(teams_data, filename=OUTPUT_FILE):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["Team Name", "Team Link", "Team Logo"])
         writer.writerows(teams_data)
 
-    print("✅ CSV file 'tunisian_league_teams.csv' updated successfully!")
+    print(f"✅ CSV file '{filename}' updated successfully!")
+
+async def main():
+    teams_data = await scrape_league_teams()
+    if teams_data:
+        save_teams_csv(teams_data)
+    else:
+        print("❌ No teams found, keeping the existing file")
 
-finally:
-    driver.quit()
+if __name__ == "__main__":
+    asyncio.run(main())
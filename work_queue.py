@@ -0,0 +1,368 @@
+"""
+Durable work queue for squad-page and profile jobs
+SQLite-backed jobs with leases, visibility timeouts, retries with backoff and idempotent result
+writes, so several worker processes (or hosts sharing the queue file) can drain one crawl together
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from parse_cache import ParseCache, add_parse_cache_argument
+
+# Configuration
+QUEUE_FILE = "work_queue.db"
+VISIBILITY_TIMEOUT = 120  # seconds a leased job stays invisible before another worker may take it
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30  # seconds, doubled at every failed attempt
+IDLE_POLL_INTERVAL = 2.0
+WORKERS = 4
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    payload: dict
+    attempts: int
+    lease_owner: str
+
+class WorkQueue:
+    """Jobs keyed by '<kind>:<key>' so enqueueing the same work twice is a no-op"""
+
+    def __init__(self, path=QUEUE_FILE, visibility_timeout=VISIBILITY_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        # Autocommit mode: every write below runs in an explicit BEGIN IMMEDIATE transaction
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_pick ON jobs (state, priority, available_at)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                result TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                completed_at REAL NOT NULL
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, kind, key, payload, priority=0):
+        """Add a job unless it already exists (in any state); returns True when it was added"""
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (job_id, kind, payload, priority, available_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (f"{kind}:{key}", kind, json.dumps(payload, ensure_ascii=False), priority, now, now, now)
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, worker_id, kinds=None):
+        """Take the next available job (or one whose lease expired); None when nothing is available"""
+        now = time.time()
+        kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})" if kinds else ''
+        self._transaction()
+        try:
+            # Jobs whose last lease expired after their final attempt are given up on
+            self.conn.execute(
+                "UPDATE jobs SET state = 'failed', last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self.conn.execute(f"""
+                SELECT job_id, kind, payload, attempts FROM jobs
+                WHERE ((state = 'queued' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?))
+                {kind_filter}
+                ORDER BY priority DESC, available_at, created_at
+                LIMIT 1
+            """, (now, now, *(kinds or []))).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            job_id, kind, payload, attempts = row
+            self.conn.execute(
+                "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "updated_at = ? WHERE job_id = ?",
+                (worker_id, now + self.visibility_timeout, now, job_id)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return Job(job_id, kind, json.loads(payload), attempts + 1, worker_id)
+
+    def extend(self, job, seconds=None):
+        """Push the lease deadline of a long-running job; False if the lease was lost"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND lease_owner = ? AND state = 'leased'",
+            (time.time() + (seconds or self.visibility_timeout), time.time(), job.job_id, job.lease_owner)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job, result):
+        """
+        Store the result and mark the job done; False (and nothing stored) if the lease was lost,
+        e.g. it expired mid-run and another worker holds the job now. The result is an upsert keyed
+        by job ID, so a job that still ran twice leaves exactly one result.
+        """
+        now = time.time()
+        self._transaction()
+        try:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET state = 'done', lease_owner = NULL, lease_expires = NULL, last_error = NULL, "
+                "updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+                (now, job.job_id, job.lease_owner)
+            )
+            if cursor.rowcount == 1:
+                self.conn.execute(
+                    "INSERT INTO results (job_id, kind, result, worker, completed_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(job_id) DO UPDATE SET result = excluded.result, worker = excluded.worker, "
+                    "completed_at = excluded.completed_at",
+                    (job.job_id, job.kind, json.dumps(result, ensure_ascii=False), job.lease_owner, now)
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def fail(self, job, error):
+        """Requeue with exponential backoff, or mark failed after the last attempt"""
+        now = time.time()
+        if job.attempts >= self.max_attempts:
+            state, available_at = 'failed', now
+        else:
+            state, available_at = 'queued', now + RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+        self.conn.execute(
+            "UPDATE jobs SET state = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, "
+            "updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+            (state, available_at, str(error)[:500], now, job.job_id, job.lease_owner)
+        )
+        return state
+
+    def pending(self):
+        """Jobs that are queued or leased (i.e. not finished yet)"""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+    def stats(self):
+        counts = {}
+        for kind, state, count in self.conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state"):
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def results(self, kind):
+        """job key -> result for every completed job of a kind"""
+        prefix = len(kind) + 1
+        return {job_id[prefix:]: json.loads(result)
+                for job_id, result in self.conn.execute("SELECT job_id, result FROM results WHERE kind = ?", (kind,))}
+
+    def failures(self):
+        return self.conn.execute("SELECT job_id, attempts, last_error FROM jobs WHERE state = 'failed'").fetchall()
+
+# Job handlers: payload -> result; raising makes the job retry
+
+def handle_squad(queue, payload, session):
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    url = transfermarkt.squad_page_url(payload['year'], payload['club_slug'], payload['club_id'])
+    response = transfermarkt.fetch_page(session, url, timeout=30)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code} for {url}")
+    squad = transfermarkt.parse_squad_rows(response.text)
+    if squad is None:
+        raise RuntimeError(f"no squad table in {url}")
+
+    # Profiles are their own jobs, so any worker can fetch them and each is fetched once
+    for row in squad:
+        queue.enqueue('profile', row['Profile_URL'], {'url': row['Profile_URL'], 'player': row['Player']}, priority=0)
+    return {'club': payload['club'], 'club_id': payload['club_id'], 'year': payload['year'], 'squad': squad}
+
+def handle_profile(queue, payload, session):
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    details = transfermarkt.get_player_details(session, payload['url'], payload['player'])
+    if not details:
+        raise RuntimeError(f"no details for {payload['url']}")
+    return details
+
+HANDLERS = {
+    'squad': handle_squad,
+    'profile': handle_profile,
+}
+
+def run_worker(queue_path=QUEUE_FILE, worker_id=None, kinds=None, exit_when_empty=True, min_interval=None,
+               parse_cache_path=None):
+    """Lease and run jobs until the queue is drained (or forever with exit_when_empty=False)"""
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+    from throttle import MAX_INTERVAL, MIN_INTERVAL, HostRateLimiter
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    session = transfermarkt.create_session()
+    transfermarkt.THROTTLE = False
+    min_interval = MIN_INTERVAL if min_interval is None else min_interval
+    transfermarkt.RATE_LIMITER = HostRateLimiter(min_interval, min_interval * MAX_INTERVAL / MIN_INTERVAL)
+    if parse_cache_path:
+        transfermarkt.PARSE_CACHE = ParseCache(parse_cache_path)
+
+    done = failed = 0
+    try:
+        while True:
+            job = queue.lease(worker_id, kinds)
+            if job is None:
+                if exit_when_empty and queue.pending() == 0:
+                    break
+                time.sleep(IDLE_POLL_INTERVAL)
+                continue
+
+            try:
+                result = HANDLERS[job.kind](queue, job.payload, session)
+            except Exception as e:
+                state = queue.fail(job, e)
+                failed += 1
+                print(f"[{worker_id}] ❌ {job.job_id} (attempt {job.attempts}): {e} -> {state}")
+                continue
+
+            if not queue.complete(job, result):
+                print(f"[{worker_id}] ⚠️ {job.job_id}: lease lost before completion, result dropped")
+                continue
+            done += 1
+            if done % 10 == 0:
+                print(f"[{worker_id}] Progress: {done} jobs done")
+    finally:
+        queue.close()
+
+    print(f"[{worker_id}] ✅ {done} jobs done, {failed} failed attempts")
+    return done
+
+def enqueue_crawl(queue, clubs, years):
+    """One squad job per (club, season); squad jobs run before the profile jobs they create"""
+    added = 0
+    for club in clubs:
+        for year in years:
+            payload = {'club': club.name, 'club_slug': club.tm_slug, 'club_id': club.tm_id, 'year': year}
+            added += queue.enqueue('squad', f"{club.tm_id}/{year}", payload, priority=1)
+    return added
+
+def export_results(queue):
+    """Join squad and profile results into dataset records (profiles not fetched yet are left empty)"""
+    import scrape_esperance_2012_2025_all_seasons as transfermarkt
+
+    profiles = queue.results('profile')
+    records = []
+    for result in queue.results('squad').values():
+        for squad_row in result['squad']:
+            details = profiles.get(squad_row['Profile_URL'], {})
+            record = transfermarkt.build_player_record(squad_row, result['year'], details)
+            records.append(dict(record, Club=result['club'], Club_ID=result['club_id']))
+    records.sort(key=lambda r: (r['Club'], r['Season'], r['Player']))
+    return records
+
+def print_status(queue):
+    print(f"📋 Queue {queue.path}")
+    for kind, counts in sorted(queue.stats().items()):
+        print(f"   {kind:<8} " + ', '.join(f"{state}: {count}" for state, count in sorted(counts.items())))
+    for job_id, attempts, error in queue.failures()[:20]:
+        print(f"   ❌ {job_id} after {attempts} attempts: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable work queue for the Transfermarkt crawl")
+    parser.add_argument('--queue', default=QUEUE_FILE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = subparsers.add_parser('enqueue', help="Add squad jobs for the registry clubs")
+    enqueue.add_argument('--registry', default=None)
+    enqueue.add_argument('--clubs', nargs='*', help="Only these club names")
+    enqueue.add_argument('--start-year', type=int, default=None)
+    enqueue.add_argument('--end-year', type=int, default=None)
+
+    work = subparsers.add_parser('work', help="Run worker processes against the queue")
+    work.add_argument('--workers', type=int, default=WORKERS, help="Worker processes on this host")
+    work.add_argument('--kinds', nargs='*', choices=sorted(HANDLERS), help="Only run these job kinds")
+    work.add_argument('--min-interval', type=float, default=None,
+                      help="Seconds between requests per worker (default: the shared budget times --workers)")
+    work.add_argument('--forever', action='store_true', help="Keep polling when the queue is empty")
+    add_parse_cache_argument(work)
+
+    subparsers.add_parser('status', help="Show job counts and failures")
+
+    export = subparsers.add_parser('export', help="Write the finished results to a CSV")
+    export.add_argument('--output', default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        import scrape_esperance_2012_2025_all_seasons as transfermarkt
+        from club_registry import REGISTRY_FILE, load_registry
+
+        clubs = [c for c in load_registry(args.registry or REGISTRY_FILE) if c.resolved]
+        if args.clubs:
+            clubs = [c for c in clubs if c.name in args.clubs]
+        years = range(args.start_year or transfermarkt.START_YEAR, (args.end_year or transfermarkt.CURRENT_YEAR) + 1)
+        queue = WorkQueue(args.queue)
+        added = enqueue_crawl(queue, clubs, years)
+        print(f"➕ {added} squad jobs added for {len(clubs)} clubs")
+        print_status(queue)
+        queue.close()
+
+    elif args.command == 'work':
+        from throttle import MIN_INTERVAL
+
+        # Each process keeps its own limiter, so spread the per-host budget over the local workers
+        min_interval = args.min_interval if args.min_interval is not None else MIN_INTERVAL * args.workers
+        WorkQueue(args.queue).close()  # create the schema before the workers race for it
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(args.queue, None, args.kinds, not args.forever, min_interval,
+                                                          args.parse_cache))
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        queue = WorkQueue(args.queue)
+        print_status(queue)
+        queue.close()
+
+    elif args.command == 'status':
+        queue = WorkQueue(args.queue)
+        print_status(queue)
+        queue.close()
+
+    elif args.command == 'export':
+        from squad_crawler import OUTPUT_FILE, save_squads_csv
+
+        queue = WorkQueue(args.queue)
+        save_squads_csv(export_results(queue), args.output or OUTPUT_FILE)
+        queue.close()
+
+if __name__ == "__main__":
+    main()